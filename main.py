@@ -7,6 +7,7 @@ Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
 """
 
 import arcade
+import multiprocessing
 
 from src import display
 
@@ -20,4 +21,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Bot rollouts run in worker processes, which need this in a frozen PyInstaller build
+    multiprocessing.freeze_support()
     main()
@@ -6,6 +6,23 @@ Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
 from setuptools import setup, Command
 import subprocess
 
+class BuildAssetsCommand(Command):
+    """Custom command to pack the assets into a single archive."""
+    description = "Pack audio, graphics and documentation into assets.pak with pre-decoded audio and pixels"
+    user_options = []
+
+    def initialize_options(self):
+        pass
+
+    def finalize_options(self):
+        pass
+
+    def run(self):
+        from src import asset_pack
+
+        count = asset_pack.build_archive(asset_pack.ARCHIVE_NAME)
+        print(f"Packed {count} assets into {asset_pack.ARCHIVE_NAME}")
+
 class BuildPyInstallerCommand(Command):
     """Custom command to run PyInstaller."""
     description = "Build executable using PyInstaller"
@@ -18,9 +35,12 @@ class BuildPyInstallerCommand(Command):
         pass
 
     def run(self):
+        # The assets ship as one archive instead of hundreds of loose files to unpack on every launch
+        self.run_command("build_assets")
+
         # Run the PyInstaller build command
         subprocess.run([
-            "pyinstaller", "--onefile", "--add-data=audio/*;audio", "--add-data=graphics/*;graphics", "--add-data=dev/audio/audio_sources.txt;audio", "--add-data=documentation/*;documentation", "--icon=dev/graphics/icon.ico", "--name=Monopoly", "--noconsole", "main.py"
+            "pyinstaller", "--onefile", "--add-data=assets.pak;.", "--icon=dev/graphics/icon.ico", "--name=Monopoly", "--noconsole", "main.py"
         ], check=True)
 
 setup(
@@ -28,6 +48,7 @@ setup(
     version="0.1",
     description="A digital version of the classic board game",
     cmdclass={
-        "build_exe": BuildPyInstallerCommand,
+        "build_assets": BuildAssetsCommand,
+        "build_exe":    BuildPyInstallerCommand,
     },
 )
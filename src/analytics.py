@@ -0,0 +1,70 @@
+"""
+Expected income analytics, combining the landing probabilities from the Markov solver with the board's rent.
+
+ExpectedIncome listens to the board, so when set_owner or add_house changes a space only that space's group is worked
+out again instead of the whole board.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+from . import markov
+
+
+class ExpectedIncome:
+    """Expected rent per opponent turn for every space and every owner, kept up to date as the board changes."""
+    def __init__(self, board, solution=None):
+        """Constructor"""
+        self.board    = board
+        self.solution = solution if solution is not None else markov.landing_probabilities(board=board)
+
+        # How often a single opponent turn ends a roll on each space
+        self.space_nums = [prop["space_num"] for prop in board.properties]
+        self.visits     = {space_num: self.solution.per_turn(space_num) for space_num in self.space_nums}
+
+        # space_num -> (owner, expected rent per opponent turn) and owner -> total over their spaces
+        self.space_income = {}
+        self.owner_income = {}
+
+        for space_num in self.space_nums:
+            self.update_space(space_num)
+
+        board.add_listener(self.on_board_change)
+
+    def close(self):
+        """Stop following changes to the board."""
+        self.board.remove_listener(self.on_board_change)
+
+    def on_board_change(self, space_num):
+        """Board listener, rent in a group depends on the whole group so update all of it."""
+        group = self.board.property_by_space_num(space_num)["group"]
+        if group is None:
+            self.update_space(space_num)
+            return
+
+        for prop in self.board.properties_by_group(group):
+            self.update_space(prop["space_num"])
+
+    def update_space(self, space_num):
+        """Work out the expected income of a single space and fix up the owner totals."""
+        old_owner, old_income = self.space_income.get(space_num, (None, 0.0))
+        if old_owner:
+            self.owner_income[old_owner] -= old_income
+
+        owner, rent = self.board.owned_rent(space_num)
+        income = self.visits[space_num] * rent if owner else 0.0
+        self.space_income[space_num] = (owner, income)
+
+        if owner:
+            self.owner_income[owner] = self.owner_income.get(owner, 0.0) + income
+
+    def space(self, space_num):
+        """Expected rent the owner of a space collects from one opponent turn."""
+        return self.space_income[space_num][1]
+
+    def owner(self, owner_id):
+        """Expected rent an owner collects from one opponent turn across all of their spaces."""
+        return self.owner_income.get(owner_id, 0.0)
+
+    def per_round(self, owner_id, player_count):
+        """Expected rent an owner collects in one full round of turns from every other player."""
+        return self.owner(owner_id) * (player_count - 1)
@@ -0,0 +1,176 @@
+"""
+Packed asset archive, a single file holding every asset already decoded so the game doesn't unpack or decode at startup.
+
+The archive starts with a header and an index of every entry, followed by the data of each entry aligned to 64 bytes.
+Images are stored as raw RGBA pixels and sounds as raw PCM samples. Anything else, including sounds that couldn't be
+decoded at build time, is stored as the original file. The archive is memory-mapped when read, and textures and sounds
+are built straight on top of the mapped memory instead of copies of it.
+
+Build the archive with python setup.py build_assets.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import io
+import mmap
+import os
+import struct
+
+
+ARCHIVE_NAME = "assets.pak"
+
+MAGIC   = b"MPAK"
+VERSION = 1
+ALIGNMENT = 64
+
+# magic, version, entry count
+HEADER = struct.Struct("<4sHI")
+# name length, kind, data offset, data length and three values depending on the kind
+ENTRY  = struct.Struct("<HBQQIII")
+
+KIND_FILE = 0
+# Values are width, height
+KIND_RGBA = 1
+# Values are channels, sample size in bits, sample rate
+KIND_PCM  = 2
+
+# Directories packed by build_archive, and which files in them are decoded
+PACKED_DIRECTORIES = ("audio", "graphics", "documentation")
+IMAGE_EXTENSION = ".png"
+SOUND_EXTENSION = ".mp3"
+
+
+def decode_image(path):
+    """Decode an image to (RGBA pixels, width, height)."""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image = image.convert("RGBA")
+        return image.tobytes(), image.width, image.height
+
+def decode_sound(path):
+    """Decode a sound to (PCM samples, channels, sample size, sample rate)."""
+    from pyglet import media
+    from . import pcm_source
+
+    samples, audio_format = pcm_source.read_samples(media.load(path, streaming=True))
+    return samples, audio_format.channels, audio_format.sample_size, audio_format.sample_rate
+
+def pack_entry(root, relative_path):
+    """Read and decode a single file, returning (kind, data, values)."""
+    path = os.path.join(root, relative_path)
+
+    if relative_path.endswith(IMAGE_EXTENSION):
+        pixels, width, height = decode_image(path)
+        return KIND_RGBA, pixels, (width, height, 0)
+
+    if relative_path.endswith(SOUND_EXTENSION):
+        try:
+            samples, channels, sample_size, sample_rate = decode_sound(path)
+            return KIND_PCM, samples, (channels, sample_size, sample_rate)
+        except Exception as error:
+            # Decoding needs a platform audio decoder, without one the sound is decoded when it is loaded instead
+            print(f"Storing {relative_path} undecoded: {error}")
+
+    with open(path, "rb") as file:
+        return KIND_FILE, file.read(), (0, 0, 0)
+
+def build_archive(output=ARCHIVE_NAME, root=".", directories=PACKED_DIRECTORIES):
+    """Pack every file in the directories into an archive, returning the number of entries."""
+    entries = []
+    for directory in directories:
+        for filename in sorted(os.listdir(os.path.join(root, directory))):
+            relative_path = f"{directory}/{filename}"
+            if os.path.isfile(os.path.join(root, relative_path)):
+                entries.append((relative_path, *pack_entry(root, relative_path)))
+
+    names = [relative_path.encode("utf-8") for relative_path, *_ in entries]
+    index_size = HEADER.size + sum(ENTRY.size + len(name) for name in names)
+
+    # Lay out the data after the index
+    offsets = []
+    offset = index_size
+    for _, _, data, _ in entries:
+        offset += -offset % ALIGNMENT
+        offsets.append(offset)
+        offset += len(data)
+
+    with open(output, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        for name, (_, kind, data, values), data_offset in zip(names, entries, offsets):
+            file.write(ENTRY.pack(len(name), kind, data_offset, len(data), *values) + name)
+
+        for (_, _, data, _), data_offset in zip(entries, offsets):
+            file.write(b"\0" * (data_offset - file.tell()))
+            file.write(data)
+
+    return len(entries)
+
+class AssetArchive:
+    """A memory-mapped asset archive."""
+    def __init__(self, path):
+        """Constructor"""
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+
+        magic, version, count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an asset archive, or is from a different version")
+
+        # Relative path -> (kind, offset, length, values)
+        self.index = {}
+        position = HEADER.size
+        for _ in range(count):
+            name_length, kind, offset, length, *values = ENTRY.unpack_from(self.map, position)
+            position += ENTRY.size
+            name = bytes(self.map[position:position + name_length]).decode("utf-8")
+            position += name_length
+            self.index[name] = (kind, offset, length, tuple(values))
+
+    def __contains__(self, relative_path):
+        return relative_path in self.index
+
+    def names(self, directory):
+        """Relative paths of every entry in a directory."""
+        prefix = directory.rstrip("/") + "/"
+        return [name for name in self.index if name.startswith(prefix)]
+
+    def data(self, relative_path):
+        """A zero-copy view of an entry's data."""
+        _, offset, length, _ = self.index[relative_path]
+        return self.view[offset:offset + length]
+
+    def read(self, relative_path):
+        """An entry's data as bytes."""
+        return bytes(self.data(relative_path))
+
+    def texture(self, relative_path):
+        """Load an image entry as an arcade texture using the mapped pixels, returning (texture, size in bytes)."""
+        import arcade
+        from PIL import Image
+
+        kind, _, length, (width, height, _) = self.index[relative_path]
+        if kind == KIND_RGBA:
+            # Shares the mapped memory rather than copying the pixels
+            image = Image.frombuffer("RGBA", (width, height), self.data(relative_path), "raw", "RGBA", 0, 1)
+        else:
+            image = Image.open(io.BytesIO(self.read(relative_path))).convert("RGBA")
+            length = image.width * image.height * 4
+
+        return arcade.Texture(relative_path, image=image), length
+
+    def sound(self, relative_path):
+        """Load a sound entry as an arcade sound playing from the mapped samples, returning (sound, size in bytes)."""
+        from . import pcm_source
+
+        kind, _, length, (channels, sample_size, sample_rate) = self.index[relative_path]
+        if kind != KIND_PCM:
+            return pcm_source.decoded_sound(relative_path, self.read(relative_path)), length
+
+        return pcm_source.mapped_sound(relative_path, self.data(relative_path), channels, sample_size, sample_rate), length
+
+    def close(self):
+        """Unmap the archive, anything loaded from it must no longer be used."""
+        self.view.release()
+        self.map.close()
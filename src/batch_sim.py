@@ -0,0 +1,233 @@
+"""
+Vectorized simulator which advances thousands of independent games at once with NumPy.
+
+Every piece of game state is an array with one row per game, so a single step() rolls for the current player of every
+unfinished game together. The board data (prices, taxes and the dense rent table) is taken from a MonopolyBoard so the
+numbers always match the regular game.
+
+Compared to engine.GameEngine the rules are simplified: cards are drawn without effect and every player buys every space
+and house they can afford.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import numpy as np
+
+from . import engine
+from . import game_state
+
+
+# Kinds of space, worked out from MonopolyBoard.land_action
+SPACE_OTHER    = 0
+SPACE_OWNABLE  = 1
+SPACE_TAX      = 2
+SPACE_GO_JAIL  = 3
+
+GO_BONUS      = 200
+STARTING_CASH = 1500
+
+
+class BoardArrays:
+    """The static board data from a MonopolyBoard converted to NumPy arrays."""
+    def __init__(self, board):
+        """Constructor"""
+        self.space_count = len(board.properties)
+
+        kinds = {"buy_space_option": SPACE_OWNABLE, "pay_tax": SPACE_TAX, "move_to_jail": SPACE_GO_JAIL}
+        # Asking as a player that can never own anything gives the action for an unowned space
+        self.kinds  = np.array([kinds.get(board.land_action(-1, prop["space_num"]), SPACE_OTHER) for prop in board.properties], dtype=np.int8)
+        self.prices = np.array([prop["price"] or 0 for prop in board.properties], dtype=np.int32)
+        self.taxes  = np.array([prop["rent-t0.1"] if kind == SPACE_TAX else 0 for prop, kind in zip(board.properties, self.kinds)], dtype=np.int32)
+        self.rents  = np.array(board.rent_table, dtype=np.int32).reshape(self.space_count, game_state.RENT_HOUSE_LEVELS, game_state.RENT_OWNED_LEVELS)
+
+        # Spaces outside a group always use the single owned rent tier
+        self.grouped = np.array([prop["group"] is not None for prop in board.properties])
+
+        # Members of each space's group, padded with an extra column of the owner array which is never owned
+        groups  = [prop["group"] for prop in board.properties]
+        members = [[i for i, group in enumerate(groups) if group is not None and group == groups[space]] for space in range(self.space_count)]
+        width   = max(len(group_members) for group_members in members)
+        self.group_members = np.full((self.space_count, width), self.space_count, dtype=np.intp)
+        for space, group_members in enumerate(members):
+            self.group_members[space, :len(group_members)] = group_members
+
+        # Groups that can have houses, as array indexes
+        self.build_groups = [np.array([prop["space_num"] - 1 for prop in board.properties_by_group(group)], dtype=np.intp) for group in engine.BUILD_GROUPS]
+
+class BatchSimulator:
+    """Plays N independent games in lockstep."""
+    def __init__(self, games, players=2, board=None, seed=None, starting_cash=STARTING_CASH, dice_source=None):
+        """Constructor"""
+        if players < 2 or players > 4:
+            raise ValueError("Number of players must be between 2 and 4")
+
+        self.board   = BoardArrays(board if board is not None else game_state.MonopolyBoard())
+        self.rng     = np.random.default_rng(seed)
+        # A dice.DiceSource can be given instead of a seed to share a replayable stream with other simulators
+        self.dice_source = dice_source
+        self.games   = games
+        self.players = players
+
+        spaces = self.board.space_count
+        # Positions are array indexes, so space_num - 1
+        self.position   = np.zeros((games, players), dtype=np.int16)
+        self.cash       = np.full((games, players), starting_cash, dtype=np.int32)
+        self.bankrupt   = np.zeros((games, players), dtype=bool)
+        self.jail_turns = np.zeros((games, players), dtype=np.int8)
+        self.in_jail    = np.zeros((games, players), dtype=bool)
+        # Owners use the same numbering as GameEngine, 0 is the bank and player N is N + 1. The extra column is never owned.
+        self.owner      = np.zeros((games, spaces + 1), dtype=np.int8)
+        self.owner[:, np.flatnonzero(self.board.kinds != SPACE_OWNABLE)] = -1
+        self.owner[:, spaces] = -1
+        self.houses     = np.zeros((games, spaces), dtype=np.int8)
+        self.current    = np.zeros(games, dtype=np.int8)
+        self.doubles    = np.zeros(games, dtype=np.int8)
+        self.turns      = np.zeros(games, dtype=np.int32)
+        self.winner     = np.full(games, -1, dtype=np.int8)
+
+    def step(self, max_turns=None):
+        """Make one roll in every unfinished game. Returns how many games were advanced."""
+        active = self.winner < 0
+        if max_turns is not None:
+            active &= self.turns < max_turns
+        g = np.flatnonzero(active)
+        if g.size == 0:
+            return 0
+
+        board = self.board
+        p     = self.current[g].astype(np.intp)
+        me    = (p + 1).astype(np.int8)
+
+        # Roll every game's dice in one go
+        if self.dice_source is not None:
+            dice = self.dice_source.vector((g.size, 2))
+        else:
+            dice = self.rng.integers(1, 7, size=(g.size, 2), dtype=np.int16)
+        total   = dice[:, 0] + dice[:, 1]
+        doubles = dice[:, 0] == dice[:, 1]
+
+        # Jail: doubles get out, otherwise pay the fine after the last attempt
+        jailed = self.in_jail[g, p]
+        stay   = jailed & ~doubles & (self.jail_turns[g, p] + 1 < engine.MAX_JAIL_TURNS)
+        fined  = jailed & ~doubles & ~stay
+        self.jail_turns[g[stay], p[stay]] += 1
+        self.cash[g[fined], p[fined]] -= engine.JAIL_FINE
+        released = jailed & ~stay
+        self.in_jail[g[released], p[released]]    = False
+        self.jail_turns[g[released], p[released]] = 0
+
+        # Too many doubles in a row is speeding
+        rolled_doubles = doubles & ~jailed
+        self.doubles[g] = np.where(rolled_doubles, self.doubles[g] + 1, 0)
+        speeding = self.doubles[g] >= engine.MAX_DOUBLES
+
+        # Move everyone who isn't staying in jail, collecting for passing Go
+        moving   = ~stay & ~speeding
+        position = self.position[g, p] + np.where(moving, total, 0)
+        passed   = position >= board.space_count
+        self.cash[g[passed], p[passed]] += GO_BONUS
+        position %= board.space_count
+        kind = board.kinds[position]
+
+        # Buy any unowned space the player can afford
+        owner = self.owner[g, position]
+        buy = moving & (kind == SPACE_OWNABLE) & (owner == 0) & (self.cash[g, p] >= board.prices[position])
+        self.owner[g[buy], position[buy]] = me[buy]
+        self.cash[g[buy], p[buy]] -= board.prices[position[buy]]
+
+        # Pay rent to another player, looked up in the dense rent table
+        due = moving & (owner > 0) & (owner != me)
+        if due.any():
+            dg, dpos, downer = g[due], position[due], owner[due]
+            houses = self.houses[dg, dpos]
+            owned  = (self.owner[dg[:, None], board.group_members[dpos]] == downer[:, None]).sum(axis=1)
+            owned  = np.where((houses > 0) | ~board.grouped[dpos], 1, owned)
+            rent   = board.rents[dpos, houses, owned]
+            self.cash[dg, p[due]] -= rent
+            self.cash[dg, downer.astype(np.intp) - 1] += rent
+
+        # Taxes go to the bank
+        taxed = moving & (kind == SPACE_TAX)
+        self.cash[g[taxed], p[taxed]] -= board.taxes[position[taxed]]
+
+        # Go to Jail space or speeding
+        jail = (moving & (kind == SPACE_GO_JAIL)) | speeding
+        position[jail] = engine.JAIL_SPACE - 1
+        self.in_jail[g[jail], p[jail]]    = True
+        self.jail_turns[g[jail], p[jail]] = 0
+        self.position[g, p] = position
+
+        self.build_houses(g[moving], p[moving], me[moving])
+        self.end_turn(g, p, rolled_doubles & ~jail)
+        return g.size
+
+    def build_houses(self, g, p, me):
+        """Build one house on every full group the current player owns and can afford."""
+        for members in self.board.build_groups:
+            owners = self.owner[g[:, None], members]
+            cost   = engine.HOUSE_COST * members.size
+            build  = (owners == me[:, None]).all(axis=1) & (self.houses[g, members[0]] < 5) & (self.cash[g, p] >= cost)
+            if build.any():
+                self.houses[g[build][:, None], members] += 1
+                self.cash[g[build], p[build]] -= cost
+
+    def end_turn(self, g, p, roll_again):
+        """Handle bankruptcy, winners and passing the dice on."""
+        self.turns[g] += 1
+
+        # Bankrupt players give their spaces back to the bank
+        broke = self.cash[g, p] < 0
+        if broke.any():
+            bg, bp = g[broke], p[broke]
+            self.bankrupt[bg, bp] = True
+            self.in_jail[bg, bp]  = False
+            lost = self.owner[bg, :-1] == (bp + 1)[:, None]
+            rows, spaces = np.nonzero(lost)
+            self.owner[bg[rows], spaces]  = 0
+            self.houses[bg[rows], spaces] = 0
+
+            # The last player standing wins
+            remaining = (~self.bankrupt[bg]).sum(axis=1)
+            won = bg[remaining == 1]
+            self.winner[won] = np.argmax(~self.bankrupt[won], axis=1)
+
+        # Pass the dice to the next player who is still in the game
+        passing = ~roll_again | broke
+        pg = g[passing]
+        self.doubles[pg] = 0
+        current = self.current[pg].astype(np.intp)
+        searching = np.arange(pg.size)
+        for _ in range(self.players):
+            current[searching] = (current[searching] + 1) % self.players
+            # Only the games that landed on a bankrupt player keep searching
+            searching = searching[self.bankrupt[pg[searching], current[searching]]]
+            if searching.size == 0:
+                break
+        self.current[pg] = current
+
+    def run(self, max_turns=1000):
+        """Play every game until it has a winner or reaches max_turns rolls, returning the outcomes."""
+        while self.step(max_turns):
+            pass
+
+        return self.outcomes()
+
+    def outcomes(self):
+        """Per-game results as a dictionary of arrays."""
+        return {
+            "winner":     self.winner.copy(),
+            "turns":      self.turns.copy(),
+            "cash":       self.cash.copy(),
+            "bankrupt":   self.bankrupt.copy(),
+            "properties": np.stack([(self.owner[:, :-1] == player + 1).sum(axis=1) for player in range(self.players)], axis=1),
+        }
+
+    def summary(self):
+        """Win rates for each player and the share of unfinished games."""
+        wins = np.bincount(self.winner[self.winner >= 0], minlength=self.players)
+        return {
+            "games":      self.games,
+            "win_rate":   (wins / self.games).tolist(),
+            "unfinished": float((self.winner < 0).mean()),
+            "mean_turns": float(self.turns.mean()),
+        }
@@ -0,0 +1,218 @@
+"""
+Micro and macro benchmarks for the game logic, with a history file and regression checks against a baseline.
+
+Micro benchmarks time single board operations, card draws and dice rolls in nanoseconds per call. Macro benchmarks time
+whole headless games in microseconds per turn. Every run is appended to a JSONL history file, and compare checks the
+newest run against a stored baseline, failing when anything is slower by more than the threshold.
+
+Run with python -m src.benchmarks run|baseline|compare from the root of the project.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import timeit
+
+from . import common
+from . import compact_board
+from . import dice
+from . import engine
+from . import game_state
+from . import sim_farm
+
+
+HISTORY_PATH  = os.path.join("dev", "benchmarks", "history.jsonl")
+BASELINE_PATH = os.path.join("dev", "benchmarks", "baseline.json")
+
+# Slower than the baseline by more than this fraction counts as a regression
+DEFAULT_THRESHOLD = 0.10
+# Timings are the best of this many repeats, which is the least affected by other work on the machine
+REPEATS = 5
+
+MACRO_GAMES     = 20
+MACRO_MAX_TURNS = 1000
+
+
+def sample_board(board):
+    """Give a board a mix of owners and houses so the benchmarks take the same paths as a game in progress."""
+    for space_num in (2, 4, 6, 13, 16, 17, 19, 20, 38, 40):
+        board.set_owner(space_num, 1)
+    for space_num in (7, 9, 10, 26, 29):
+        board.set_owner(space_num, 2)
+    board.add_house(17)
+    board.add_house(38)
+    return board
+
+def micro_benchmarks():
+    """Return name to (statement, namespace) for every micro benchmark, and the number of calls each statement makes.
+
+    Statements loop over every space so the timings aren't taken from a single space.
+    """
+    spaces = list(range(1, 41))
+    benchmarks = {}
+
+    for prefix, board in (("board", sample_board(game_state.MonopolyBoard())), ("compact", sample_board(compact_board.CompactBoard()))):
+        namespace = {"board": board, "spaces": spaces}
+        benchmarks[f"{prefix}.property_by_space_num"] = ("for s in spaces: board.property_by_space_num(s)", namespace)
+        benchmarks[f"{prefix}.rent_cost"]             = ("for s in spaces: board.rent_cost(s, 3)", namespace)
+        benchmarks[f"{prefix}.land_action"]           = ("for s in spaces: board.land_action(3, s)", namespace)
+        benchmarks[f"{prefix}.full_group"]            = ("for s in spaces: board.full_group(s)", namespace)
+        benchmarks[f"{prefix}.can_buy_houses"]        = ("for s in spaces: board.can_buy_houses(s, 1000)", namespace)
+
+    rng = random.Random(0)
+    source = dice.DiceSource(0)
+    benchmarks["cards.draw_card"]          = ("for _ in spaces: draw_card('chance', rng)", {"draw_card": game_state.draw_card, "rng": rng, "spaces": spaces})
+    benchmarks["dice.roll_dice_random"]    = ("for _ in spaces: roll_dice(rng=rng)", {"roll_dice": common.roll_dice, "rng": rng, "spaces": spaces})
+    benchmarks["dice.roll_dice_buffered"]  = ("for _ in spaces: roll_dice(rng=source)", {"roll_dice": common.roll_dice, "source": source, "spaces": spaces})
+
+    return benchmarks, len(spaces)
+
+def time_statement(statement, namespace, calls):
+    """Nanoseconds per call of the statement, which makes calls calls each time it runs."""
+    timer = timeit.Timer(statement, globals=namespace)
+    number, _ = timer.autorange()
+    return min(timer.repeat(REPEATS, number)) / (number * calls) * 1e9
+
+def time_games(play, games):
+    """Microseconds per turn over a number of games, play(index) plays one game and returns the turns it took."""
+    best = None
+    for _ in range(REPEATS):
+        start = timeit.default_timer()
+        turns = sum(play(index) for index in range(games))
+        elapsed = timeit.default_timer() - start
+        best = elapsed / turns if best is None else min(best, elapsed / turns)
+    return best * 1e6
+
+def macro_benchmarks():
+    """Name to a play(index) function for every macro benchmark."""
+    def engine_game(index):
+        return sim_farm.play_game(sim_farm.game_seed("benchmark", index), 2, MACRO_MAX_TURNS).turn
+
+    def engine_game_4(index):
+        return sim_farm.play_game(sim_farm.game_seed("benchmark", index), 4, MACRO_MAX_TURNS).turn
+
+    def compact_game(index):
+        game = engine.GameEngine(sim_farm.new_players(2), compact_board.CompactBoard(), rng=dice.DiceSource(sim_farm.game_seed("benchmark", index)))
+        game.play(MACRO_MAX_TURNS)
+        return game.turn
+
+    return {
+        "game.engine_2p":  engine_game,
+        "game.engine_4p":  engine_game_4,
+        "game.compact_2p": compact_game,
+    }
+
+def git_commit():
+    """The current commit, or None outside of a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(only=None):
+    """Run the benchmarks (optionally only names starting with only) and return a history record."""
+    results = {}
+
+    benchmarks, calls = micro_benchmarks()
+    for name, (statement, namespace) in benchmarks.items():
+        if only is None or name.startswith(only):
+            results[name] = {"value": time_statement(statement, namespace, calls), "unit": "ns/call"}
+
+    for name, play in macro_benchmarks().items():
+        if only is None or name.startswith(only):
+            results[name] = {"value": time_games(play, MACRO_GAMES), "unit": "us/turn"}
+
+    return {
+        "time":     datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit":   git_commit(),
+        "python":   platform.python_version(),
+        "platform": platform.platform(),
+        "results":  results,
+    }
+
+def append_history(record, path=HISTORY_PATH):
+    """Add a run to the history file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(json.dumps(record) + "\n")
+
+def latest_history(path=HISTORY_PATH):
+    """The newest run in the history file, or None if there isn't one."""
+    record = None
+    try:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+    except FileNotFoundError:
+        pass
+    return record
+
+def compare(baseline, record, threshold=DEFAULT_THRESHOLD):
+    """Compare a run to the baseline, returning rows of (name, baseline, current, change, regressed).
+
+    Every benchmark is lower-is-better, so a positive change is slower.
+    """
+    rows = []
+    for name, result in record["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]["value"]
+        change = result["value"] / before - 1
+        rows.append((name, before, result["value"], change, change > threshold))
+    return rows
+
+def print_results(record):
+    """Print a run as a table."""
+    for name, result in record["results"].items():
+        print(f"{name:<32} {result['value']:10.1f} {result['unit']}")
+
+def main():
+    """Command line entrypoint."""
+    parser = argparse.ArgumentParser(description="Benchmark the game logic.")
+    parser.add_argument("command", choices=("run", "baseline", "compare"), help="run: benchmark and add to the history, baseline: store the newest run as the baseline, compare: check the newest run against the baseline")
+    parser.add_argument("--only", default=None, help="only run benchmarks whose names start with this")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="fraction slower than the baseline that counts as a regression")
+    parser.add_argument("--no-run", action="store_true", help="compare the newest run in the history without running again")
+    args = parser.parse_args()
+
+    if args.command == "run" or (args.command == "compare" and not args.no_run):
+        record = run(args.only)
+        append_history(record, args.history)
+        print_results(record)
+    else:
+        record = latest_history(args.history)
+        if record is None:
+            sys.exit(f"No runs in {args.history}, use the run command first")
+
+    if args.command == "baseline":
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(record, file, indent=4)
+        print(f"Baseline set from the run at {record['time']}")
+
+    elif args.command == "compare":
+        try:
+            with open(args.baseline, encoding="utf-8") as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            sys.exit(f"No baseline at {args.baseline}, use the baseline command first")
+
+        rows = compare(baseline, record, args.threshold)
+        print()
+        for name, before, after, change, regressed in rows:
+            print(f"{name:<32} {before:10.1f} -> {after:10.1f} {change:+7.1%}{'  REGRESSION' if regressed else ''}")
+
+        if any(row[4] for row in rows):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
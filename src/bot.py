@@ -0,0 +1,228 @@
+"""
+Computer players which decide whether to buy spaces and build houses with Monte Carlo Tree Search.
+
+The engine asks a policy every time a player could buy a space or build on a group. A bot answers by copying the game
+at that moment into a search_state.SearchState, then playing random games out from both answers. UCB1 shares the
+rollouts between the answers, and the one with the best average result is picked. Each decision has a time budget.
+Rollouts run in worker processes, each with its own tree for the same decision (root parallel MCTS), and their results
+are added together.
+
+The GUI calls take_turn from a background thread, so the render thread only waits on a future while the workers think.
+Closing the pool stops any search still waiting on it, and the bot passes on that decision, so the turn's thread can
+finish and the game can exit.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+
+from . import dice
+from . import engine
+from . import game_state
+from . import search_state
+
+
+DEFAULT_TIME_BUDGET   = 0.5
+# Rollouts stop after this many turns and score the players on their net worth instead
+DEFAULT_ROLLOUT_TURNS = 150
+EXPLORATION           = math.sqrt(2)
+# Seconds between checks of whether the pool has been closed while waiting on the workers
+POLL_INTERVAL         = 0.1
+
+# The answers a bot chooses between, as indexes into the rollout totals
+CHOICES = (False, True)
+
+# Worker processes shared by every bot, created on the first decision
+pool = None
+pool_workers = None
+pool_lock = threading.Lock()
+# Set once the pool is closed for good, searches still waiting on it give up
+stopping = threading.Event()
+
+
+def default_workers():
+    """One worker process per core, leaving a core for the render thread, but always at least one."""
+    return max(1, (os.cpu_count() or 1) - 1)
+
+def get_pool(workers):
+    """Return the shared worker pool, starting it if needed, or None once close_pool has been called."""
+    global pool, pool_workers
+
+    with pool_lock:
+        if stopping.is_set():
+            return None
+
+        if pool is None or pool_workers != workers:
+            terminate_pool()
+            # Forking a process which has a window and audio device open isn't safe, so always start fresh interpreters
+            pool = multiprocessing.get_context("spawn").Pool(workers)
+            pool_workers = workers
+
+        return pool
+
+def terminate_pool():
+    """Stop the worker processes, pool_lock must be held."""
+    global pool, pool_workers
+
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+        pool = None
+        pool_workers = None
+
+def close_pool():
+    """Stop the shared worker processes for good, any search waiting on them gives up."""
+    # Set first, a terminated pool never finishes the searches it was running
+    stopping.set()
+    with pool_lock:
+        terminate_pool()
+
+def wait_for_workers(result):
+    """Wait for the workers' results from map_async, or return None if the pool is closed first."""
+    while True:
+        try:
+            return result.get(POLL_INTERVAL)
+        except multiprocessing.TimeoutError:
+            if stopping.is_set():
+                return None
+
+def net_worth(state, player):
+    """Cash plus the price of every space and house the player owns."""
+    owner_id = state.owner_id(player)
+    data = state.board.data
+    worth = state.players.cash[player]
+    for index, owner in enumerate(state.board.owners):
+        if owner == owner_id:
+            worth += data.prices[index] + max(state.board.houses[index], 0) * engine.HOUSE_COST
+    return worth
+
+def score(state, player):
+    """How well a finished (or cut short) rollout went for the player, between 0 and 1."""
+    if state.winner is not None:
+        return 1.0 if state.winner == player else 0.0
+    if state.bankrupt[player]:
+        return 0.0
+
+    worths = [max(net_worth(state, other), 0) for other in state.active_players()]
+    return max(net_worth(state, player), 0) / (sum(worths) or 1)
+
+def play_choice(state, kind, player, space_num, choice):
+    """Carry out an answer to a decision and finish the turn it was made in.
+
+    The decision is made part way through a turn, so the rest of it is played here. A bonus roll from doubles is not
+    played, since the roll isn't part of the snapshot.
+    """
+    events = []
+    if kind == "buy":
+        if choice:
+            price = state.board.property_by_space_num(space_num)["price"]
+            state.players.cash[player] -= price
+            state.board.set_owner(space_num, state.owner_id(player))
+        state.build_houses(events, player)
+    elif choice:
+        group = state.board.property_by_space_num(space_num)["group"]
+        state.players.cash[player] -= engine.HOUSE_COST * state.board.group_property_count(group)
+        state.board.add_house(space_num)
+
+    state.end_turn(events, player, roll_again=False)
+
+def search(task):
+    """Worker entrypoint, runs UCB1 over the answers to one decision until the time budget runs out.
+
+    Returns [total score, rollouts] for each answer in CHOICES.
+    """
+    snapshot, names, pieces, kind, player, space_num, time_budget, rollout_turns, seed = task
+    deadline = time.perf_counter() + time_budget
+
+    state = search_state.SearchState(game_state.PlayerInfo(dict(zip(names, pieces))), rng=dice.DiceSource(seed, buffer_size=4096))
+    results = [[0.0, 0] for _ in CHOICES]
+
+    rollouts = 0
+    while True:
+        # Try every answer once before trusting the averages
+        if rollouts < len(CHOICES):
+            choice = rollouts
+        else:
+            log_total = math.log(rollouts)
+            choice = max(range(len(CHOICES)), key=lambda i: results[i][0] / results[i][1] + EXPLORATION * math.sqrt(log_total / results[i][1]))
+
+        state.restore(snapshot)
+        play_choice(state, kind, player, space_num, CHOICES[choice])
+        state.play(state.turn + rollout_turns)
+
+        results[choice][0] += score(state, player)
+        results[choice][1] += 1
+        rollouts += 1
+
+        if rollouts >= len(CHOICES) and time.perf_counter() >= deadline:
+            return results
+
+class MCTSBot:
+    """A computer player's buy and build decisions, see seat_policies to use bots alongside human players."""
+    def __init__(self, time_budget=DEFAULT_TIME_BUDGET, workers=None, rollout_turns=DEFAULT_ROLLOUT_TURNS, rng=None):
+        """Constructor, workers is the number of worker processes and defaults to one per core (less one).
+
+        0 runs rollouts in the calling thread instead, for headless games which already run in their own processes.
+        """
+        self.time_budget   = time_budget
+        self.workers       = workers if workers is not None else default_workers()
+        self.rollout_turns = rollout_turns
+        self.rng           = rng if rng is not None else random.Random()
+        # Rollout totals of the last decision, handy for showing how sure the bot was
+        self.last_results  = None
+
+    def decide(self, game, kind, player, space_num):
+        """Search the decision and return True to buy the space or build on the group."""
+        snapshot = search_state.snapshot_of(game)
+        tasks = [
+            (snapshot, game.players.player_names, game.players.player_pieces, kind, player, space_num, self.time_budget, self.rollout_turns, self.rng.getrandbits(64))
+            for _ in range(max(self.workers, 1))
+        ]
+
+        if self.workers == 0:
+            worker_results = map(search, tasks)
+        else:
+            worker_pool = get_pool(self.workers)
+            worker_results = wait_for_workers(worker_pool.map_async(search, tasks)) if worker_pool is not None else None
+            # The game was closed while the bot was thinking, so the decision is passed on and the turn can finish
+            if worker_results is None:
+                return False
+
+        # Root parallel, so every worker's totals for an answer are simply added up
+        results = [[0.0, 0] for _ in CHOICES]
+        for worker in worker_results:
+            for total, (worker_score, worker_rollouts) in zip(results, worker):
+                total[0] += worker_score
+                total[1] += worker_rollouts
+
+        self.last_results = results
+        best = max(range(len(CHOICES)), key=lambda i: results[i][0] / max(results[i][1], 1))
+        return CHOICES[best]
+
+    def buy_policy(self, game, player, space_num):
+        """Engine buy policy."""
+        return self.decide(game, "buy", player, space_num)
+
+    def build_policy(self, game, player, space_num):
+        """Engine build policy."""
+        return self.decide(game, "build", player, space_num)
+
+def seat_policies(bots):
+    """Build engine buy and build policies from a dictionary of player number to MCTSBot.
+
+    Players without a bot use the engine's default policies.
+    """
+    def buy_policy(game, player, space_num):
+        bot = bots.get(player)
+        return bot.buy_policy(game, player, space_num) if bot is not None else engine.always_buy(game, player, space_num)
+
+    def build_policy(game, player, space_num):
+        bot = bots.get(player)
+        return bot.build_policy(game, player, space_num) if bot is not None else engine.always_build(game, player, space_num)
+
+    return buy_policy, build_policy
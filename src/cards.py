@@ -0,0 +1,221 @@
+"""
+Chance and Community Chest decks, and the table driven engine which carries out what each card says.
+
+Decks are shuffled once and drawn from the top in O(1), only reshuffling when they run out. A Get Out of Jail Free card
+leaves the deck while a player holds it and goes back to the bottom once it is used.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import random
+
+from . import game_state
+
+
+SPACE_COUNT = len(game_state.BOARD_SPACES)
+
+
+def nearest_table(space_type):
+    """For each space (indexed by space_num - 1) the space_num of the next space of the given type going forward."""
+    targets = [space["space_num"] for space in game_state.BOARD_SPACES if space["type"] == space_type]
+    return tuple(min(targets, key=lambda target: (target - space_num) % SPACE_COUNT) for space_num in range(1, SPACE_COUNT + 1))
+
+# Precomputed once so the cards never have to search the board
+NEAREST_RAILROAD = nearest_table("railroad")
+NEAREST_UTILITY  = nearest_table("utility")
+
+# What every card does, as (effect, value). The effect names are the keys of EFFECT_HANDLERS.
+CARD_EFFECTS = {
+    # Chance
+    "Advance to Boardwalk.":                                                    ("advance", 40),
+    "Advance to Go (Collect $200).":                                            ("advance", 1),
+    "Advance to Illinois Avenue. If you pass Go, collect $200.":                ("advance", 25),
+    "Advance to St. Charles Place. If you pass Go, collect $200.":              ("advance", 12),
+    "Advance to the nearest Railroad. If unowned, you may buy it from the Bank. If owned, pay wonder twice the rental to which they are otherwise entitled.": ("nearest_railroad", 2),
+    "Advance token to nearest Utility. If unowned, you may buy it from the Bank. If owned, throw dice and pay owner a total ten times amount thrown.":       ("nearest_utility", 10),
+    "Bank pays you dividend of $50.":                                           ("collect", 50),
+    "Get Out of Jail Free.":                                                    ("jail_free", None),
+    "Go Back 3 Spaces.":                                                        ("back", 3),
+    "Go to Jail. Go directly to Jail, do not pass Go, do not collect $200.":    ("jail", None),
+    "Make general repairs on all your property. For each house pay $25. For each hotel pay $100.": ("repairs", (25, 100)),
+    "Speeding fine $15.":                                                       ("pay", 15),
+    "Take a trip to Reading Railroad. If you pass Go, collect $200.":           ("advance", 6),
+    "You have been elected Chairman of the Board. Pay each player $50.":        ("pay_each", 50),
+    "Your building loan matures. Collect $150":                                 ("collect", 150),
+    # Community Chest
+    "Community Chest":                                                          ("nothing", None),
+    "Advance to Go (Collect $200)":                                             ("advance", 1),
+    "Bank error in your favor. Collect $200":                                   ("collect", 200),
+    "Doctor’s fee. Pay $50":                                                    ("pay", 50),
+    "From sale of stock you get $50":                                           ("collect", 50),
+    "Get Out of Jail Free":                                                     ("jail_free", None),
+    "Go to Jail. Go directly to jail, do not pass Go, do not collect $200":     ("jail", None),
+    "Holiday fund matures. Receive $100":                                       ("collect", 100),
+    "Income tax refund. Collect $20":                                           ("collect", 20),
+    "It is your birthday. Collect $10 from every player":                       ("collect_each", 10),
+    "Life insurance matures. Collect $100":                                     ("collect", 100),
+    "Pay hospital fees of $100":                                                ("pay", 100),
+    "Pay school fees of $50":                                                   ("pay", 50),
+    "Receive $25 consultancy fee":                                              ("collect", 25),
+    "You are assessed for street repair. $40 per house. $115 per hotel":        ("repairs", (40, 115)),
+    "You have won second prize in a beauty contest. Collect $10":               ("collect", 10),
+    "You inherit $100":                                                         ("collect", 100),
+}
+
+# Every deck by name, matching the names used in card events
+DECK_CARDS = {
+    "chance":    game_state.CHANCE_CARDS,
+    "community": game_state.COMMUNITY_CARDS,
+}
+
+
+class Deck:
+    """A shuffled deck of cards that is drawn from the top, reshuffling when it runs out."""
+    def __init__(self, cards, rng=random):
+        """Constructor"""
+        self.cards    = tuple(cards)
+        self.rng      = rng
+        # Indexes of cards currently held by players, these stay out of the deck until they are returned
+        self.held     = set()
+        self.order    = []
+        self.position = 0
+        self.shuffle()
+
+    def shuffle(self):
+        """Shuffle every card that isn't held by a player back into the deck."""
+        self.order = [index for index in range(len(self.cards)) if index not in self.held]
+        self.rng.shuffle(self.order)
+        self.position = 0
+
+    def draw(self):
+        """Draw the top card and return its index into self.cards."""
+        if self.position >= len(self.order):
+            self.shuffle()
+
+        index = self.order[self.position]
+        self.position += 1
+
+        # Get Out of Jail Free cards are kept by the player
+        if CARD_EFFECTS.get(self.cards[index], ("nothing", None))[0] == "jail_free":
+            self.held.add(index)
+
+        return index
+
+    def draw_text(self):
+        """Draw the top card and return its text, like game_state.draw_card."""
+        return self.cards[self.draw()]
+
+    def copy(self, rng=None):
+        """Return a copy of the deck in the same order, without shuffling again."""
+        deck = Deck.__new__(Deck)
+        deck.cards    = self.cards
+        deck.rng      = rng if rng is not None else self.rng
+        deck.held     = set(self.held)
+        deck.order    = self.order[:]
+        deck.position = self.position
+        return deck
+
+    def return_card(self, index):
+        """Put a held card back on the bottom of the deck."""
+        self.held.discard(index)
+        self.order.append(index)
+
+def new_decks(rng=random):
+    """Create a freshly shuffled deck for each deck name."""
+    return {name: Deck(cards, rng) for name, cards in DECK_CARDS.items()}
+
+def apply_card(game, events, player, deck_name, index):
+    """Carry out a drawn card for the player on an engine.GameEngine."""
+    text = game.decks[deck_name].cards[index]
+    events.append(("card", player, deck_name, text))
+
+    effect, value = CARD_EFFECTS.get(text, ("nothing", None))
+    EFFECT_HANDLERS[effect](game, events, player, value, deck_name, index)
+
+def advance(game, events, player, space_num, deck_name, index):
+    """Move forward to a space, collecting $200 for passing Go, and carry out that space."""
+    game.move_to(events, player, space_num)
+    game.resolve_space(events, player)
+
+def advance_nearest(table):
+    """Build a handler which moves forward to the nearest space in table and pays a multiple of the normal rent."""
+    def handler(game, events, player, multiplier, deck_name, index):
+        space_num = table[game.players.space_number[player] - 1]
+        game.move_to(events, player, space_num)
+
+        owner = game.board.property_by_space_num(space_num)["owner"]
+        if not owner or owner == game.owner_id(player):
+            # Unowned spaces can be bought as normal
+            game.resolve_space(events, player)
+        elif table is NEAREST_UTILITY:
+            # Utilities charge a multiple of a fresh throw of the dice
+            roll = game.roll_dice(count=2, rolls=1, sides=6, rng=game.rng)[0]
+            game.pay_player(events, player, owner - 1, multiplier * sum(roll), space_num)
+        else:
+            game.pay_player(events, player, owner - 1, multiplier * game.board.rent_cost(space_num, game.owner_id(player)), space_num)
+    return handler
+
+def go_back(game, events, player, spaces, deck_name, index):
+    """Move backwards without passing Go and carry out the new space."""
+    game.players.space_number[player] = (game.players.space_number[player] - 1 - spaces) % SPACE_COUNT + 1
+    events.append(("move", player, game.players.space_number[player]))
+    game.resolve_space(events, player)
+
+def go_to_jail(game, events, player, value, deck_name, index):
+    """Go directly to jail."""
+    game.send_to_jail(events, player)
+
+def jail_free(game, events, player, value, deck_name, index):
+    """Keep the card until it is used to get out of jail."""
+    game.jail_free_cards[player].append((deck_name, index))
+
+def collect(game, events, player, amount, deck_name, index):
+    """Collect money from the bank."""
+    game.collect(events, player, amount)
+
+def pay(game, events, player, amount, deck_name, index):
+    """Pay money to the bank."""
+    game.pay(events, player, amount)
+
+def collect_each(game, events, player, amount, deck_name, index):
+    """Collect money from every other player still in the game."""
+    for other in game.active_players():
+        if other != player:
+            game.pay_player(events, other, player, amount)
+
+def pay_each(game, events, player, amount, deck_name, index):
+    """Pay money to every other player still in the game."""
+    for other in game.active_players():
+        if other != player:
+            game.pay_player(events, player, other, amount)
+
+def repairs(game, events, player, costs, deck_name, index):
+    """Pay for every house and hotel the player owns, 5 houses counts as a hotel."""
+    house_cost, hotel_cost = costs
+    owner_id = game.owner_id(player)
+    total = 0
+    for prop in game.board.properties:
+        if prop["owner"] == owner_id and prop["houses"]:
+            total += hotel_cost if prop["houses"] == 5 else house_cost * prop["houses"]
+
+    if total:
+        game.pay(events, player, total)
+
+def nothing(game, events, player, value, deck_name, index):
+    """Cards that have no effect."""
+
+# Effect names from CARD_EFFECTS to the function that carries them out
+EFFECT_HANDLERS = {
+    "advance":          advance,
+    "nearest_railroad": advance_nearest(NEAREST_RAILROAD),
+    "nearest_utility":  advance_nearest(NEAREST_UTILITY),
+    "back":             go_back,
+    "jail":             go_to_jail,
+    "jail_free":        jail_free,
+    "collect":          collect,
+    "pay":              pay,
+    "collect_each":     collect_each,
+    "pay_each":         pay_each,
+    "repairs":          repairs,
+    "nothing":          nothing,
+}
@@ -4,11 +4,15 @@ Contains common variables and helper functions used throughout the game.
 Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
 """
 
-import arcade
+import collections
 import os
-import random
 import sys
+import threading
 import webbrowser
+from collections.abc import Mapping
+
+from . import asset_pack
+from . import dice
 
 
 class App:
@@ -29,30 +33,199 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
-# Load the audio files into a dictionary where the key is the name
-audio = {}
+# Opened the first time an asset is loaded, False when there is no archive
+archive = None
+
+def asset_archive():
+    """The packed asset archive (see asset_pack), or None when running from loose files"""
+    global archive
+    if archive is None:
+        path = resource_path(asset_pack.ARCHIVE_NAME)
+        archive = asset_pack.AssetArchive(path) if os.path.exists(path) else False
+    return archive or None
+
+def resource_exists(relative_path):
+    """Whether a resource is in the archive or on disk"""
+    pack = asset_archive()
+    return (pack is not None and relative_path in pack) or os.path.exists(resource_path(relative_path))
+
+def read_resource(relative_path):
+    """Read a resource as bytes, from the archive if it is there"""
+    pack = asset_archive()
+    if pack is not None and relative_path in pack:
+        return pack.read(relative_path)
+
+    with open(resource_path(relative_path), "rb") as file:
+        return file.read()
+
+def load_sound(relative_path):
+    """Load a sound, returning the sound and roughly how many bytes it takes decoded"""
+    pack = asset_archive()
+    if pack is not None and relative_path in pack:
+        return pack.sound(relative_path)
+
+    # arcade is only imported when assets are needed so the game logic can run without a window or audio device
+    import arcade
+
+    path = resource_path(relative_path)
+    sound = arcade.load_sound(path)
+    try:
+        # 16 bit stereo at 44.1kHz
+        size = int(sound.get_length() * 44100 * 4)
+    except Exception:
+        size = os.path.getsize(path)
+    return sound, size
+
+def stream_sound(relative_path):
+    """Open a long sound, like music, to be decoded a little at a time as it plays instead of all before it starts.
+
+    Only one copy of a streamed sound can play at a time. Sounds in the archive are already decoded, so those play
+    straight from it.
+    """
+    pack = asset_archive()
+    if pack is not None and relative_path in pack:
+        return pack.sound(relative_path)[0]
+
+    import arcade
+
+    return arcade.load_sound(resource_path(relative_path), streaming=True)
+
+def load_texture(relative_path):
+    """Load an image, returning the texture and how many bytes its RGBA pixels take"""
+    pack = asset_archive()
+    if pack is not None and relative_path in pack:
+        return pack.texture(relative_path)
+
+    import arcade
+
+    texture = arcade.load_texture(resource_path(relative_path))
+    return texture, texture.width * texture.height * 4
+
+class AssetRegistry(Mapping):
+    """Assets from a directory by name, each loaded the first time it is used rather than all up front.
+
+    Once more than budget bytes are loaded the least recently used assets are dropped, and loaded again if they are
+    needed later. Pinned assets are never dropped. warm_up loads assets on a background
+    thread ahead of time.
+    """
+    def __init__(self, directory, extension, loader, budget):
+        """Constructor"""
+        self.directory = directory
+        self.extension = extension
+        self.loader    = loader
+        self.budget    = budget
+        # name -> (asset, size), oldest use first
+        self.loaded    = collections.OrderedDict()
+        self.used      = 0
+        self.pinned    = set()
+        self.names     = None
+        self.lock      = threading.Lock()
+        # One lock per asset so two threads never load the same file, without blocking loads of other assets
+        self.load_locks = {}
+
+    def asset_names(self):
+        """Names of every asset in the directory, only listed when first needed"""
+        if self.names is None:
+            names = []
+            pack = asset_archive()
+            if pack is not None:
+                filenames = [os.path.basename(relative_path) for relative_path in pack.names(self.directory)]
+            else:
+                filenames = os.listdir(resource_path(self.directory))
+
+            for filename in sorted(filenames):
+                if filename.endswith(self.extension):
+                    names.append(os.path.splitext(filename)[0])
+                else:
+                    print(f"Ignoring non-{self.extension[1:]} file in {self.directory}: {filename}")
+            self.names = names
+        return self.names
+
+    def __getitem__(self, name):
+        with self.lock:
+            if name in self.loaded:
+                self.loaded.move_to_end(name)
+                return self.loaded[name][0]
+            load_lock = self.load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            # Another thread may have loaded it while this one waited
+            with self.lock:
+                if name in self.loaded:
+                    self.loaded.move_to_end(name)
+                    return self.loaded[name][0]
+
+            relative_path = self.directory + name + self.extension
+            if not resource_exists(relative_path):
+                raise KeyError(name)
+            asset, size = self.loader(relative_path)
+
+            with self.lock:
+                self.loaded[name] = (asset, size)
+                self.used += size
+                self.evict()
+
+        return asset
+
+    def __iter__(self):
+        return iter(self.asset_names())
+
+    def __len__(self):
+        return len(self.asset_names())
+
+    def __contains__(self, name):
+        return name in self.asset_names()
+
+    def evict(self):
+        """Drop the least recently used unpinned assets until the budget is met, the lock must be held"""
+        for name in list(self.loaded):
+            if self.used <= self.budget:
+                break
+            if name not in self.pinned:
+                self.used -= self.loaded.pop(name)[1]
+
+    def pin(self, name):
+        """Keep an asset loaded whatever the budget, loading it now if needed"""
+        with self.lock:
+            self.pinned.add(name)
+        return self[name]
+
+    def unpin(self, name):
+        """Allow an asset to be dropped again"""
+        with self.lock:
+            self.pinned.discard(name)
+            self.evict()
+
+    def warm_up(self, names=None, skip=()):
+        """Load assets (all of them by default, less any in skip) on a background thread, stopping before the budget
+        would be exceeded"""
+        def load():
+            for name in names if names is not None else self.asset_names():
+                if name in skip:
+                    continue
+                if self.used >= self.budget:
+                    break
+                self[name]
 
-for filename in os.listdir(resource_path("audio/")):
-    if filename.endswith(".mp3"):
-        audio[os.path.splitext(filename)[0]] = arcade.load_sound(os.path.join(resource_path("audio/"), filename))
-    else:
-        print("Ignoring non-mp3 audio file: " + filename)
+        thread = threading.Thread(target=load, name=f"warm up {self.directory}", daemon=True)
+        thread.start()
+        return thread
 
-#Load the image files into a dictionary where the key is the name
-graphics = {}
+# Loaded on first use, see AssetRegistry
+audio    = AssetRegistry("audio/", ".mp3", load_sound, budget=64 * 1024 * 1024)
+graphics = AssetRegistry("graphics/", ".png", load_texture, budget=128 * 1024 * 1024)
 
-# List all files in the graphics directory
-for filename in os.listdir(resource_path("graphics/")):
-    if filename.endswith(".png"):
-        graphics[os.path.splitext(filename)[0]] = arcade.load_texture(os.path.join(resource_path("graphics/"), filename))
-    else:
-        print("Ignoring non-png graphics file: " + filename)
+def roll_dice(count=2, rolls=1, sides=6, rng=None):
+    """Reusable function for dice roles, rng can be a random.Random to get a separate seedable stream"""
+    # By default the dice come from the shared pre-generated buffer
+    if rng is None:
+        rng = dice.default_source
+    if isinstance(rng, dice.DiceSource):
+        return rng.rolls(count, rolls, sides)
 
-def roll_dice(count=2, rolls=1, sides=6):
-    """Reusable function for dice roles"""    
     results = []
     for _ in range(rolls):
-        roll_result = tuple(random.randint(1, sides) for _ in range(count))
+        roll_result = tuple(rng.randint(1, sides) for _ in range(count))
         results.append(roll_result)
 
     return results
@@ -62,8 +235,7 @@ def open_help():
     output_path = os.path.join(os.getenv("TEMP"), "user-guide.html");
 
     # Read the internally packaged documentation
-    with open(resource_path("documentation/user-guide.html"), "r", encoding="utf-8") as file:
-        help_content = file.read()
+    help_content = read_resource("documentation/user-guide.html").decode("utf-8")
 
     # Write it to a %TEMP%
     with open(output_path, "w") as file:
@@ -77,8 +249,7 @@ def open_credits():
     output_path = os.path.join(os.getenv("TEMP"), "credits.txt");
 
     # Read the internally packaged documentation
-    with open(resource_path("audio/audio_sources.txt"), "r", encoding="utf-8") as file:
-        credits_content = file.read()
+    credits_content = read_resource("audio/audio_sources.txt").decode("utf-8")
 
     # Write it to a %TEMP%
     with open(output_path, "w") as file:
@@ -0,0 +1,263 @@
+"""
+A compact, array backed version of the board for when many boards need to be kept in memory at once.
+
+The static information about each space (price, group, type, rent tiers) is stored once in shared immutable arrays. Each
+board only keeps the mutable state (owner and houses) in two small arrays.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+from array import array
+from collections.abc import MutableMapping
+
+from . import game_state
+
+
+# The rent keys in the order they are stored in the rent arrays, tier 0-3 are the unimproved rents and 4-8 are the house rents
+RENT_KEYS = ("rent-t0.1", "rent-t0.2", "rent-t0.3", "rent-t0.4", "rent-t1", "rent-t2", "rent-t3", "rent-t4", "rent-t5")
+RENT_TIERS = len(RENT_KEYS)
+
+# The arrays can't hold None so it is stored as this marker instead
+NONE = -1
+
+
+def to_array_value(value):
+    """Convert a board value to something that can be stored in a signed array."""
+    return NONE if value is None else value
+
+def from_array_value(value):
+    """Convert a stored array value back to the board value."""
+    return None if value == NONE else value
+
+class BoardData:
+    """Static board information, shared by every compact board built from the same spaces."""
+    def __init__(self, spaces):
+        """Constructor"""
+        self.keys        = tuple(spaces[0].keys())
+        self.space_count = len(spaces)
+        self.space_nums  = tuple(space["space_num"] for space in spaces)
+        self.names       = tuple(space["name"] for space in spaces)
+        self.types       = tuple(space["type"] for space in spaces)
+        self.groups      = tuple(space["group"] for space in spaces)
+        self.prices      = array("h", (to_array_value(space["price"]) for space in spaces))
+        self.rents       = array("h", (to_array_value(space[key]) for space in spaces for key in RENT_KEYS))
+        self.rent_table  = array("h", game_state.build_rent_table(spaces))
+
+        # Starting values for the mutable state, copied into every new board
+        self.start_owners = array("b", (to_array_value(space["owner"]) for space in spaces))
+        self.start_houses = array("b", (to_array_value(space["houses"]) for space in spaces))
+
+        # Space numbers start at 1, but allow for boards which don't follow that exactly
+        self.index_by_space_num = {space_num: index for index, space_num in enumerate(self.space_nums)}
+
+        # Array indexes of every space in each group
+        group_members = {}
+        for index, group in enumerate(self.groups):
+            if group is not None:
+                group_members.setdefault(group, []).append(index)
+        self.group_members = {group: tuple(members) for group, members in group_members.items()}
+
+    def static_value(self, index, key):
+        """Look up one of the static values for the space at the given array index."""
+        match key:
+            case "space_num":
+                return self.space_nums[index]
+            case "name":
+                return self.names[index]
+            case "type":
+                return self.types[index]
+            case "group":
+                return self.groups[index]
+            case "price":
+                return from_array_value(self.prices[index])
+            case _:
+                # Anything left must be a rent tier
+                try:
+                    tier = RENT_KEYS.index(key)
+                except ValueError:
+                    raise KeyError(key) from None
+                return from_array_value(self.rents[index * RENT_TIERS + tier])
+
+# The default board data is only ever built once
+BOARD_DATA = BoardData(game_state.BOARD_SPACES)
+
+
+class SpaceView(MutableMapping):
+    """Dictionary-like view of a single space on a CompactBoard so existing callers can keep using prop["name"]."""
+    __slots__ = ("board", "index")
+
+    def __init__(self, board, index):
+        """Constructor"""
+        self.board = board
+        self.index = index
+
+    def __getitem__(self, key):
+        if key == "owner":
+            return from_array_value(self.board.owners[self.index])
+        if key == "houses":
+            return from_array_value(self.board.houses[self.index])
+        return self.board.data.static_value(self.index, key)
+
+    def __setitem__(self, key, value):
+        if key == "owner":
+            self.board.owners[self.index] = to_array_value(value)
+        elif key == "houses":
+            self.board.houses[self.index] = to_array_value(value)
+        elif key in self.board.data.keys:
+            raise TypeError(f"{key} is static board data and can't be changed")
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key):
+        raise TypeError("Spaces can't have keys removed")
+
+    def __iter__(self):
+        return iter(self.board.data.keys)
+
+    def __len__(self):
+        return len(self.board.data.keys)
+
+    def __repr__(self):
+        return f"SpaceView({dict(self)!r})"
+
+class SpaceViews:
+    """Read only sequence of SpaceView objects, standing in for MonopolyBoard.properties."""
+    __slots__ = ("board",)
+
+    def __init__(self, board):
+        """Constructor"""
+        self.board = board
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [SpaceView(self.board, i) for i in range(self.board.data.space_count)[index]]
+        if index < 0:
+            index += self.board.data.space_count
+        if not 0 <= index < self.board.data.space_count:
+            raise IndexError("space index out of range")
+        return SpaceView(self.board, index)
+
+    def __iter__(self):
+        for index in range(self.board.data.space_count):
+            yield SpaceView(self.board, index)
+
+    def __len__(self):
+        return self.board.data.space_count
+
+class CompactBoard(game_state.MonopolyBoard):
+    """A MonopolyBoard which stores only the owner and house counts per instance."""
+    def __init__(self, data=BOARD_DATA):
+        """Constructor"""
+        # The static data is shared, only the mutable state is copied
+        self.data   = data
+        self.owners = array("b", data.start_owners)
+        self.houses = array("b", data.start_houses)
+        self.rent_table = data.rent_table
+        self.listeners  = []
+
+    @property
+    def properties(self):
+        """Dictionary-like views of every space, matching MonopolyBoard.properties"""
+        return SpaceViews(self)
+
+    def array_index(self, space_num):
+        """Convert a space number to the array index of the space."""
+        try:
+            return self.data.index_by_space_num[space_num]
+        except (KeyError, TypeError):
+            # If it's not found raise an error
+            raise ValueError(f"Invalid space number {space_num}") from None
+
+    def property_by_space_num(self, space_num):
+        """Get a view of the property at the given space_num."""
+        return SpaceView(self, self.array_index(space_num))
+
+    def properties_by_group(self, group):
+        """Get views of all properties in the given group."""
+        return tuple(SpaceView(self, index) for index in self.data.group_members.get(group, ()))
+
+    def set_owner(self, space_num, player_number):
+        """Set the owner of the property at the given space_num."""
+        self.owners[self.array_index(space_num)] = to_array_value(player_number)
+        self.notify(space_num)
+
+    def add_house(self, space_num):
+        """Add a house to all properties in the group of the property at the given space_num. Does nothing if any property already has 5 houses."""
+        index = self.array_index(space_num)
+
+        # If property is not part of a group or can't have houses, return
+        group = self.data.groups[index]
+        if group is None or self.houses[index] == NONE:
+            return
+
+        members = self.data.group_members[group]
+
+        # Can't upgrade past 5 houses
+        if any(self.houses[member] >= 5 for member in members):
+            return
+
+        # Add a house to each property
+        for member in members:
+            self.houses[member] += 1
+
+        self.notify(space_num)
+
+    def full_group(self, space_num):
+        """Check if a player owns all properties of the group."""
+        index = self.array_index(space_num)
+
+        # Unpurchaseable or unpurchased spaces can't form a group
+        owner = self.owners[index]
+        if owner == 0 or owner == NONE:
+            return False
+
+        # Not all spaces are in a group
+        group = self.data.groups[index]
+        if group is None:
+            return False
+
+        return all(self.owners[member] == owner for member in self.data.group_members[group])
+
+    def house_count(self, space_num):
+        """Gets the number of houses for the property at the given space_num."""
+        return from_array_value(self.houses[self.array_index(space_num)])
+
+    def group_property_count(self, group):
+        """Helper function to return the number of properties in a group."""
+        return len(self.data.group_members.get(group, ()))
+
+    def can_buy_space(self, space_num, cash):
+        """Determine if the current space is purchasable given the amount of cash."""
+        index = self.array_index(space_num)
+
+        # Can only buy spaces owned by the board that are sellable (i.e. not None or other players)
+        if self.owners[index] != 0:
+            return False
+
+        # Spaces without a price can never be bought
+        price = self.data.prices[index]
+        return price != NONE and cash >= price
+
+    def owned_rent(self, space_num):
+        """Return the owner of the space at space_num and the rent anyone else would pay them."""
+        index = self.array_index(space_num)
+
+        # Unowned or board owned spaces don't charge rent
+        owner = self.owners[index]
+        if owner <= 0:
+            return from_array_value(owner), 0
+
+        # Spaces that can't have houses are treated as having none
+        houses = max(self.houses[index], 0)
+
+        # The group size only matters with 0 houses, and spaces outside a group always use the first tier
+        group = self.data.groups[index]
+        if houses or group is None:
+            owned = 1
+        else:
+            owned = 0
+            for member in self.data.group_members[group]:
+                if self.owners[member] == owner:
+                    owned += 1
+
+        return owner, self.data.rent_table[index * game_state.RENT_SPACE_STRIDE + houses * game_state.RENT_OWNED_LEVELS + owned]
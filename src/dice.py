@@ -0,0 +1,73 @@
+"""
+Dice served from large pre-generated buffers instead of one random.randint call per die.
+
+DiceSource is a random.Random, so it can be handed anywhere an rng is expected (the engine, card decks) while the dice
+themselves come out of the buffer. Seeding it makes every roll replayable.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import random
+
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class DiceSource(random.Random):
+    """A seedable random.Random that pre-generates dice in bulk and serves them with an index."""
+    def __init__(self, seed=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        """Constructor"""
+        super().__init__(seed)
+        self.buffer_size = buffer_size
+        # Remember where the stream started so it can be replayed, even when it was seeded from the OS
+        self.start_state = self.getstate()
+        # One buffer per number of sides, as (dice, position)
+        self.buffers = {}
+
+    def replay(self):
+        """Rewind to the start so the exact same dice (and any other random values) come out again."""
+        self.setstate(self.start_state)
+        self.buffers = {}
+
+    def refill(self, sides):
+        """Generate a new buffer of dice with the given number of sides."""
+        dice = self.choices(range(1, sides + 1), k=self.buffer_size)
+        self.buffers[sides] = (dice, 0)
+        return dice, 0
+
+    def take(self, amount, sides=6):
+        """Return a list of amount dice values."""
+        dice, position = self.buffers.get(sides) or self.refill(sides)
+        end = position + amount
+        if end <= len(dice):
+            self.buffers[sides] = (dice, end)
+            return dice[position:end]
+
+        # Not enough left, use up what's there and start a new buffer
+        values = dice[position:]
+        while len(values) < amount:
+            dice, _ = self.refill(sides)
+            used = min(amount - len(values), len(dice))
+            values += dice[:used]
+            self.buffers[sides] = (dice, used)
+
+        return values
+
+    def roll(self, count=2, sides=6):
+        """Roll count dice, returning a tuple."""
+        return tuple(self.take(count, sides))
+
+    def rolls(self, count=2, rolls=1, sides=6):
+        """Roll count dice rolls times, returning a list of tuples like common.roll_dice."""
+        values = self.take(count * rolls, sides)
+        return [tuple(values[i:i + count]) for i in range(0, len(values), count)]
+
+    def vector(self, shape, sides=6):
+        """Generate a NumPy array of dice for batch simulators, seeded from this stream so it is replayable too."""
+        import numpy as np
+
+        generator = np.random.default_rng(self.getrandbits(64))
+        return generator.integers(1, sides + 1, size=shape, dtype=np.int16)
+
+# Shared source used by common.roll_dice when no rng is given
+default_source = DiceSource()
@@ -5,16 +5,33 @@ Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
 """
 
 import arcade
+import concurrent.futures
 import random
 
 from . import ui_component
+from . import bot
 from . import common
+from . import engine
 from . import game_state
+from . import layer_cache
+from . import profiler
+from . import redraw
+from . import save_game
+from . import sprites
+from . import text_cache
+from . import widget_container
 
 # The help view explains the basics of operating the game and links to the documentation
 class HelpView(arcade.View):
     padding = 100
 
+    def __init__(self):
+        """Constructor"""
+        super().__init__()
+        # The help text is only laid out once, and only drawn again when the layer holding it is invalidated
+        self.text  = text_cache.TextLayer()
+        self.layer = layer_cache.CachedLayer(self.draw_static)
+
     def setup(self):
         """Setup the help view and buttons"""
         b_color     = arcade.color.LIGHT_GRAY
@@ -27,6 +44,7 @@ class HelpView(arcade.View):
             ui_component.Button(text="Credits",    center_y=self.padding, center_x=b_width * 2 + self.padding * 0, width=b_width, height=b_height, action=common.open_credits),
             ui_component.Button(text="Back",       center_y=self.padding, center_x=b_width * 3 + self.padding * 1, width=b_width, height=b_height, action=lambda: self.window.show_view(self.window.views["main_menu"])),
         ]
+        self.widgets = widget_container.WidgetContainer(self.buttons)
 
     def on_show_view(self):
         """Change the bgcolor when going to this view"""
@@ -35,8 +53,14 @@ class HelpView(arcade.View):
 
     def on_draw(self):
         """Draw logic"""
-        self.clear()
+        # The background and help text
+        self.layer.draw()
+
+        # Draw the buttons
+        self.widgets.draw()
 
+    def draw_static(self):
+        """Draw the help text into the cached layer."""
         help_text = """Welcome to the game of Monopoly!
 
 The game can be started from the main menu. The "Start" button will launch a setup wizard to configure the game. Note: For all enabled players the names and pieces chosen must be unique. Disabled players are ignored.
@@ -48,11 +72,7 @@ Credits for various images, sounds, and other assets in this game can be found b
 Authors: Bo Tang, Dan Smith, and Nate Spriggs
             """
 
-        arcade.draw_text(help_text, color=arcade.color.WHITE, start_x=self.padding / 2, start_y=common.app.height - self.padding, font_size=20, width=common.app.width - self.padding, align="left", multiline=True)
-
-        # Draw the buttons
-        for button in self.buttons:
-            button.draw()
+        self.text.draw("help", help_text, color=arcade.color.WHITE, start_x=self.padding / 2, start_y=common.app.height - self.padding, font_size=20, width=common.app.width - self.padding, align="left", multiline=True)
 
     def on_key_press(self, key, _modifiers):
         """Handle key presses"""
@@ -62,13 +82,19 @@ Authors: Bo Tang, Dan Smith, and Nate Spriggs
 
     def on_mouse_press(self, x, y, button, modifiers):
         """Handle mouse clicks"""
-        for button in self.buttons:
-            button.check_if_clicked(x, y)
+        self.widgets.on_mouse_press(x, y)
 
 # The initial view of the game. Presents the initial menu optionsh.
 class MainMenuView(arcade.View):
     # Music control is global
     music_playing = False
+    music         = "audio/bg_music.mp3"
+
+    def __init__(self):
+        """Constructor"""
+        super().__init__()
+        # Nothing on the menu changes while it is shown, so all of it is drawn once into a cached layer
+        self.layer = layer_cache.CachedLayer(self.draw_static)
 
     def setup(self):
         """Constructor"""
@@ -82,16 +108,23 @@ class MainMenuView(arcade.View):
             ui_component.Button(text="Help",  center_y=common.app.height / 2 - 100, width=b_width, height=b_height, action=self.show_help),
             ui_component.Button(text="Exit",  center_y=common.app.height / 2 - 250, width=b_width, height=b_height, action=self.exit_game)
         ]
+        self.widgets = widget_container.WidgetContainer(self.buttons)
 
         # Make sure we kick off the music if it wasn't already started before!
         if not self.music_playing:
-            common.audio["bg_music"].play(loop=True)
+            # Streamed, decoding the whole track up front would hold up the first frame of the menu
+            common.stream_sound(self.music).play(loop=True)
             self.music_playing = True;
 
-        # Draw the logo from the preloaded graphics in common.py
-        self.logo_texture = common.graphics["logo"]
-        self.logo_x       = common.app.width / 2
-        self.logo_y       = common.app.height - self.logo_texture.height / 2 - 20
+            # Load everything else in the background while the menu is up, so the other views open without a wait
+            common.graphics.warm_up()
+            common.audio.warm_up(skip={"bg_music"})
+
+        # The logo is drawn from the shared atlas
+        logo_height  = common.graphics["logo"].height
+        self.sprites = sprites.sprite_list()
+        self.sprites.append(sprites.image_sprite("logo", common.app.width / 2, common.app.height - logo_height / 2 - 20))
+        self.layer.invalidate()
 
     def on_show_view(self):
         """This is run once when we switch to this view."""
@@ -100,19 +133,19 @@ class MainMenuView(arcade.View):
 
     def on_draw(self):
         """Render the screen."""
-        self.clear()
+        self.layer.draw()
 
+    def draw_static(self):
+        """Draw the logo and buttons into the cached layer."""
         # Draw the logo
-        arcade.draw_texture_rectangle(self.logo_x, self.logo_y, self.logo_texture.width, self.logo_texture.height, self.logo_texture)
+        self.sprites.draw()
 
         # Draw the buttons
-        for button in self.buttons:
-            button.draw()
+        self.widgets.draw()
 
     """Called when the user presses a mouse button."""
     def on_mouse_press(self, x, y, button, modifiers):
-        for button in self.buttons:
-            button.check_if_clicked(x, y)
+        self.widgets.on_mouse_press(x, y)
 
     """Called when a key is pressed."""
     def on_key_press(self, key, _modifiers):
@@ -136,6 +169,9 @@ class MainMenuView(arcade.View):
 
 # The game setup view contains the UI to set the initial game parameters
 class GameSetupView(arcade.View):
+    # Longest player name, which still fits in the name box and the player info
+    max_name_length = 20
+
     def __init__(self):
         """Constructor"""
         super().__init__()
@@ -143,11 +179,17 @@ class GameSetupView(arcade.View):
         self.buttons       = []
         self.start_button  = None
         self.cancel_button = None
+        self.sprites       = None
+        self.widgets       = None
 
     def setup(self):
         """Setup the game setup view."""
         self.player_setups = []
         self.buttons       = []
+        # Every piece selector's image, drawn together
+        self.sprites       = sprites.sprite_list()
+        # Every toggle, input and button, drawn together and sent the input meant for them
+        self.widgets       = widget_container.WidgetContainer()
 
         # Define positions for 4 columns
         column_width = common.app.width / 4
@@ -157,25 +199,35 @@ class GameSetupView(arcade.View):
             toggle_y         = common.app.height - 200
             name_y           = toggle_y - 100
             piece_selector_y = name_y - 100
+            bot_toggle_y     = piece_selector_y - 100
 
             # Only enable the first 2 players by default
             toggle_button  = ui_component.ToggleButton(center_x=x_position, center_y=toggle_y, enabled=i < 2)
             # Default player names to be like "Player 2"
-            name_input     = ui_component.TextInputBox(center_x=x_position, center_y=name_y, text=f"Player {i + 1}")
+            name_input     = ui_component.TextInputBox(center_x=x_position, center_y=name_y, text=f"Player {i + 1}", max_length=self.max_name_length)
             # Increment the default piece for each player
             piece_selector = ui_component.PieceSelector(center_x=x_position, center_y=piece_selector_y, start_piece=i + 1)
+            self.sprites.append(piece_selector.sprite)
+            # Every player starts out human
+            bot_toggle     = ui_component.ToggleButton(center_x=x_position, center_y=bot_toggle_y, enabled=False, enabled_text="Bot", disabled_text="Human")
+
+            for widget in (toggle_button, name_input, piece_selector, bot_toggle):
+                self.widgets.add(widget)
 
             # Store components together
             self.player_setups.append(
             {
                 "toggle_button":  toggle_button,
                 "name_input":     name_input,
-                "piece_selector": piece_selector
+                "piece_selector": piece_selector,
+                "bot_toggle":     bot_toggle
             })
 
         # Create Cancel and Start buttons
         self.cancel_button = ui_component.Button(text="Cancel", center_x=common.app.width / 2 - 150, center_y=50, width=200, height=50, action=self.cancel)
         self.start_button  = ui_component.Button(text="Start",  center_x=common.app.width / 2 + 150, center_y=50, width=200, height=50, action=self.start_game)
+        self.widgets.add(self.cancel_button)
+        self.widgets.add(self.start_button)
 
     def on_show_view(self):
         """Run when the view is changed to this."""
@@ -184,43 +236,33 @@ class GameSetupView(arcade.View):
     def on_draw(self):
         """Draws the view."""
         self.clear()
-        # Draw player setups
-        for setup in self.player_setups:
-            setup["toggle_button"].draw()
-            setup["name_input"].draw()
-            setup["piece_selector"].draw()
+        self.update_start_button()
 
-        # Draw buttons
-        self.cancel_button.draw()
-        # Determine if start button is usable
-        if self.can_start_game():
-            self.start_button.color = arcade.color.LIGHT_GRAY
-        else:
-            self.start_button.color = arcade.color.DARK_GRAY
-        self.start_button.draw()
+        # Draw the player setups and buttons, then the pieces
+        self.widgets.draw()
+        self.sprites.draw()
 
     def on_mouse_press(self, x, y, button, modifiers):
         """Handle mouse buttons"""
-        for setup in self.player_setups:
-            setup["toggle_button"].check_if_clicked(x, y)
-            setup["name_input"].check_if_clicked(x, y)
-            setup["piece_selector"].prev_button.check_if_clicked(x, y)
-            setup["piece_selector"].next_button.check_if_clicked(x, y)
-
-        self.cancel_button.check_if_clicked(x, y)
-
-        if self.can_start_game():
-            self.start_button.check_if_clicked(x, y)
+        self.update_start_button()
+        self.widgets.on_mouse_press(x, y)
 
     def on_text(self, text):
         """Handle text input"""
-        for setup in self.player_setups:
-            setup["name_input"].on_text(text)
+        self.widgets.on_text(text)
 
     def on_key_press(self, key, modifiers):
         """Handle key pressess"""
-        for setup in self.player_setups:
-            setup["name_input"].on_key_press(key, modifiers)
+        self.widgets.on_key_press(key, modifiers)
+
+    def update_start_button(self):
+        """Only allow starting once the inputs are valid, and show whether it can be clicked."""
+        # Determine if start button is usable
+        self.start_button.clickable = self.can_start_game()
+        if self.start_button.clickable:
+            self.start_button.color = arcade.color.LIGHT_GRAY
+        else:
+            self.start_button.color = arcade.color.DARK_GRAY
 
     def cancel(self):
         """Exit this menu"""
@@ -269,7 +311,8 @@ class GameSetupView(arcade.View):
             if setup["toggle_button"].enabled:
                 player = {
                     "name":  setup["name_input"].text,
-                    "piece": setup["piece_selector"].current_index
+                    "piece": setup["piece_selector"].current_index,
+                    "bot":   setup["bot_toggle"].enabled
                 }
                 players.append(player)
 
@@ -281,14 +324,32 @@ class GameView(arcade.View):
         """Constructor"""
         super().__init__()
         self.board         = None
-        self.board_texture = common.graphics["board"]
+        # Loaded in setup, so the board image isn't needed until a game starts
+        self.board_texture = None
+        # The board is drawn once into a cached layer, the player tokens over it every frame
+        self.board_sprites = None
+        self.layer         = layer_cache.CachedLayer(self.draw_static)
+        self.sprites       = None
+        self.tokens        = None
+        # Player info, the turn and the dice are only laid out again when they change
+        self.text          = text_cache.TextLayer()
         self.dice_text     = "⚀ ⚀"
         self.players       = None
+        self.engine        = None
+        # Player number to bot.MCTSBot for every computer player
+        self.bots          = {}
+        # Saves the game after every turn, see save_game
+        self.save_writer   = None
+
+        # Turns are played on a background thread so a bot thinking doesn't stall the frame rate
+        self.turn_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.pending_turn  = None
 
         # Create Roll Dice button
         self.can_roll          = True
         roll_dice_button_width = 200
         self.roll_dice_button  = ui_component.Button(text="Roll Dice", center_x=common.app.width / 1.5 + roll_dice_button_width / 2, center_y=common.app.height / 2, width=roll_dice_button_width, height=50, action=self.roll_dice)
+        self.widgets           = widget_container.WidgetContainer([self.roll_dice_button])
 
     def setup(self, players=None):
         """This should set up your game and get it ready to play."""
@@ -297,12 +358,29 @@ class GameView(arcade.View):
             # Convert the players list to a dictionary for PlayerInfo
             players_dict = {player["name"]: player["piece"] for player in players}
             self.players = game_state.PlayerInfo(players_dict)
+            # Always searched in worker processes, so the rollouts never compete with drawing
+            self.bots    = {i: bot.MCTSBot() for i, player in enumerate(players) if player.get("bot")}
         else:
             # Default setup if no players are provided
             self.players = game_state.PlayerInfo({"Player 1": 1, "Player 2": 2})
-        
+            self.bots    = {}
+        self.can_roll     = True
+        self.pending_turn = None
+
         # Intialize the board
         self.board = game_state.MonopolyBoard()
+        self.board_texture = common.graphics["board"]
+        board_width, board_height = self.board_texture.width, self.board_texture.height
+        self.board_sprites = sprites.sprite_list()
+        self.board_sprites.append(sprites.image_sprite("board", board_width / 2, board_height / 2))
+        self.layer.invalidate()
+        self.sprites = sprites.sprite_list()
+        self.tokens  = sprites.TokenSprites(self.players, self.sprites, 0, 0, min(board_width, board_height))
+
+        # The engine plays the rules, this view just animates the dice and shows the results
+        buy_policy, build_policy = bot.seat_policies(self.bots)
+        self.engine = engine.GameEngine(self.players, self.board, buy_policy=buy_policy, build_policy=build_policy)
+        self.save_writer = save_game.SaveWriter(save_game.autosave_path())
 
     def on_show_view(self):
         """This will be called when the view is switched to."""
@@ -310,10 +388,10 @@ class GameView(arcade.View):
 
     def on_draw(self):
         """Handle drawing of the view."""
-        self.clear()
-
-        # Draw the board texture at the top left
-        arcade.draw_texture_rectangle(self.board_texture.width // 2, self.board_texture.height // 2, self.board_texture.width, self.board_texture.height, self.board_texture)
+        # The background and board, then every player's token on it
+        self.layer.draw()
+        self.tokens.update()
+        self.sprites.draw()
 
         # Draw player information
         y = common.app.height - 50
@@ -326,27 +404,36 @@ class GameView(arcade.View):
             player_space = self.players.player_space(i)
             # Print the player name, cash, and location
             text = f"{player_name}: ${player_cash}\n(On: {self.board.property_by_space_num(player_space)['name']})"
-            arcade.draw_text(text, x, y, arcade.color.BLACK, font_size=20, anchor_x="left", align="left", multiline=True, width=common.app.width - self.board_texture.width - x_padding)
+            self.text.draw(f"player{i}", text, x, y, arcade.color.BLACK, font_size=20, anchor_x="left", align="left", multiline=True, width=common.app.width - self.board_texture.width - x_padding)
             y -= 60
 
         # Draw whose turn it is
         y -= 10
         current_player = self.players.get_player_name(self.players.current_player)
-        arcade.draw_text(f"Current Turn: {current_player}", x, y, arcade.color.BLUE, font_size=24, anchor_x="left")
+        self.text.draw("turn", f"Current Turn: {current_player}", x, y, arcade.color.BLUE, font_size=24, anchor_x="left")
+        if self.pending_turn is not None and self.players.current_player in self.bots:
+            self.text.draw("thinking", "Thinking...", x + common.app.width / 4, y, arcade.color.BLUE, font_size=24, anchor_x="left")
 
         # Draw dice
         y -= 70
-        arcade.draw_text(self.dice_text, x, y, arcade.color.BLACK, font_size=48, anchor_x="left")
+        self.text.draw("dice", self.dice_text, x, y, arcade.color.BLACK, font_size=48, anchor_x="left")
 
         # Draw Roll Dice button
         y -= 50
-        self.roll_dice_button.center_y = y
-        self.roll_dice_button.center_x = x + self.roll_dice_button.width / 2
-        self.roll_dice_button.draw()
+        self.widgets.move(self.roll_dice_button, x + self.roll_dice_button.width / 2, y)
+        self.widgets.draw()
         y -= self.roll_dice_button.height + 10
 
+    def draw_static(self):
+        """Draw the board into the cached layer, at the bottom left."""
+        self.board_sprites.draw()
+
     def on_key_press(self, key, _modifiers):
         """Handle key pressess."""
+        # The engine is changing the game on the turn thread, and a new game's first turn would queue behind it
+        if self.pending_turn is not None:
+            return
+
         if key == arcade.key.SPACE:
             # Simulate a turn: move the current player
             current_player = self.players.current_player
@@ -359,7 +446,17 @@ class GameView(arcade.View):
 
     def on_mouse_press(self, x, y, button, modifiers):
         """Handle mouse presses"""
-        self.roll_dice_button.check_if_clicked(x, y)
+        # Bots roll for themselves
+        self.roll_dice_button.clickable = self.players.current_player not in self.bots
+        self.widgets.on_mouse_press(x, y)
+
+    def on_update(self, delta_time):
+        """Pick up finished turns and start bot turns."""
+        if self.pending_turn is not None:
+            if self.pending_turn.done():
+                self.finish_turn()
+        elif self.can_roll and self.players.current_player in self.bots:
+            self.roll_dice()
 
     def roll_dice(self):
         """Get the dice role information"""
@@ -388,18 +485,41 @@ class GameView(arcade.View):
             dice_chars = ["⚀", "⚁", "⚂", "⚃", "⚄", "⚅"]
             self.dice_text = f"{dice_chars[roll[0]-1]} {dice_chars[roll[1]-1]}"
             self.current_roll_index += 1
+            self.window.request_redraw()
         else: # We're finished
-            # Advance the current player the final number on the dice
-            self.players.add_spaces(self.players.current_player, sum(self.dice_rolls[-1]))
-
-            # Next player's turn (for now)
-            self.players.next_player()
-            self.can_roll = True
+            # Play the turn with the final roll on the dice, the engine decides who goes next. Bots search while
+            # the turn plays, so it runs in the background and on_update picks up the result.
+            self.pending_turn = self.turn_executor.submit(self.engine.take_turn, self.dice_rolls[-1])
+            # Shows that a bot is thinking
+            self.window.request_redraw()
 
             arcade.unschedule(self.update_dice_display)
 
+    def finish_turn(self):
+        """Called once a turn has finished playing in the background."""
+        # Raises anything that went wrong during the turn
+        self.pending_turn.result()
+        self.pending_turn = None
+        self.can_roll = True
+        # Player info and the tokens have moved
+        self.window.request_redraw()
+
+        # Only the sections that changed are written, so this is quick enough to do between frames
+        try:
+            self.save_writer.autosave(self.engine)
+        except OSError as error:
+            print(f"Couldn't autosave the game: {error}")
+
+        if self.engine.winner is not None:
+            self.window.show_view(self.window.views["game_over"])
+
 # End game screen
 class GameOverView(arcade.View):
+    def __init__(self):
+        """Constructor"""
+        super().__init__()
+        self.text = text_cache.TextLayer()
+
     def on_show_view(self):
         """This will be called when the view is switched to."""
         arcade.set_background_color(arcade.color.BLACK)
@@ -407,7 +527,7 @@ class GameOverView(arcade.View):
     def on_draw(self):
         """Handle drawing of this view."""
         self.clear()
-        arcade.draw_text("Game Over - press ESCAPE to advance", common.app.width / 2, common.app.height / 2, arcade.color.WHITE, 30, anchor_x="center")
+        self.text.draw("game_over", "Game Over - press ESCAPE to advance", common.app.width / 2, common.app.height / 2, arcade.color.WHITE, font_size=30, anchor_x="center")
 
     def on_key_press(self, key, _modifiers):
         """Handle key presses."""
@@ -416,9 +536,10 @@ class GameOverView(arcade.View):
             self.window.show_view(self.window.views["main_menu"])
 
 
-def init():
-    """Initialize the window and display view system."""
-    window = arcade.Window(common.app.width, common.app.height, "Monopoly", vsync=True)
+def create_window(visible=True):
+    """Create the window with every view, and profiling on."""
+    # Only draws when something has changed, unless asked to draw every frame
+    window = redraw.OnDemandWindow(common.app.width, common.app.height, "Monopoly", vsync=True, visible=visible, continuous=redraw.continuous_requested())
 
     # Create instances of all views and store the views in a dictionary on the window for easy access
     window.views = {
@@ -429,6 +550,28 @@ def init():
         "game_over":  GameOverView(),
     }
 
+    # Time every view's handlers, F3 shows the timings on screen
+    window.profiler = profiler.FrameProfiler(toggle_key=arcade.key.F3)
+    window.profiler.instrument(window, window.views)
+
+    return window
+
+def close_window(window):
+    """Clean up after the window has closed."""
+    report_path = profiler.report_path()
+    if report_path is not None:
+        window.profiler.write_report(report_path)
+
+    # Stop any bot worker processes once the window is closed, a bot still thinking gives up so its turn can finish
+    window.views["game"].turn_executor.shutdown(wait=False, cancel_futures=True)
+    bot.close_pool()
+
+def init():
+    """Initialize the window and display view system."""
+    window = create_window()
+
     # Start with the main menu view
     window.show_view(window.views["main_menu"])
     arcade.run()
+
+    close_window(window)
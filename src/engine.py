@@ -0,0 +1,266 @@
+"""
+Headless turn engine which plays the rules of the game without arcade, so games can run without a window or audio device.
+
+The GUI drives an engine by handing it the final dice roll of its animation, simulations just call take_turn in a loop.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+from . import cards
+from . import common
+from . import dice
+from . import game_state
+
+
+JAIL_SPACE     = 11
+JAIL_FINE      = 50
+MAX_JAIL_TURNS = 3
+MAX_DOUBLES    = 3
+HOUSE_COST     = 50
+# Paid by PlayerInfo.add_spaces when a player passes Go
+GO_BONUS       = 200
+
+# The first space of every group that can have houses, used to check each group once per turn
+BUILD_GROUPS = {space["group"]: space["space_num"] for space in reversed(game_state.BOARD_SPACES) if space["type"] == "property"}
+
+
+def always_buy(engine, player_number, space_num):
+    """Default buy policy, buys every space the player can afford."""
+    return True
+
+def always_build(engine, player_number, space_num):
+    """Default build policy, builds houses whenever the player can afford them."""
+    return True
+
+class GameEngine:
+    """Plays turns of the game against a MonopolyBoard and PlayerInfo.
+
+    Players are numbered from 0 like in PlayerInfo. On the board an owner of 0 means the bank, so the board owner of a
+    space bought by player N is N + 1 (see owner_id).
+
+    Policies are callables taking (engine, player_number, space_num) and returning True to buy the space or build a
+    house on its group.
+
+    All randomness comes from rng, pass a seeded dice.DiceSource (or random.Random) to get a reproducible game. Every
+    turn's events are also appended to event_log (an event_log.EventLog) when one is given.
+    """
+    def __init__(self, players, board=None, buy_policy=always_buy, build_policy=always_build, roll_dice=common.roll_dice, rng=None, event_log=None):
+        """Constructor"""
+        self.players      = players
+        self.board        = board if board is not None else game_state.MonopolyBoard()
+        self.buy_policy   = buy_policy
+        self.build_policy = build_policy
+        self.roll_dice    = roll_dice
+        self.rng          = rng if rng is not None else dice.default_source
+        self.decks        = cards.new_decks(self.rng)
+        self.event_log    = event_log
+
+        # Extra player state the PlayerInfo doesn't track
+        self.in_jail       = [False] * players.total_players
+        self.jail_turns    = [0] * players.total_players
+        self.bankrupt      = [False] * players.total_players
+        # Held Get Out of Jail Free cards for each player, as (deck name, card index)
+        self.jail_free_cards = [[] for _ in range(players.total_players)]
+        self.doubles_count = 0
+        self.turn          = 0
+        self.winner        = None
+
+    @staticmethod
+    def owner_id(player_number):
+        """The board owner value for a player, since 0 is used for the bank."""
+        return player_number + 1
+
+    def active_players(self):
+        """Return the numbers of every player who isn't bankrupt."""
+        return [player for player in range(self.players.total_players) if not self.bankrupt[player]]
+
+    def take_turn(self, roll=None):
+        """Play a single roll for the current player and return a list of event tuples describing what happened."""
+        if self.winner is not None:
+            return []
+
+        events = []
+        player = self.players.current_player
+
+        # A held Get Out of Jail Free card is always used before rolling
+        if self.in_jail[player] and self.jail_free_cards[player]:
+            deck_name, index = self.jail_free_cards[player].pop()
+            self.decks[deck_name].return_card(index)
+            self.release_from_jail(events, player)
+            events.append(("jail_free", player, deck_name))
+
+        # The GUI passes in the roll it animated, otherwise roll here
+        if roll is None:
+            roll = self.roll_dice(count=2, rolls=1, sides=6, rng=self.rng)[0]
+        doubles = roll[0] == roll[1]
+        events.append(("roll", player, roll[0], roll[1]))
+
+        if self.in_jail[player]:
+            # Doubles get the player out of jail, otherwise pay the fine after the last attempt
+            if doubles:
+                self.release_from_jail(events, player)
+            else:
+                self.jail_turns[player] += 1
+                if self.jail_turns[player] < MAX_JAIL_TURNS:
+                    self.end_turn(events, player, roll_again=False)
+                    return events
+                self.pay(events, player, JAIL_FINE)
+                self.release_from_jail(events, player)
+            # Leaving jail never grants another roll
+            doubles = False
+        elif doubles:
+            # Too many doubles in a row is speeding and goes straight to jail
+            self.doubles_count += 1
+            if self.doubles_count == MAX_DOUBLES:
+                self.send_to_jail(events, player)
+                self.end_turn(events, player, roll_again=False)
+                return events
+
+        self.move(events, player, roll[0] + roll[1])
+        self.resolve_space(events, player)
+        self.build_houses(events, player)
+        self.end_turn(events, player, roll_again=doubles and not self.in_jail[player])
+
+        return events
+
+    def play(self, max_turns=1000):
+        """Play until there is a winner or max_turns rolls have been made, returning the winner (or None)."""
+        while self.winner is None and self.turn < max_turns:
+            self.take_turn()
+
+        return self.winner
+
+    def move(self, events, player, space_count):
+        """Move the player forward, collecting $200 for passing Go."""
+        passes_go = self.players.space_number[player] + space_count > len(game_state.BOARD_SPACES)
+        self.players.add_spaces(player, space_count)
+        events.append(("move", player, self.players.space_number[player]))
+        if passes_go:
+            events.append(("pass_go", player, GO_BONUS))
+
+    def move_to(self, events, player, space_num):
+        """Move the player forward to the given space, collecting $200 for passing Go."""
+        space_count = len(game_state.BOARD_SPACES)
+        self.move(events, player, (space_num - self.players.space_number[player]) % space_count or space_count)
+
+    def resolve_space(self, events, player):
+        """Carry out the action for the space the player is on."""
+        space_num = self.players.space_number[player]
+        owner_id  = self.owner_id(player)
+
+        match self.board.land_action(owner_id, space_num):
+            case "buy_space_option":
+                if self.board.can_buy_space(space_num, self.players.cash[player]) and self.buy_policy(self, player, space_num):
+                    price = self.board.property_by_space_num(space_num)["price"]
+                    self.players.cash[player] -= price
+                    self.board.set_owner(space_num, owner_id)
+                    events.append(("buy", player, space_num, price))
+            case "pay_rent":
+                rent = self.board.rent_cost(space_num, owner_id)
+                if rent:
+                    self.pay_player(events, player, self.board.property_by_space_num(space_num)["owner"] - 1, rent, space_num)
+            case "pay_tax":
+                # The tax amount is stored as the first rent tier of the space
+                self.pay(events, player, self.board.property_by_space_num(space_num)["rent-t0.1"])
+            case "draw_chance_card":
+                cards.apply_card(self, events, player, "chance", self.decks["chance"].draw())
+            case "draw_community_chest_card":
+                cards.apply_card(self, events, player, "community", self.decks["community"].draw())
+            case "move_to_jail":
+                self.send_to_jail(events, player)
+
+    def build_houses(self, events, player):
+        """Offer the player a house on each group they can build on."""
+        owner_id = self.owner_id(player)
+        for group, space_num in BUILD_GROUPS.items():
+            # can_buy_houses doesn't know who is buying, so make sure it is this player's group
+            if self.board.property_by_space_num(space_num)["owner"] != owner_id:
+                continue
+            if not self.board.can_buy_houses(space_num, self.players.cash[player]):
+                continue
+            if not self.build_policy(self, player, space_num):
+                continue
+
+            cost = HOUSE_COST * self.board.group_property_count(group)
+            self.board.add_house(space_num)
+            self.players.cash[player] -= cost
+            events.append(("build", player, space_num, cost))
+
+    def pay(self, events, player, amount):
+        """Pay money to the bank."""
+        self.players.cash[player] -= amount
+        events.append(("pay", player, amount))
+
+    def collect(self, events, player, amount):
+        """Collect money from the bank."""
+        self.players.cash[player] += amount
+        events.append(("collect", player, amount))
+
+    def pay_player(self, events, payer, payee, amount, space_num=None):
+        """Pay money to another player, as rent when it is for landing on space_num."""
+        self.players.cash[payer] -= amount
+        self.players.cash[payee] += amount
+        if space_num is None:
+            events.append(("transfer", payer, payee, amount))
+        else:
+            events.append(("rent", payer, space_num, amount, payee))
+
+    def send_to_jail(self, events, player):
+        """Move a player directly to jail without passing Go."""
+        self.players.space_number[player] = JAIL_SPACE
+        self.in_jail[player]    = True
+        self.jail_turns[player] = 0
+        events.append(("jail", player))
+
+    def release_from_jail(self, events, player):
+        """Let a player out of jail."""
+        self.in_jail[player]    = False
+        self.jail_turns[player] = 0
+        events.append(("release", player))
+
+    def end_turn(self, events, player, roll_again):
+        """Check for bankruptcy and pass the dice on if the player doesn't get another roll."""
+        self.turn += 1
+
+        if self.players.cash[player] < 0:
+            self.declare_bankrupt(events, player)
+            roll_again = False
+
+        if not roll_again:
+            self.doubles_count = 0
+
+            active = self.active_players()
+            if len(active) == 1:
+                self.winner = active[0]
+                events.append(("winner", self.winner))
+            else:
+                # Skip over anyone who is out of the game
+                self.players.next_player()
+                while self.bankrupt[self.players.current_player]:
+                    self.players.next_player()
+
+        events.append(("end_turn", self.players.current_player, self.turn))
+
+        # Every turn finishes here, so this is where the whole turn gets logged
+        if self.event_log is not None:
+            self.event_log.extend(events)
+
+    def declare_bankrupt(self, events, player):
+        """Remove a player from the game and return their spaces to the bank."""
+        self.bankrupt[player] = True
+        self.in_jail[player]  = False
+
+        # Held cards go back to their decks
+        for deck_name, index in self.jail_free_cards[player]:
+            self.decks[deck_name].return_card(index)
+        self.jail_free_cards[player] = []
+
+        owner_id = self.owner_id(player)
+        for prop in self.board.properties:
+            if prop["owner"] == owner_id:
+                # Houses go first so board listeners see the final state when the owner changes
+                if prop["houses"] is not None:
+                    prop["houses"] = 0
+                self.board.set_owner(prop["space_num"], 0)
+
+        events.append(("bankrupt", player))
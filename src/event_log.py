@@ -0,0 +1,281 @@
+"""
+Append-only binary log of every game event, and a replayer which rebuilds the state at any turn without the GUI.
+
+Every event from engine.GameEngine.take_turn is packed into a fixed size 8 byte record, so a full game is only a few
+kilobytes. The replayer applies the records to a fresh state and keeps a snapshot every few turns, so seeking to a turn
+only ever replays the records since the nearest snapshot.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import bisect
+import os
+import struct
+
+from . import cards
+from . import compact_board
+from . import engine
+
+
+# type, player, two small arguments (space, die, deck...) and a 32 bit value (cash amounts, turn numbers)
+RECORD = struct.Struct("<BBBBi")
+
+# Event names to record type numbers, new types must only ever be added to the end
+EVENT_TYPES = ("roll", "move", "pass_go", "buy", "rent", "transfer", "pay", "collect", "card", "jail", "jail_free", "release", "build", "bankrupt", "winner", "end_turn")
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+
+DECK_NAMES = tuple(cards.DECK_CARDS)
+DECK_CODES = {name: code for code, name in enumerate(DECK_NAMES)}
+# Cards with the same text behave the same, so the first index is enough to find the text again
+CARD_CODES = {(deck, text): index for deck, deck_cards in cards.DECK_CARDS.items() for index, text in reversed(list(enumerate(deck_cards)))}
+
+DEFAULT_SNAPSHOT_INTERVAL = 50
+
+
+def encode_event(event):
+    """Pack an engine event tuple into a record."""
+    name, player = event[0], event[1]
+    code = EVENT_CODES[name]
+    match name:
+        case "roll":
+            return RECORD.pack(code, player, event[2], event[3], 0)
+        case "move":
+            return RECORD.pack(code, player, event[2], 0, 0)
+        case "pass_go" | "pay" | "collect":
+            return RECORD.pack(code, player, 0, 0, event[2])
+        case "buy" | "build":
+            return RECORD.pack(code, player, event[2], 0, event[3])
+        case "rent":
+            return RECORD.pack(code, player, event[2], event[4], event[3])
+        case "transfer":
+            return RECORD.pack(code, player, event[2], 0, event[3])
+        case "card":
+            return RECORD.pack(code, player, DECK_CODES[event[2]], CARD_CODES[(event[2], event[3])], 0)
+        case "jail_free":
+            return RECORD.pack(code, player, DECK_CODES[event[2]], 0, 0)
+        case "end_turn":
+            return RECORD.pack(code, player, 0, 0, event[2])
+        case _:
+            # jail, release, bankrupt and winner only need the player
+            return RECORD.pack(code, player, 0, 0, 0)
+
+def decode_event(record):
+    """Unpack a record tuple from RECORD.unpack back into an engine event tuple."""
+    code, player, a, b, value = record
+    name = EVENT_TYPES[code]
+    match name:
+        case "roll":
+            return (name, player, a, b)
+        case "move":
+            return (name, player, a)
+        case "pass_go" | "pay" | "collect":
+            return (name, player, value)
+        case "buy" | "build":
+            return (name, player, a, value)
+        case "rent":
+            return (name, player, a, value, b)
+        case "transfer":
+            return (name, player, a, value)
+        case "card":
+            deck = DECK_NAMES[a]
+            return (name, player, deck, cards.DECK_CARDS[deck][b])
+        case "jail_free":
+            return (name, player, DECK_NAMES[a])
+        case "end_turn":
+            return (name, player, value)
+        case _:
+            return (name, player)
+
+class EventLog:
+    """Append-only log of packed event records, optionally mirrored to a file as they are written."""
+    def __init__(self, path=None):
+        """Constructor"""
+        self.data = bytearray()
+        self.file = None
+        if path is not None:
+            # Pick up anything already in the file and keep appending to it
+            try:
+                with open(path, "rb") as existing:
+                    self.data += existing.read()
+            except FileNotFoundError:
+                pass
+
+            # A crash part way through a write can leave half a record at the end, which would put every record
+            # appended after it out of line, so it is dropped
+            whole = len(self.data) - len(self.data) % RECORD.size
+            if whole != len(self.data):
+                del self.data[whole:]
+                os.truncate(path, whole)
+            self.file = open(path, "ab")
+
+    def append(self, event):
+        """Add a single event."""
+        self.write(encode_event(event))
+
+    def extend(self, events):
+        """Add every event from a turn."""
+        self.write(b"".join(encode_event(event) for event in events))
+
+    def write(self, records):
+        """Append packed records to the log and the file."""
+        self.data += records
+        if self.file is not None:
+            self.file.write(records)
+
+    def flush(self):
+        """Make sure everything written so far is in the file."""
+        if self.file is not None:
+            self.file.flush()
+
+    def close(self):
+        """Close the file, the in-memory log is kept."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __len__(self):
+        return len(self.data) // RECORD.size
+
+    def records(self, start=0):
+        """Iterate over the raw record tuples, starting from a record index."""
+        return RECORD.iter_unpack(memoryview(self.data)[start * RECORD.size:len(self) * RECORD.size])
+
+    def events(self, start=0):
+        """Iterate over the decoded event tuples."""
+        return (decode_event(record) for record in self.records(start))
+
+class ReplayState:
+    """Everything a replay needs to rebuild, on a CompactBoard so snapshots are cheap to copy."""
+    def __init__(self, player_count, starting_cash=1500):
+        """Constructor"""
+        self.board      = compact_board.CompactBoard()
+        self.position   = [1] * player_count
+        self.cash       = [starting_cash] * player_count
+        self.in_jail    = [False] * player_count
+        self.jail_turns = [0] * player_count
+        self.bankrupt   = [False] * player_count
+        self.jail_free  = [[] for _ in range(player_count)]
+        self.current    = 0
+        self.doubles    = 0
+        self.turn       = 0
+        self.winner     = None
+
+    def copy(self):
+        """Return an independent copy of the state."""
+        state = ReplayState.__new__(ReplayState)
+        state.board = compact_board.CompactBoard(self.board.data)
+        state.board.owners[:] = self.board.owners
+        state.board.houses[:] = self.board.houses
+        state.position   = self.position[:]
+        state.cash       = self.cash[:]
+        state.in_jail    = self.in_jail[:]
+        state.jail_turns = self.jail_turns[:]
+        state.bankrupt   = self.bankrupt[:]
+        state.jail_free  = [held[:] for held in self.jail_free]
+        state.current    = self.current
+        state.doubles    = self.doubles
+        state.turn       = self.turn
+        state.winner     = self.winner
+        return state
+
+    def apply(self, record):
+        """Apply a single raw record to the state."""
+        code, player, a, b, value = record
+        match EVENT_TYPES[code]:
+            case "roll":
+                if self.in_jail[player]:
+                    if a != b:
+                        self.jail_turns[player] += 1
+                elif a == b:
+                    self.doubles += 1
+            case "move":
+                self.position[player] = a
+            case "pass_go" | "collect":
+                self.cash[player] += value
+            case "pay":
+                self.cash[player] -= value
+            case "buy":
+                self.cash[player] -= value
+                self.board.set_owner(a, engine.GameEngine.owner_id(player))
+            case "rent":
+                self.cash[player] -= value
+                self.cash[b]      += value
+            case "transfer":
+                self.cash[player] -= value
+                self.cash[a]      += value
+            case "card":
+                deck = DECK_NAMES[a]
+                if cards.CARD_EFFECTS[cards.DECK_CARDS[deck][b]][0] == "jail_free":
+                    self.jail_free[player].append(deck)
+            case "jail":
+                self.position[player]   = engine.JAIL_SPACE
+                self.in_jail[player]    = True
+                self.jail_turns[player] = 0
+            case "jail_free":
+                self.jail_free[player].remove(DECK_NAMES[a])
+            case "release":
+                self.in_jail[player]    = False
+                self.jail_turns[player] = 0
+            case "build":
+                self.cash[player] -= value
+                self.board.add_house(a)
+            case "bankrupt":
+                self.bankrupt[player]  = True
+                self.in_jail[player]   = False
+                self.jail_free[player] = []
+                owner_id = engine.GameEngine.owner_id(player)
+                for index, owner in enumerate(self.board.owners):
+                    if owner == owner_id:
+                        self.board.owners[index] = 0
+                        if self.board.houses[index] > 0:
+                            self.board.houses[index] = 0
+            case "winner":
+                self.winner  = player
+                self.doubles = 0
+            case "end_turn":
+                # The doubles streak only carries on when the same player rolls again
+                if player != self.current:
+                    self.doubles = 0
+                self.current = player
+                self.turn    = value
+
+class Replayer:
+    """Rebuilds the state of a logged game at any turn, using periodic snapshots to avoid replaying from the start."""
+    def __init__(self, log, player_count, starting_cash=1500, snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL):
+        """Constructor"""
+        self.log               = log
+        self.snapshot_interval = snapshot_interval
+        # Parallel lists of snapshot turns, the record index each starts from and the state at that point
+        self.snapshot_turns    = [0]
+        self.snapshot_records  = [0]
+        self.snapshot_states   = [ReplayState(player_count, starting_cash)]
+
+    def index(self):
+        """Extend the snapshots over any records added to the log since the last call."""
+        state  = self.snapshot_states[-1].copy()
+        record = self.snapshot_records[-1]
+        end_turn = EVENT_CODES["end_turn"]
+
+        for raw in self.log.records(record):
+            state.apply(raw)
+            record += 1
+            if raw[0] == end_turn and state.turn >= self.snapshot_turns[-1] + self.snapshot_interval:
+                self.snapshot_turns.append(state.turn)
+                self.snapshot_records.append(record)
+                self.snapshot_states.append(state.copy())
+
+    def state_at(self, turn=None):
+        """Return the state after the given number of turns (rolls), or the latest state when turn is None."""
+        self.index()
+
+        # Start from the last snapshot at or before the turn
+        slot   = bisect.bisect_right(self.snapshot_turns, turn) - 1 if turn is not None else len(self.snapshot_turns) - 1
+        state  = self.snapshot_states[slot].copy()
+
+        for raw in self.log.records(self.snapshot_records[slot]):
+            # Stop at the end of the requested turn rather than the start of the next one
+            if turn is not None and state.turn >= turn:
+                break
+            state.apply(raw)
+
+        return state
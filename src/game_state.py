@@ -7,72 +7,140 @@ Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
 import random
 
 
+# Static information about every space on the board, in space_num order
+BOARD_SPACES = [
+    {"houses": None, "group": None, "space_num": 1,    "name": "Go",                   "owner": None, "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "special" },
+    {"houses": 0,    "group": 1,    "space_num": 2,    "name": "Mediterranean Avenue", "owner": 0,    "price": 60,   "rent-t0.1": 2,    "rent-t0.2": 4,    "rent-t0.3": None, "rent-t0.4": None, "rent-t1": 10,   "rent-t2": 30,   "rent-t3": 90,   "rent-t4": 160,  "rent-t5": 250,  "type": "property"},
+    {"houses": None, "group": None, "space_num": 3,    "name": "Community Chest",      "owner": None, "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "card"    },
+    {"houses": 0,    "group": 1,    "space_num": 4,    "name": "Baltic Avenue",        "owner": 0,    "price": 60,   "rent-t0.1": 4,    "rent-t0.2": 8,    "rent-t0.3": None, "rent-t0.4": None, "rent-t1": 20,   "rent-t2": 60,   "rent-t3": 180,  "rent-t4": 320,  "rent-t5": 450,  "type": "property"},
+    {"houses": None, "group": None, "space_num": 5,    "name": "Income Tax",           "owner": None, "price": None, "rent-t0.1": 200,  "rent-t0.2": 200,  "rent-t0.3": 200,  "rent-t0.4": 200,  "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "special" },
+    {"houses": None, "group": 9,    "space_num": 6,    "name": "Reading Railroad",     "owner": 0,    "price": 200,  "rent-t0.1": 25,   "rent-t0.2": 50,   "rent-t0.3": 100,  "rent-t0.4": 200,  "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "railroad"},
+    {"houses": 0,    "group": 2,    "space_num": 7,    "name": "Oriental Avenue",      "owner": 0,    "price": 100,  "rent-t0.1": 6,    "rent-t0.2": 6,    "rent-t0.3": 12,   "rent-t0.4": None, "rent-t1": 30,   "rent-t2": 90,   "rent-t3": 270,  "rent-t4": 400,  "rent-t5": 550,  "type": "property"},
+    {"houses": None, "group": None, "space_num": 8,    "name": "Chance",               "owner": None, "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "card"    },
+    {"houses": 0,    "group": 2,    "space_num": 9,    "name": "Vermont Avenue",       "owner": 0,    "price": 100,  "rent-t0.1": 6,    "rent-t0.2": 6,    "rent-t0.3": 12,   "rent-t0.4": None, "rent-t1": 30,   "rent-t2": 90,   "rent-t3": 270,  "rent-t4": 400,  "rent-t5": 550,  "type": "property"},
+    {"houses": 0,    "group": 2,    "space_num": 10,   "name": "Connecticut Avenue",   "owner": 0,    "price": 120,  "rent-t0.1": 8,    "rent-t0.2": 8,    "rent-t0.3": 16,   "rent-t0.4": None, "rent-t1": 40,   "rent-t2": 100,  "rent-t3": 300,  "rent-t4": 450,  "rent-t5": 600,  "type": "property"},
+    {"houses": None, "group": None, "space_num": 11,   "name": "Jail",                 "owner": None, "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "special" },
+    {"houses": 0,    "group": 3,    "space_num": 12,   "name": "St. Charles Place",    "owner": 0,    "price": 140,  "rent-t0.1": 10,   "rent-t0.2": 10,   "rent-t0.3": 20,   "rent-t0.4": None, "rent-t1": 50,   "rent-t2": 150,  "rent-t3": 450,  "rent-t4": 625,  "rent-t5": 750,  "type": "property"},
+    {"houses": None, "group": 10,   "space_num": 13,   "name": "Electric Company",     "owner": 0,    "price": 50,   "rent-t0.1": 100,  "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "utility" },
+    {"houses": 0,    "group": 3,    "space_num": 14,   "name": "States Avenue",        "owner": 0,    "price": 140,  "rent-t0.1": 10,   "rent-t0.2": 10,   "rent-t0.3": 20,   "rent-t0.4": None, "rent-t1": 50,   "rent-t2": 150,  "rent-t3": 450,  "rent-t4": 625,  "rent-t5": 750,  "type": "property"},
+    {"houses": 0,    "group": 3,    "space_num": 15,   "name": "Virginia Avenue",      "owner": 0,    "price": 160,  "rent-t0.1": 12,   "rent-t0.2": 12,   "rent-t0.3": 24,   "rent-t0.4": None, "rent-t1": 60,   "rent-t2": 180,  "rent-t3": 500,  "rent-t4": 700,  "rent-t5": 900,  "type": "property"},
+    {"houses": None, "group": 9,    "space_num": 16,   "name": "Pennsylvania Railroad","owner": 0,    "price": 200,  "rent-t0.1": 25,   "rent-t0.2": 50,   "rent-t0.3": 100,  "rent-t0.4": 200,  "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "railroad"},
+    {"houses": 0,    "group": 4,    "space_num": 17,   "name": "St. James Place",      "owner": 0,    "price": 180,  "rent-t0.1": 14,   "rent-t0.2": 14,   "rent-t0.3": 28,   "rent-t0.4": None, "rent-t1": 70,   "rent-t2": 200,  "rent-t3": 550,  "rent-t4": 750,  "rent-t5": 950,  "type": "property"},
+    {"houses": None, "group": None, "space_num": 18,   "name": "Community Chest",      "owner": None, "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "card"    },
+    {"houses": 0,    "group": 4,    "space_num": 19,   "name": "Tennessee Avenue",     "owner": 0,    "price": 180,  "rent-t0.1": 14,   "rent-t0.2": 14,   "rent-t0.3": 28,   "rent-t0.4": None, "rent-t1": 70,   "rent-t2": 200,  "rent-t3": 550,  "rent-t4": 750,  "rent-t5": 950,  "type": "property"},
+    {"houses": 0,    "group": 4,    "space_num": 20,   "name": "New York Avenue",      "owner": 0,    "price": 200,  "rent-t0.1": 16,   "rent-t0.2": 16,   "rent-t0.3": 32,   "rent-t0.4": None, "rent-t1": 80,   "rent-t2": 220,  "rent-t3": 600,  "rent-t4": 800,  "rent-t5": 1000, "type": "property"},
+    {"houses": None, "group": None, "space_num": 21,   "name": "Free Parking",         "owner": None, "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "special" },
+    {"houses": 0,    "group": 5,    "space_num": 22,   "name": "Kentucky Avenue",      "owner": 0,    "price": 220,  "rent-t0.1": 18,   "rent-t0.2": 18,   "rent-t0.3": 26,   "rent-t0.4": None, "rent-t1": 90,   "rent-t2": 250,  "rent-t3": 700,  "rent-t4": 875,  "rent-t5": 1050, "type": "property"},
+    {"houses": None, "group": None, "space_num": 23,   "name": "Chance",               "owner": None, "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "card"    },
+    {"houses": 0,    "group": 5,    "space_num": 24,   "name": "Indiana Avenue",       "owner": 0,    "price": 220,  "rent-t0.1": 18,   "rent-t0.2": 18,   "rent-t0.3": 36,   "rent-t0.4": None, "rent-t1": 90,   "rent-t2": 250,  "rent-t3": 700,  "rent-t4": 875,  "rent-t5": 1050, "type": "property"},
+    {"houses": 0,    "group": 5,    "space_num": 25,   "name": "Illinois Avenue",      "owner": 0,    "price": 240,  "rent-t0.1": 20,   "rent-t0.2": 20,   "rent-t0.3": 40,   "rent-t0.4": None, "rent-t1": 100,  "rent-t2": 300,  "rent-t3": 750,  "rent-t4": 925,  "rent-t5": 1100, "type": "property"},
+    {"houses": None, "group": 9,    "space_num": 26,   "name": "B. & O. Railroad",     "owner": 0,    "price": 200,  "rent-t0.1": 25,   "rent-t0.2": 50,   "rent-t0.3": 100,  "rent-t0.4": 200,  "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "railroad"},
+    {"houses": 0,    "group": 6,    "space_num": 27,   "name": "Atlantic Avenue",      "owner": 0,    "price": 260,  "rent-t0.1": 22,   "rent-t0.2": 22,   "rent-t0.3": 44,   "rent-t0.4": None, "rent-t1": 110,  "rent-t2": 330,  "rent-t3": 800,  "rent-t4": 975,  "rent-t5": 1150, "type": "property"},
+    {"houses": 0,    "group": 6,    "space_num": 28,   "name": "Ventor Avenue",        "owner": 0,    "price": 260,  "rent-t0.1": 22,   "rent-t0.2": 22,   "rent-t0.3": 44,   "rent-t0.4": None, "rent-t1": 110,  "rent-t2": 330,  "rent-t3": 800,  "rent-t4": 975,  "rent-t5": 1150, "type": "property"},
+    {"houses": None, "group": 10,   "space_num": 29,   "name": "Water Works",          "owner": 0,    "price": 50,   "rent-t0.1": 40,   "rent-t0.2": 100,  "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "utility" },
+    {"houses": 0,    "group": 6,    "space_num": 30,   "name": "Marvin Gardens",       "owner": 0,    "price": 280,  "rent-t0.1": 24,   "rent-t0.2": 24,   "rent-t0.3": 48,   "rent-t0.4": None, "rent-t1": 120,  "rent-t2": 360,  "rent-t3": 850,  "rent-t4": 1025, "rent-t5": 1200, "type": "property"},
+    {"houses": None, "group": None, "space_num": 31,   "name": "Go to Jail",           "owner": None, "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "special" },
+    {"houses": 0,    "group": 7,    "space_num": 32,   "name": "Pacific Avenue",       "owner": 0,    "price": 300,  "rent-t0.1": 26,   "rent-t0.2": 26,   "rent-t0.3": 52,   "rent-t0.4": None, "rent-t1": 130,  "rent-t2": 390,  "rent-t3": 900,  "rent-t4": 1100, "rent-t5": 1275, "type": "property"},
+    {"houses": 0,    "group": 7,    "space_num": 33,   "name": "North Carolina Avenue","owner": 0,    "price": 300,  "rent-t0.1": 26,   "rent-t0.2": 26,   "rent-t0.3": 52,   "rent-t0.4": None, "rent-t1": 130,  "rent-t2": 390,  "rent-t3": 900,  "rent-t4": 1100, "rent-t5": 1275, "type": "property"},
+    {"houses": None, "group": None, "space_num": 34,   "name": "Community Chest",      "owner": None, "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "card"    },
+    {"houses": 0,    "group": 7,    "space_num": 35,   "name": "Pennsylvania Avenue",  "owner": 0,    "price": 320,  "rent-t0.1": 28,   "rent-t0.2": 28,   "rent-t0.3": 56,   "rent-t0.4": None, "rent-t1": 150,  "rent-t2": 450,  "rent-t3": 1000, "rent-t4": 1200, "rent-t5": 1400, "type": "property"},
+    {"houses": None, "group": 9,    "space_num": 36,   "name": "Short Line Railroad",  "owner": 0,    "price": 200,  "rent-t0.1": 25,   "rent-t0.2": 50,   "rent-t0.3": 100,  "rent-t0.4": 200,  "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "railroad"},
+    {"houses": None, "group": None, "space_num": 37,   "name": "Chance",               "owner": None, "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "card"    },
+    {"houses": 0,    "group": 8,    "space_num": 38,   "name": "Park Place",           "owner": 0,    "price": 350,  "rent-t0.1": 35,   "rent-t0.2": 70,   "rent-t0.3": None, "rent-t0.4": None, "rent-t1": 175,  "rent-t2": 500,  "rent-t3": 1100, "rent-t4": 1300, "rent-t5": 1500, "type": "property"},
+    {"houses": None, "group": None, "space_num": 39,   "name": "Luxury Tax",           "owner": None, "price": None, "rent-t0.1": 75,   "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "special" },
+    {"houses": 0,    "group": 8,    "space_num": 40,   "name": "Boardwalk",            "owner": 0,    "price": 400,  "rent-t0.1": 50,   "rent-t0.2": 100,  "rent-t0.3": None, "rent-t0.4": None, "rent-t1": 200,  "rent-t2": 600,  "rent-t3": 1400, "rent-t4": 1700, "rent-t5": 2000, "type": "property"},
+]
+
+
+# Dimensions of the dense rent table, 0-5 houses and 0-4 properties owned in the group
+RENT_HOUSE_LEVELS = 6
+RENT_OWNED_LEVELS = 5
+RENT_SPACE_STRIDE = RENT_HOUSE_LEVELS * RENT_OWNED_LEVELS
+
+def build_rent_table(spaces):
+    """Build a flat rent table indexed by (space index, houses, properties owned in the group)."""
+    table = []
+    for space in spaces:
+        for houses in range(RENT_HOUSE_LEVELS):
+            for owned in range(RENT_OWNED_LEVELS):
+                if owned == 0:
+                    # Nobody owns the space so there is no rent
+                    rent_key = None
+                elif houses > 0:
+                    # When > 0 houses the number of houses matters
+                    rent_key = f"rent-t{houses}"
+                elif space["group"] is None:
+                    rent_key = "rent-t0.1"
+                else:
+                    # When 0 houses the group size matters
+                    rent_key = f"rent-t0.{owned}"
+
+                # Combinations that can't happen on this space are stored as no rent
+                table.append(space.get(rent_key) or 0)
+
+    return table
+
+# The rent table only depends on the static board data so it's built once when the board is loaded
+RENT_TABLE = build_rent_table(BOARD_SPACES)
+
+
 class MonopolyBoard:
     """Initialization data and logic for the board of the game itself"""
     def __init__(self):
-        # Initialize the board with properties
-        self.properties = [
-            {"houses": None, "group": None, "space_num": 1,    "name": "Go",                   "owner": 0,    "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "special" },
-            {"houses": 0,    "group": 1,    "space_num": 2,    "name": "Mediterranean Avenue", "owner": None, "price": 60,   "rent-t0.1": 2,    "rent-t0.2": 4,    "rent-t0.3": None, "rent-t0.4": None, "rent-t1": 10,   "rent-t2": 30,   "rent-t3": 90,   "rent-t4": 160,  "rent-t5": 250,  "type": "property"},
-            {"houses": None, "group": None, "space_num": 3,    "name": "Community Chest",      "owner": 0,    "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "card"    },
-            {"houses": 0,    "group": 1,    "space_num": 4,    "name": "Baltic Avenue",        "owner": None, "price": 60,   "rent-t0.1": 4,    "rent-t0.2": 8,    "rent-t0.3": None, "rent-t0.4": None, "rent-t1": 20,   "rent-t2": 60,   "rent-t3": 180,  "rent-t4": 320,  "rent-t5": 450,  "type": "property"},
-            {"houses": None, "group": None, "space_num": 5,    "name": "Income Tax",           "owner": 0,    "price": None, "rent-t0.1": 200,  "rent-t0.2": 200,  "rent-t0.3": 200,  "rent-t0.4": 200,  "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "special" },
-            {"houses": None, "group": 9,    "space_num": 6,    "name": "Reading Railroad",     "owner": None, "price": 200,  "rent-t0.1": 25,   "rent-t0.2": 50,   "rent-t0.3": 100,  "rent-t0.4": 200,  "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "railroad"},
-            {"houses": 0,    "group": 2,    "space_num": 7,    "name": "Oriental Avenue",      "owner": None, "price": 100,  "rent-t0.1": 6,    "rent-t0.2": 6,    "rent-t0.3": 12,   "rent-t0.4": None, "rent-t1": 30,   "rent-t2": 90,   "rent-t3": 270,  "rent-t4": 400,  "rent-t5": 550,  "type": "property"},
-            {"houses": None, "group": None, "space_num": 8,    "name": "Chance",               "owner": 0,    "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "card"    },
-            {"houses": 0,    "group": 2,    "space_num": 9,    "name": "Vermont Avenue",       "owner": None, "price": 100,  "rent-t0.1": 6,    "rent-t0.2": 6,    "rent-t0.3": 12,   "rent-t0.4": None, "rent-t1": 30,   "rent-t2": 90,   "rent-t3": 270,  "rent-t4": 400,  "rent-t5": 550,  "type": "property"},
-            {"houses": 0,    "group": 2,    "space_num": 10,   "name": "Connecticut Avenue",   "owner": None, "price": 120,  "rent-t0.1": 8,    "rent-t0.2": 8,    "rent-t0.3": 16,   "rent-t0.4": None, "rent-t1": 40,   "rent-t2": 100,  "rent-t3": 300,  "rent-t4": 450,  "rent-t5": 600,  "type": "property"},
-            {"houses": None, "group": None, "space_num": 11,   "name": "Jail",                 "owner": 0,    "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "special" },
-            {"houses": 0,    "group": 3,    "space_num": 12,   "name": "St. Charles Place",    "owner": None, "price": 140,  "rent-t0.1": 10,   "rent-t0.2": 10,   "rent-t0.3": 20,   "rent-t0.4": None, "rent-t1": 50,   "rent-t2": 150,  "rent-t3": 450,  "rent-t4": 625,  "rent-t5": 750,  "type": "property"},
-            {"houses": None, "group": 10,   "space_num": 13,   "name": "Electric Company",     "owner": None, "price": 50,   "rent-t0.1": 100,  "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "utility" },
-            {"houses": 0,    "group": 3,    "space_num": 14,   "name": "States Avenue",        "owner": None, "price": 140,  "rent-t0.1": 10,   "rent-t0.2": 10,   "rent-t0.3": 20,   "rent-t0.4": None, "rent-t1": 50,   "rent-t2": 150,  "rent-t3": 450,  "rent-t4": 625,  "rent-t5": 750,  "type": "property"},
-            {"houses": 0,    "group": 3,    "space_num": 15,   "name": "Virginia Avenue",      "owner": None, "price": 160,  "rent-t0.1": 12,   "rent-t0.2": 12,   "rent-t0.3": 24,   "rent-t0.4": None, "rent-t1": 60,   "rent-t2": 180,  "rent-t3": 500,  "rent-t4": 700,  "rent-t5": 900,  "type": "property"},
-            {"houses": None, "group": 9,    "space_num": 16,   "name": "Pennsylvania Railroad","owner": None, "price": 200,  "rent-t0.1": 25,   "rent-t0.2": 50,   "rent-t0.3": 100,  "rent-t0.4": 200,  "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "railroad"},
-            {"houses": 0,    "group": 4,    "space_num": 17,   "name": "St. James Place",      "owner": None, "price": 180,  "rent-t0.1": 14,   "rent-t0.2": 14,   "rent-t0.3": 28,   "rent-t0.4": None, "rent-t1": 70,   "rent-t2": 200,  "rent-t3": 550,  "rent-t4": 750,  "rent-t5": 950,  "type": "property"},
-            {"houses": None, "group": None, "space_num": 18,   "name": "Community Chest",      "owner": 0,    "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "card"    },
-            {"houses": 0,    "group": 4,    "space_num": 19,   "name": "Tennessee Avenue",     "owner": None, "price": 180,  "rent-t0.1": 14,   "rent-t0.2": 14,   "rent-t0.3": 28,   "rent-t0.4": None, "rent-t1": 70,   "rent-t2": 200,  "rent-t3": 550,  "rent-t4": 750,  "rent-t5": 950,  "type": "property"},
-            {"houses": 0,    "group": 4,    "space_num": 20,   "name": "New York Avenue",      "owner": None, "price": 200,  "rent-t0.1": 16,   "rent-t0.2": 16,   "rent-t0.3": 32,   "rent-t0.4": None, "rent-t1": 80,   "rent-t2": 220,  "rent-t3": 600,  "rent-t4": 800,  "rent-t5": 1000, "type": "property"},
-            {"houses": None, "group": None, "space_num": 21,   "name": "Free Parking",         "owner": 0,    "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "special" },
-            {"houses": 0,    "group": 5,    "space_num": 22,   "name": "Kentucky Avenue",      "owner": None, "price": 220,  "rent-t0.1": 18,   "rent-t0.2": 18,   "rent-t0.3": 26,   "rent-t0.4": None, "rent-t1": 90,   "rent-t2": 250,  "rent-t3": 700,  "rent-t4": 875,  "rent-t5": 1050, "type": "property"},
-            {"houses": None, "group": None, "space_num": 23,   "name": "Chance",               "owner": 0,    "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "card"    },
-            {"houses": 0,    "group": 5,    "space_num": 24,   "name": "Indiana Avenue",       "owner": None, "price": 220,  "rent-t0.1": 18,   "rent-t0.2": 18,   "rent-t0.3": 36,   "rent-t0.4": None, "rent-t1": 90,   "rent-t2": 250,  "rent-t3": 700,  "rent-t4": 875,  "rent-t5": 1050, "type": "property"},
-            {"houses": 0,    "group": 5,    "space_num": 25,   "name": "Illinois Avenue",      "owner": None, "price": 240,  "rent-t0.1": 20,   "rent-t0.2": 20,   "rent-t0.3": 40,   "rent-t0.4": None, "rent-t1": 100,  "rent-t2": 300,  "rent-t3": 750,  "rent-t4": 925,  "rent-t5": 1100, "type": "property"},
-            {"houses": None, "group": 9,    "space_num": 26,   "name": "B. & O. Railroad",     "owner": None, "price": 200,  "rent-t0.1": 25,   "rent-t0.2": 50,   "rent-t0.3": 100,  "rent-t0.4": 200,  "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "railroad"},
-            {"houses": 0,    "group": 6,    "space_num": 27,   "name": "Atlantic Avenue",      "owner": None, "price": 260,  "rent-t0.1": 22,   "rent-t0.2": 22,   "rent-t0.3": 44,   "rent-t0.4": None, "rent-t1": 110,  "rent-t2": 330,  "rent-t3": 800,  "rent-t4": 975,  "rent-t5": 1150, "type": "property"},
-            {"houses": 0,    "group": 6,    "space_num": 28,   "name": "Ventor Avenue",        "owner": None, "price": 260,  "rent-t0.1": 22,   "rent-t0.2": 22,   "rent-t0.3": 44,   "rent-t0.4": None, "rent-t1": 110,  "rent-t2": 330,  "rent-t3": 800,  "rent-t4": 975,  "rent-t5": 1150, "type": "property"},
-            {"houses": None, "group": 10,   "space_num": 29,   "name": "Water Works",          "owner": None, "price": 50,   "rent-t0.1": 40,   "rent-t0.2": 100,  "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "utility" },
-            {"houses": None, "group": 6,    "space_num": 30,   "name": "Marvin Gardens",       "owner": None, "price": 280,  "rent-t0.1": 24,   "rent-t0.2": 24,   "rent-t0.3": 48,   "rent-t0.4": None, "rent-t1": 120,  "rent-t2": 360,  "rent-t3": 850,  "rent-t4": 1025, "rent-t5": 1200, "type": "property"},
-            {"houses": None, "group": None, "space_num": 31,   "name": "Go to Jail",           "owner": 0,    "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "special" },
-            {"houses": 0,    "group": 7,    "space_num": 32,   "name": "Pacific Avenue",       "owner": None, "price": 300,  "rent-t0.1": 26,   "rent-t0.2": 26,   "rent-t0.3": 52,   "rent-t0.4": None, "rent-t1": 130,  "rent-t2": 390,  "rent-t3": 900,  "rent-t4": 1100, "rent-t5": 1275, "type": "property"},
-            {"houses": 0,    "group": 7,    "space_num": 33,   "name": "North Carolina Avenue","owner": None, "price": 300,  "rent-t0.1": 26,   "rent-t0.2": 26,   "rent-t0.3": 52,   "rent-t0.4": None, "rent-t1": 130,  "rent-t2": 390,  "rent-t3": 900,  "rent-t4": 1100, "rent-t5": 1275, "type": "property"},
-            {"houses": None, "group": None, "space_num": 34,   "name": "Community Chest",      "owner": 0,    "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "card"    },
-            {"houses": 0,    "group": 7,    "space_num": 35,   "name": "Pennsylvania Avenue",  "owner": None, "price": 320,  "rent-t0.1": 28,   "rent-t0.2": 28,   "rent-t0.3": 56,   "rent-t0.4": None, "rent-t1": 150,  "rent-t2": 450,  "rent-t3": 1000, "rent-t4": 1200, "rent-t5": 1400, "type": "property"},
-            {"houses": None, "group": 9,    "space_num": 36,   "name": "Short Line Railroad",  "owner": None, "price": 200,  "rent-t0.1": 25,   "rent-t0.2": 50,   "rent-t0.3": 100,  "rent-t0.4": 200,  "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "railroad"},
-            {"houses": None, "group": None, "space_num": 37,   "name": "Chance",               "owner": 0,    "price": None, "rent-t0.1": 0,    "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "card"    },
-            {"houses": 0,    "group": 8,    "space_num": 38,   "name": "Park Place",           "owner": None, "price": 350,  "rent-t0.1": 35,   "rent-t0.2": 70,   "rent-t0.3": None, "rent-t0.4": None, "rent-t1": 175,  "rent-t2": 500,  "rent-t3": 1100, "rent-t4": 1300, "rent-t5": 1500, "type": "property"},
-            {"houses": None, "group": None, "space_num": 39,   "name": "Luxury Tax",           "owner": 0,    "price": None, "rent-t0.1": 75,   "rent-t0.2": None, "rent-t0.3": None, "rent-t0.4": None, "rent-t1": None, "rent-t2": None, "rent-t3": None, "rent-t4": None, "rent-t5": None, "type": "special" },
-            {"houses": 0,    "group": 8,    "space_num": 40,   "name": "Boardwalk",            "owner": None, "price": 400,  "rent-t0.1": 50,   "rent-t0.2": 100,  "rent-t0.3": None, "rent-t0.4": None, "rent-t1": 200,  "rent-t2": 600,  "rent-t3": 1400, "rent-t4": 1700, "rent-t5": 2000, "type": "property"},
-        ]
+        # Initialize the board with properties, each board gets its own copy of the mutable dictionaries
+        self.properties = [dict(space) for space in BOARD_SPACES]
+
+        # Build the lookup indexes once so the per-turn methods don't have to scan the board
+        self.build_indexes()
+        self.rent_table = RENT_TABLE
+
+        # Callbacks to run with the space_num whenever an owner or house count changes
+        self.listeners = []
+
+    def add_listener(self, callback):
+        """Register a callback to be called with the space_num of any space whose owner or houses change."""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Stop calling a callback registered with add_listener."""
+        self.listeners.remove(callback)
+
+    def notify(self, space_num):
+        """Let the listeners know a space has changed."""
+        for callback in self.listeners:
+            callback(space_num)
+
+    def build_indexes(self):
+        """Build the space number and group indexes for the board."""
+        # The dictionaries are shared with self.properties, so owner and house changes are always reflected
+        self.space_index = {prop["space_num"]: prop for prop in self.properties}
+
+        # Group membership never changes during a game so it is stored as a tuple
+        groups = {}
+        for prop in self.properties:
+            if prop.get("group") is not None:
+                groups.setdefault(prop["group"], []).append(prop)
+        self.group_index = {group: tuple(members) for group, members in groups.items()}
 
     def property_by_space_num(self, space_num):
         """Get the property at the given space_num."""
         # Allows indexing by space_num instead of dictionary order
-        for property in self.properties:
-            if property["space_num"] == space_num:
-                return property
-
-        # If it's not found raise an error
-        raise ValueError(f"Invalid space number {space_num}")
+        try:
+            return self.space_index[space_num]
+        except (KeyError, TypeError):
+            # If it's not found raise an error
+            raise ValueError(f"Invalid space number {space_num}") from None
 
     def properties_by_group(self, group):
         """Get all properties in the given group."""
-        return [prop for prop in self.properties if prop.get("group") == group]
+        return self.group_index.get(group, ())
 
     def set_owner(self, space_num, player_number):
         """Set the owner of the property at the given space_num."""
         prop = self.property_by_space_num(space_num)
         if prop:
             prop["owner"] = player_number
+            self.notify(space_num)
 
             return
 
@@ -101,6 +169,8 @@ class MonopolyBoard:
         for p in group_properties:
             p["houses"] += 1
 
+        self.notify(space_num)
+
     def land_action(self, player_number, space_num):
         """Return what type of action needs to happen."""
         # Look up the space and bail if it's not found
@@ -222,89 +292,105 @@ class MonopolyBoard:
 
         return cash >= prop.get("price")
 
+    def owned_rent(self, space_num):
+        """Return the owner of the space at space_num and the rent anyone else would pay them."""
+        prop = self.property_by_space_num(space_num)
+
+        # Unowned or board owned spaces don't charge rent
+        owner = prop["owner"]
+        if not owner:
+            return owner, 0
+
+        # Spaces that can't have houses are treated as having none
+        houses = prop["houses"] or 0
+
+        # The group size only matters with 0 houses, and spaces outside a group always use the first tier
+        group = prop["group"]
+        if houses or group is None:
+            owned = 1
+        else:
+            owned = 0
+            for p in self.group_index[group]:
+                if p["owner"] == owner:
+                    owned += 1
+
+        return owner, self.rent_table[(space_num - 1) * RENT_SPACE_STRIDE + houses * RENT_OWNED_LEVELS + owned]
+
     def rent_cost(self, space_num, player_number):
         """Determine the cost of rent for the given player landing on the space space_num."""
-        # must be a valid space
-        prop = self.property_by_space_num(space_num)
-        if not prop:
-            # If it's not found raise an error
-            raise ValueError(f"Invalid space number {space_num}")
+        owner, rent = self.owned_rent(space_num)
 
         # Players don't pay their own rent
-        owner = prop.get("owner")
         if owner == player_number:
             return 0
-        # Or rent to beyable spaces
-        if owner == 0:
-            return 0
 
-        # Houses factor in
-        houses = prop.get("houses", 0)
-        if houses == 0:
-            # When 0 houses the group size matters
-            group = prop.get("group")
-            if group is None:
-                rent_key = "rent-t0.1"
-            else:
-                group_properties = self.properties_by_group(group)
-                owned_properties = sum(1 for p in group_properties if p.get("owner") == owner)
-                rent_key = f"rent-t0.{owned_properties}"
-        else:
-            # when > 0 houses the number of houses matters
-            rent_key = f"rent-t{houses}"
+        return rent
 
-        return prop.get(rent_key)
+    def rent_costs(self, spaces, players):
+        """Determine the cost of rent for many (space_num, player_number) pairs at once."""
+        # Each space's rent only has to be worked out once for the whole batch
+        owned_rents = {}
+        costs = []
+        for space_num, player_number in zip(spaces, players):
+            owned_rent = owned_rents.get(space_num)
+            if owned_rent is None:
+                owned_rent = owned_rents[space_num] = self.owned_rent(space_num)
 
+            costs.append(0 if owned_rent[0] == player_number else owned_rent[1])
 
-board = MonopolyBoard();
+        return costs
 
+board = MonopolyBoard();
 
-def draw_card(type):
-    """Draw a random card based on the type"""
-    chance = [
-        "Advance to Boardwalk.",
-        "Advance to Go (Collect $200).",
-        "Advance to Illinois Avenue. If you pass Go, collect $200.",
-        "Advance to St. Charles Place. If you pass Go, collect $200.",
-        "Advance to the nearest Railroad. If unowned, you may buy it from the Bank. If owned, pay wonder twice the rental to which they are otherwise entitled.",
-        "Advance to the nearest Railroad. If unowned, you may buy it from the Bank. If owned, pay wonder twice the rental to which they are otherwise entitled.",
-        "Advance token to nearest Utility. If unowned, you may buy it from the Bank. If owned, throw dice and pay owner a total ten times amount thrown.",
-        "Bank pays you dividend of $50.",
-        "Get Out of Jail Free.",
-        "Go Back 3 Spaces.",
-        "Go to Jail. Go directly to Jail, do not pass Go, do not collect $200.",
-        "Make general repairs on all your property. For each house pay $25. For each hotel pay $100.",
-        "Speeding fine $15.",
-        "Take a trip to Reading Railroad. If you pass Go, collect $200.",
-        "You have been elected Chairman of the Board. Pay each player $50.",
-        "Your building loan matures. Collect $150",
-    ]
-
-    community = [
-        "Community Chest",
-        "Advance to Go (Collect $200)",
-        "Bank error in your favor. Collect $200",
-        "Doctor’s fee. Pay $50",
-        "From sale of stock you get $50",
-        "Get Out of Jail Free",
-        "Go to Jail. Go directly to jail, do not pass Go, do not collect $200",
-        "Holiday fund matures. Receive $100",
-        "Income tax refund. Collect $20",
-        "It is your birthday. Collect $10 from every player",
-        "Life insurance matures. Collect $100",
-        "Pay hospital fees of $100",
-        "Pay school fees of $50",
-        "Receive $25 consultancy fee",
-        "You are assessed for street repair. $40 per house. $115 per hotel",
-        "You have won second prize in a beauty contest. Collect $10",
-        "You inherit $100",
-    ]
 
+# The text of every card in each deck
+CHANCE_CARDS = (
+    "Advance to Boardwalk.",
+    "Advance to Go (Collect $200).",
+    "Advance to Illinois Avenue. If you pass Go, collect $200.",
+    "Advance to St. Charles Place. If you pass Go, collect $200.",
+    "Advance to the nearest Railroad. If unowned, you may buy it from the Bank. If owned, pay wonder twice the rental to which they are otherwise entitled.",
+    "Advance to the nearest Railroad. If unowned, you may buy it from the Bank. If owned, pay wonder twice the rental to which they are otherwise entitled.",
+    "Advance token to nearest Utility. If unowned, you may buy it from the Bank. If owned, throw dice and pay owner a total ten times amount thrown.",
+    "Bank pays you dividend of $50.",
+    "Get Out of Jail Free.",
+    "Go Back 3 Spaces.",
+    "Go to Jail. Go directly to Jail, do not pass Go, do not collect $200.",
+    "Make general repairs on all your property. For each house pay $25. For each hotel pay $100.",
+    "Speeding fine $15.",
+    "Take a trip to Reading Railroad. If you pass Go, collect $200.",
+    "You have been elected Chairman of the Board. Pay each player $50.",
+    "Your building loan matures. Collect $150",
+)
+
+COMMUNITY_CARDS = (
+    "Community Chest",
+    "Advance to Go (Collect $200)",
+    "Bank error in your favor. Collect $200",
+    "Doctor’s fee. Pay $50",
+    "From sale of stock you get $50",
+    "Get Out of Jail Free",
+    "Go to Jail. Go directly to jail, do not pass Go, do not collect $200",
+    "Holiday fund matures. Receive $100",
+    "Income tax refund. Collect $20",
+    "It is your birthday. Collect $10 from every player",
+    "Life insurance matures. Collect $100",
+    "Pay hospital fees of $100",
+    "Pay school fees of $50",
+    "Receive $25 consultancy fee",
+    "You are assessed for street repair. $40 per house. $115 per hotel",
+    "You have won second prize in a beauty contest. Collect $10",
+    "You inherit $100",
+)
+
+
+def draw_card(type, rng=random):
+    """Draw a random card based on the type, rng can be a random.Random to get a separate seedable stream"""
     # 2 types of cards so we try to leniently match which based on the type argument
     if(type.lower() == "chance"):
-        return random.choice(chance)
+        return rng.choice(CHANCE_CARDS)
     if(type.lower() == "community chest" or type.lower() == "community" or type.lower() == "chest"):
-        return random.choice(community)
+        return rng.choice(COMMUNITY_CARDS)
 
     raise ValueError("Invalid card type")
 
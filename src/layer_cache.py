@@ -0,0 +1,85 @@
+"""
+Static layers of a view drawn once into an offscreen framebuffer, then drawn each frame as a single textured quad.
+
+A CachedLayer is given a function drawing everything that doesn't change from frame to frame, such as the board or
+the help text. The first draw clears an offscreen framebuffer to the window's background color and runs the function
+into it; every draw after that only copies the finished image to the screen, and replaces clearing the window. The
+layer is drawn again when it is invalidated, or when the window's framebuffer changes size.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import arcade
+from arcade.gl import geometry
+
+
+VERTEX_SHADER = """
+#version 330
+
+in vec2 in_vert;
+in vec2 in_uv;
+
+out vec2 uv;
+
+void main() {
+    gl_Position = vec4(in_vert, 0.0, 1.0);
+    uv = in_uv;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+
+uniform sampler2D layer;
+
+in vec2 uv;
+
+out vec4 fragment_color;
+
+void main() {
+    // The layer is opaque, but blending into it leaves alpha below 1 where anything translucent was drawn
+    fragment_color = vec4(texture(layer, uv).rgb, 1.0);
+}
+"""
+
+
+class CachedLayer:
+    """Everything a draw function draws, kept in a texture until it is invalidated."""
+    def __init__(self, draw_layer):
+        """Constructor"""
+        self.draw_layer  = draw_layer
+        self.valid       = False
+        self.texture     = None
+        self.framebuffer = None
+        self.program     = None
+        self.quad        = None
+
+    def invalidate(self):
+        """Draw the layer again the next time it is drawn, for when anything in it has changed."""
+        self.valid = False
+
+    def render(self):
+        """Draw the layer into the offscreen framebuffer, making a new one if the window has changed size."""
+        window = arcade.get_window()
+        ctx = window.ctx
+        size = window.get_framebuffer_size()
+
+        if self.texture is None or self.texture.size != size:
+            self.texture     = ctx.texture(size, components=4)
+            self.framebuffer = ctx.framebuffer(color_attachments=[self.texture])
+        if self.program is None:
+            self.program = ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
+            self.quad    = geometry.quad_2d_fs()
+
+        with self.framebuffer.activate():
+            self.framebuffer.clear(arcade.get_four_byte_color(window.background_color))
+            self.draw_layer()
+        self.valid = True
+
+    def draw(self):
+        """Draw the layer over the whole window, drawing it into the framebuffer first if needed."""
+        if not self.valid or self.texture.size != arcade.get_window().get_framebuffer_size():
+            self.render()
+
+        self.texture.use(0)
+        self.quad.render(self.program)
@@ -0,0 +1,201 @@
+"""
+Exact long-run landing probabilities for every space, found by solving the game's movement as a Markov chain.
+
+Each state is where a player is after one roll of the dice: a board position together with how many doubles have been
+rolled in a row, or one of the jail states. The rules include the Go to Jail space, the movement cards in the Chance and
+Community Chest decks, speeding on three doubles in a row and the jail rules used by engine.GameEngine. Cards are treated as
+drawn at random, and held Get Out of Jail Free cards aren't modelled, so a jailed player always tries to roll out.
+
+Solutions are cached by a fingerprint of the rule set so repeated queries are free.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import hashlib
+import json
+
+import numpy as np
+
+from . import cards
+from . import engine
+from . import game_state
+
+
+# The default rules, matching engine.GameEngine
+DEFAULT_RULES = {
+    "cards":          True,
+    "doubles":        True,
+    "max_doubles":    engine.MAX_DOUBLES,
+    "max_jail_turns": engine.MAX_JAIL_TURNS,
+    "jail_space":     engine.JAIL_SPACE,
+}
+
+# Solutions keyed by rule set fingerprint
+SOLUTION_CACHE = {}
+
+
+def rules_fingerprint(rules, board):
+    """Hash everything that affects the chain, so any change to the rules, board or decks gives a new fingerprint."""
+    key = {
+        "rules":     rules,
+        "spaces":    [(prop["space_num"], prop["type"], prop["name"]) for prop in board.properties],
+        "chance":    list(game_state.CHANCE_CARDS),
+        "community": list(game_state.COMMUNITY_CARDS),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+class LandingSolution:
+    """The solved chain for one rule set."""
+    def __init__(self, fingerprint, landing, rolls_per_turn):
+        """Constructor"""
+        self.fingerprint    = fingerprint
+        # Probability of ending a roll on each space, indexed by space_num - 1
+        self.landing        = landing
+        # Average number of rolls in a turn, more than 1 because of doubles
+        self.rolls_per_turn = rolls_per_turn
+
+    def probability(self, space_num):
+        """Probability that a roll ends on the given space."""
+        return self.landing[space_num - 1]
+
+    def per_turn(self, space_num):
+        """Expected number of times a single turn ends a roll on the given space."""
+        return self.landing[space_num - 1] * self.rolls_per_turn
+
+class MarkovChain:
+    """Builds the transition matrix for a rule set and solves it for the stationary distribution."""
+    def __init__(self, rules=None, board=None):
+        """Constructor"""
+        self.rules = dict(DEFAULT_RULES, **(rules or {}))
+        self.board = board if board is not None else game_state.MonopolyBoard()
+        self.space_count = len(self.board.properties)
+        self.max_doubles = self.rules["max_doubles"] if self.rules["doubles"] else 1
+        self.jail_index  = self.rules["jail_space"] - 1
+
+        # States are (position, doubles in a row) followed by the jail states for each failed attempt to roll out
+        self.jail_states = self.rules["max_jail_turns"]
+        self.state_count = self.space_count * self.max_doubles + self.jail_states
+
+        # What landing on each space does, using the same actions as the regular game
+        self.actions = [self.board.land_action(-1, prop["space_num"]) for prop in self.board.properties]
+
+    def state(self, position, doubles):
+        """Index of a free (not in jail) state."""
+        return position * self.max_doubles + doubles
+
+    def jail_state(self, attempts):
+        """Index of the state for a player in jail who has failed to roll out attempts times."""
+        return self.space_count * self.max_doubles + attempts
+
+    def resolve(self, position, depth=0):
+        """Return [(probability, position)] for where a player landing on position ends up, None meaning jail."""
+        action = self.actions[position]
+        if action == "move_to_jail":
+            return [(1.0, None)]
+        if not self.rules["cards"] or depth > 2 or action not in ("draw_chance_card", "draw_community_chest_card"):
+            return [(1.0, position)]
+
+        deck = game_state.CHANCE_CARDS if action == "draw_chance_card" else game_state.COMMUNITY_CARDS
+        outcomes = []
+        for card in deck:
+            weight = 1.0 / len(deck)
+            effect, value = cards.CARD_EFFECTS.get(card, ("nothing", None))
+
+            # Only the cards that move the player matter here
+            match effect:
+                case "jail":
+                    outcomes.append((weight, None))
+                case "advance":
+                    outcomes.append((weight, value - 1))
+                case "nearest_railroad":
+                    outcomes.append((weight, cards.NEAREST_RAILROAD[position] - 1))
+                case "nearest_utility":
+                    outcomes.append((weight, cards.NEAREST_UTILITY[position] - 1))
+                case "back":
+                    # Going back can land on another card space, which is drawn again
+                    for probability, destination in self.resolve((position - value) % self.space_count, depth + 1):
+                        outcomes.append((weight * probability, destination))
+                case _:
+                    outcomes.append((weight, position))
+
+        return outcomes
+
+    def transition_matrix(self):
+        """Build the matrix of probabilities of moving from each state (row) to each state (column) in one roll."""
+        matrix = np.zeros((self.state_count, self.state_count))
+        rolls = [(a, b) for a in range(1, 7) for b in range(1, 7)]
+        roll_probability = 1.0 / len(rolls)
+
+        # Where each landing spot ends up is the same for every starting state, so work it out once
+        resolved = [self.resolve(position) for position in range(self.space_count)]
+
+        def add_move(row, start, total, doubles_after, probability):
+            for outcome_probability, destination in resolved[(start + total) % self.space_count]:
+                if destination is None:
+                    column = self.jail_state(0)
+                else:
+                    column = self.state(destination, doubles_after)
+                matrix[row, column] += probability * outcome_probability
+
+        for position in range(self.space_count):
+            for doubles in range(self.max_doubles):
+                row = self.state(position, doubles)
+                for a, b in rolls:
+                    is_double = a == b and self.rules["doubles"]
+                    if is_double and doubles + 1 == self.max_doubles:
+                        # Speeding goes straight to jail
+                        matrix[row, self.jail_state(0)] += roll_probability
+                    else:
+                        add_move(row, position, a + b, doubles + 1 if is_double else 0, roll_probability)
+
+        for attempts in range(self.jail_states):
+            row = self.jail_state(attempts)
+            for a, b in rolls:
+                if a != b and attempts + 1 < self.jail_states:
+                    # Failed to roll out of jail, try again next turn
+                    matrix[row, self.jail_state(attempts + 1)] += roll_probability
+                else:
+                    # Rolled out or paid the fine, leaving jail never grants another roll
+                    add_move(row, self.jail_index, a + b, 0, roll_probability)
+
+        return matrix
+
+    def stationary(self, matrix):
+        """Solve pi = pi * P with the probabilities summing to 1."""
+        system = matrix.T - np.eye(self.state_count)
+        # Replace one equation with the normalization constraint so the system has a unique answer
+        system[-1, :] = 1.0
+        target = np.zeros(self.state_count)
+        target[-1] = 1.0
+        return np.linalg.solve(system, target)
+
+    def solve(self):
+        """Build and solve the chain, returning a LandingSolution."""
+        matrix = self.transition_matrix()
+        pi = self.stationary(matrix)
+
+        landing = np.zeros(self.space_count)
+        for position in range(self.space_count):
+            landing[position] = pi[position * self.max_doubles:(position + 1) * self.max_doubles].sum()
+        # Everyone in jail is sitting on the jail space
+        landing[self.jail_index] += pi[self.space_count * self.max_doubles:].sum()
+
+        # A roll ends the turn unless it was a double that didn't send the player to jail
+        continues = np.zeros(self.state_count)
+        for position in range(self.space_count):
+            for doubles in range(1, self.max_doubles):
+                continues[self.state(position, doubles)] = 1.0
+        turn_ends = 1.0 - pi @ continues
+
+        return LandingSolution(rules_fingerprint(self.rules, self.board), tuple(landing.tolist()), 1.0 / turn_ends)
+
+def landing_probabilities(rules=None, board=None):
+    """Return the cached LandingSolution for the rule set, solving it the first time it is asked for."""
+    chain = MarkovChain(rules, board)
+    fingerprint = rules_fingerprint(chain.rules, chain.board)
+
+    solution = SOLUTION_CACHE.get(fingerprint)
+    if solution is None:
+        solution = SOLUTION_CACHE[fingerprint] = chain.solve()
+
+    return solution
@@ -0,0 +1,90 @@
+"""
+pyglet sources which play raw PCM samples from a memory-mapped asset archive without copying them first.
+
+pyglet's own static sources copy all of their samples into a new buffer every time they are played. These keep a view of
+the archive and only copy each small packet as the audio driver asks for it.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import io
+
+import arcade
+from pyglet import media
+from pyglet.media.codecs.base import AudioData, AudioFormat, Source
+
+
+# Bytes asked for at a time when reading every sample out of a source
+READ_SIZE = 1 << 20
+
+
+def read_samples(source):
+    """Decode every sample of a pyglet source, returning the PCM bytes and the source's AudioFormat."""
+    queue_source = source.get_queue_source()
+    samples = io.BytesIO()
+    while True:
+        audio_data = queue_source.get_audio_data(READ_SIZE)
+        if not audio_data:
+            break
+        samples.write(audio_data.get_string_data())
+    return samples.getvalue(), queue_source.audio_format
+
+class MappedQueueSource(Source):
+    """A playing copy of a MappedSource, with its own read position."""
+    def __init__(self, samples, audio_format):
+        """Constructor"""
+        self.samples      = samples
+        self.audio_format = audio_format
+        self.position     = 0
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.audio_format.bytes_per_second
+
+    def align(self, offset):
+        """Round a byte offset down to a whole sample."""
+        return offset - offset % self.audio_format.bytes_per_sample
+
+    def seek(self, timestamp):
+        self.position = min(self.align(int(timestamp * self.audio_format.bytes_per_second)), len(self.samples))
+
+    def get_audio_data(self, num_bytes, compensation_time=0.0):
+        start = self.position
+        end = min(start + self.align(num_bytes), len(self.samples))
+        if end <= start:
+            return None
+
+        self.position = end
+        data = bytes(self.samples[start:end])
+        return AudioData(data, len(data), start / self.audio_format.bytes_per_second, len(data) / self.audio_format.bytes_per_second, [])
+
+class MappedSource(Source):
+    """A source over a view of PCM samples, which can be played any number of times at once like a static source."""
+    def __init__(self, samples, audio_format):
+        """Constructor"""
+        self.samples      = samples
+        self.audio_format = audio_format
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.audio_format.bytes_per_second
+
+    def get_queue_source(self):
+        return MappedQueueSource(self.samples, self.audio_format)
+
+def sound_from_source(name, source):
+    """Wrap a pyglet source in an arcade.Sound, which otherwise always loads from a file."""
+    sound = arcade.Sound.__new__(arcade.Sound)
+    sound.file_name    = name
+    sound.source       = source
+    # Matches arcade.Sound, allows 2D panning with 3D audio
+    sound.min_distance = 100000000
+    return sound
+
+def mapped_sound(name, samples, channels, sample_size, sample_rate):
+    """An arcade.Sound playing from a view of PCM samples."""
+    return sound_from_source(name, MappedSource(samples, AudioFormat(channels, sample_size, sample_rate)))
+
+def decoded_sound(name, data):
+    """An arcade.Sound decoded from the bytes of a sound file."""
+    return sound_from_source(name, media.load(name, file=io.BytesIO(data), streaming=False))
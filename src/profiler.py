@@ -0,0 +1,260 @@
+"""
+Per-view frame profiling, with an on-screen overlay and a report of the whole session.
+
+instrument times the drawing, update and input events the window dispatches, each counted against the view shown at
+the time. The views themselves aren't changed, pyglet needs their handlers to stay bound methods. Each view and handler
+keeps a rolling window of recent timings for the overlay (toggled with F3) and a histogram of the whole session for
+the report. Frame time is the time from one on_draw to the next, so it includes the wait for vsync and shows dropped
+frames. A frame skipped by on demand redrawing isn't counted, nor is the gap to the next frame drawn after it.
+
+Run python -m src.profiler from the root of the project to switch through every view in a hidden window with profiling
+on, as a check that profiling doesn't break the views.
+
+Set the MONOPOLY_PROFILE environment variable to a file name to have the session report written there on exit.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import bisect
+import collections
+import json
+import math
+import os
+import sys
+import time
+
+
+# Handlers timed on every view when the view has them
+HANDLERS = ("on_draw", "on_update", "on_mouse_press", "on_mouse_release", "on_mouse_motion", "on_key_press", "on_key_release", "on_text")
+FRAME = "frame"
+
+PERCENTILES = (50, 95, 99)
+ROLLING_SAMPLES = 300
+
+# Histogram buckets in milliseconds, each 10% wider than the last from 0.01ms to over 10 seconds
+BUCKET_EDGES = tuple(0.01 * 1.1 ** i for i in range(int(math.log(1e6) / math.log(1.1)) + 1))
+
+OVERLAY_REFRESH = 0.5
+REPORT_ENVIRONMENT = "MONOPOLY_PROFILE"
+
+
+def percentile(sorted_samples, percent):
+    """The nearest rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_samples)) - 1, 0)
+    return sorted_samples[rank]
+
+class Timings:
+    """Timings of one handler on one view, in milliseconds."""
+    def __init__(self):
+        """Constructor"""
+        self.recent  = collections.deque(maxlen=ROLLING_SAMPLES)
+        self.buckets = [0] * (len(BUCKET_EDGES) + 1)
+        self.count   = 0
+        self.total   = 0.0
+        self.longest = 0.0
+
+    def add(self, milliseconds):
+        """Record a timing."""
+        self.recent.append(milliseconds)
+        self.buckets[bisect.bisect_left(BUCKET_EDGES, milliseconds)] += 1
+        self.count  += 1
+        self.total  += milliseconds
+        self.longest = max(self.longest, milliseconds)
+
+    def rolling(self):
+        """Percentiles of the recent timings."""
+        samples = sorted(self.recent)
+        return {percent: percentile(samples, percent) for percent in PERCENTILES}
+
+    def session(self):
+        """Percentiles over the whole session, from the histogram so they are accurate to a bucket (10%)."""
+        result = {}
+        for percent in PERCENTILES:
+            rank = max(math.ceil(percent / 100 * self.count), 1)
+            seen = 0
+            for bucket, count in enumerate(self.buckets):
+                seen += count
+                if seen >= rank:
+                    # The top of the bucket, or the slowest timing for the overflow bucket
+                    result[percent] = BUCKET_EDGES[bucket] if bucket < len(BUCKET_EDGES) else self.longest
+                    break
+        return result
+
+class FrameProfiler:
+    """Collects handler timings for every instrumented view."""
+    def __init__(self, toggle_key=None):
+        """Constructor"""
+        # (view name, handler) -> Timings
+        self.timings    = collections.defaultdict(Timings)
+        self.toggle_key = toggle_key
+        self.overlay    = False
+        self.last_draw  = None
+        self.started    = time.perf_counter()
+
+        self.overlay_lines   = []
+        self.overlay_updated = 0.0
+
+    def record(self, view_name, handler, milliseconds):
+        """Add a timing for a view's handler."""
+        self.timings[(view_name, handler)].add(milliseconds)
+
+    def time_draw(self, view_name, dispatch, window):
+        """Dispatch on_draw, timing it and the frame, then draw the overlay over it."""
+        start = time.perf_counter()
+        dispatch("on_draw")
+        # Windows drawing on demand skip frames where nothing changed. They aren't counted, and the next frame drawn
+        # doesn't count the time since the last one either, which would only measure how long the window sat idle.
+        if not getattr(window, "drew_frame", True):
+            self.last_draw = None
+            return
+
+        if self.last_draw is not None:
+            self.record(view_name, FRAME, (start - self.last_draw) * 1000)
+        self.last_draw = start
+        self.record(view_name, "on_draw", (time.perf_counter() - start) * 1000)
+
+        # The overlay isn't counted as part of the view
+        if self.overlay:
+            self.draw_overlay(view_name)
+
+    def toggle_overlay(self, window):
+        """Show or hide the overlay."""
+        self.overlay = not self.overlay
+        # Windows drawing on demand need to draw again to show or hide it
+        if hasattr(window, "request_redraw"):
+            window.request_redraw()
+
+    def instrument(self, window, views):
+        """Time every handled event the window dispatches, counted against the name of the view shown.
+
+        views is a dictionary of view names to views, views not in it are counted under their class name.
+        """
+        names = {view: name for name, view in views.items()}
+        dispatch = window.dispatch_event
+
+        def timed_dispatch(event_type, *args):
+            view = window.current_view
+            view_name = names.get(view, type(view).__name__)
+
+            if event_type == "on_draw":
+                return self.time_draw(view_name, dispatch, window)
+            if event_type == "on_key_press" and args[0] == self.toggle_key:
+                return self.toggle_overlay(window)
+            if event_type not in HANDLERS:
+                return dispatch(event_type, *args)
+
+            start = time.perf_counter()
+            result = dispatch(event_type, *args)
+            self.record(view_name, event_type, (time.perf_counter() - start) * 1000)
+            return result
+
+        # pyglet and arcade dispatch every event through this, looked up on the window each time
+        window.dispatch_event = timed_dispatch
+
+    def draw_overlay(self, view_name):
+        """Draw the rolling percentiles for the view, refreshing the numbers a couple of times a second."""
+        import arcade
+
+        now = time.perf_counter()
+        if now - self.overlay_updated >= OVERLAY_REFRESH:
+            self.overlay_updated = now
+            self.overlay_lines = [f"{view_name} (ms)   p50   p95   p99"]
+            for (name, handler), timings in sorted(self.timings.items()):
+                if name == view_name and timings.recent:
+                    values = timings.rolling()
+                    self.overlay_lines.append(f"{handler:<16}" + "".join(f"{values[percent]:6.1f}" for percent in PERCENTILES))
+
+        # Keep drawing while the overlay is up so it shows live timings, windows drawing on demand would otherwise stop
+        window = arcade.get_window()
+        if hasattr(window, "request_redraw"):
+            window.request_redraw()
+
+        height = 20 * len(self.overlay_lines) + 10
+        arcade.draw_lrtb_rectangle_filled(0, 330, height, 0, (0, 0, 0, 180))
+        for line_number, line in enumerate(self.overlay_lines):
+            arcade.draw_text(line, 5, height - 20 * (line_number + 1), arcade.color.WHITE, font_size=11, font_name="Courier New")
+
+    def report(self):
+        """The session report, with the percentiles of every view's handlers over the whole session."""
+        views = {}
+        for (view_name, handler), timings in sorted(self.timings.items()):
+            views.setdefault(view_name, {})[handler] = {
+                "count":   timings.count,
+                "mean":    timings.total / timings.count if timings.count else 0.0,
+                "max":     timings.longest,
+                **{f"p{percent}": value for percent, value in timings.session().items()},
+            }
+
+        return {"seconds": time.perf_counter() - self.started, "units": "ms", "views": views}
+
+    def write_report(self, path):
+        """Write the session report as JSON."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=4)
+
+def report_path():
+    """Where the session report should be written on exit, or None for no report."""
+    return os.environ.get(REPORT_ENVIRONMENT) or None
+
+def check_views(headless=False):
+    """Switch through every view in a hidden window with profiling on, the way a player would, and return the report.
+
+    Raises whatever goes wrong in a view.
+    """
+    import pyglet
+    if headless:
+        pyglet.options["headless"] = True
+    import arcade
+    from . import display
+
+    window = display.create_window(visible=False)
+    # pyglet.app.run dispatches events straight away rather than queueing them, the same as here
+    pyglet.window.Window._enable_event_queue = False
+
+    def frame():
+        window.dispatch_event("on_update", 1 / 60)
+        window.dispatch_event("on_draw")
+        window.flip()
+
+    def press(key):
+        window.dispatch_event("on_key_press", key, 0)
+        frame()
+
+    views = window.views
+    try:
+        window.show_view(views["main_menu"])
+        frame()
+        # With the overlay up for the rest of the views
+        press(window.profiler.toggle_key)
+
+        views["main_menu"].show_help()
+        frame()
+        press(arcade.key.ESCAPE)
+
+        views["main_menu"].start_game()
+        frame()
+        views["game_setup"].start_game()
+        frame()
+        press(arcade.key.SPACE)
+
+        press(arcade.key.ESCAPE)
+        press(arcade.key.ESCAPE)
+        if window.current_view is not views["main_menu"]:
+            raise RuntimeError(f"Expected to be back on the main menu, not {type(window.current_view).__name__}")
+    finally:
+        display.close_window(window)
+        window.close()
+
+    return window.profiler.report()
+
+def main():
+    """Command line entrypoint."""
+    report = check_views(headless="--headless" in sys.argv)
+    for view_name, handlers in report["views"].items():
+        print(f"{view_name:<12} " + ", ".join(f"{handler} x{timings['count']}" for handler, timings in handlers.items()))
+    print("Switched through every view with profiling on")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+On demand redrawing, so the window only draws a frame when something on screen may have changed.
+
+pyglet draws every window every frame whether anything changed or not, which keeps a core busy while a menu sits idle
+or a player thinks about their turn. OnDemandWindow skips the draw and the buffer swap unless the window is dirty.
+Input, switching views, and the window being exposed, resized or shown always make it dirty. Views mark it dirty
+themselves with request_redraw for anything else, such as animations and turns finishing in the background. Moving
+the mouse doesn't, as nothing on screen reacts to it.
+
+Set the MONOPOLY_REDRAW environment variable to "continuous" to draw every frame instead, e.g. when profiling frame
+times.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import os
+
+import arcade
+
+
+# Window events after which the screen has to be drawn again
+REDRAW_EVENTS = frozenset((
+    "on_expose", "on_resize", "on_show", "on_activate",
+    "on_mouse_press", "on_mouse_release", "on_mouse_drag", "on_mouse_scroll",
+    "on_key_press", "on_key_release", "on_text", "on_text_motion", "on_text_motion_select",
+))
+
+REDRAW_ENVIRONMENT = "MONOPOLY_REDRAW"
+CONTINUOUS = "continuous"
+
+
+class OnDemandWindow(arcade.Window):
+    """A window which only draws when it has been marked dirty."""
+    def __init__(self, *args, continuous=False, **kwargs):
+        """Constructor"""
+        # Set first, creating the window dispatches events
+        self.continuous = continuous
+        self.dirty      = True
+        self.drew_frame = False
+        super().__init__(*args, **kwargs)
+
+    def request_redraw(self):
+        """Draw the window again on the next frame."""
+        self.dirty = True
+
+    def dispatch_event(self, event_type, *args):
+        """Skip drawing while the window isn't dirty, and mark it dirty for the events which need a redraw."""
+        if event_type == "on_draw":
+            self.drew_frame = self.continuous or self.dirty
+            if not self.drew_frame:
+                return
+            # Cleared first so anything drawing can ask for another frame, e.g. to keep an animation going
+            self.dirty = False
+        elif event_type in REDRAW_EVENTS:
+            self.dirty = True
+
+        super().dispatch_event(event_type, *args)
+
+    def flip(self):
+        """Swap buffers, but only after drawing a frame, the back buffer is undefined after a swap."""
+        if self.drew_frame:
+            super().flip()
+
+    def show_view(self, new_view):
+        """Switch views, which always needs a redraw."""
+        super().show_view(new_view)
+        self.request_redraw()
+
+def continuous_requested():
+    """Whether the environment asks for every frame to be drawn."""
+    return os.environ.get(REDRAW_ENVIRONMENT, "").lower() == CONTINUOUS
@@ -0,0 +1,286 @@
+"""
+Compact binary save files for a game in progress, with incremental autosaves.
+
+Only the mutable state is stored: owners, houses, positions, cash, jail state, the current player and the order of both
+card decks. The state is split into sections, a full save writes every section and each autosave appends a record with
+just the sections that changed since the last save. Loading keeps the newest copy of each section and applies it once.
+Once the autosaves since the last full save pass COMPACT_BYTES the next autosave writes a full save instead, so loading
+only ever reads a bounded amount however long the game has gone on.
+
+The game autosaves after every turn to the file named by the MONOPOLY_SAVE environment variable, or monopoly.sav in
+the temporary directory.
+
+File layout: MAGIC, a version byte, then records of (record type u8, length u32, sections). Each section is
+(section id u8, length u16, data).
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import os
+import struct
+import tempfile
+
+from . import cards
+from . import engine
+from . import game_state
+
+
+MAGIC   = b"MSAV"
+VERSION = 2
+
+RECORD_FULL  = 1
+RECORD_DELTA = 2
+
+# Autosaves appended after a full save before the file is rewritten as a single full save
+COMPACT_BYTES = 4096
+
+RECORD_HEADER  = struct.Struct("<BI")
+SECTION_HEADER = struct.Struct("<BH")
+
+# Section ids, new sections must only ever be added to the end
+SECTION_PLAYERS   = 0
+SECTION_OWNERS    = 1
+SECTION_HOUSES    = 2
+SECTION_POSITIONS = 3
+SECTION_CASH      = 4
+SECTION_JAIL      = 5
+SECTION_TURN      = 6
+SECTION_DECKS     = 7
+
+TURN = struct.Struct("<BBIb")
+# Piece and the length of the UTF-8 name that follows
+PLAYER = struct.Struct("<BH")
+
+DECK_NAMES = tuple(cards.DECK_CARDS)
+
+# Arrays can't hold None so it is stored as -1
+NONE = -1
+
+SAVE_ENVIRONMENT  = "MONOPOLY_SAVE"
+DEFAULT_SAVE_NAME = "monopoly.sav"
+
+
+def autosave_path():
+    """Where the game autosaves to."""
+    return os.environ.get(SAVE_ENVIRONMENT) or os.path.join(tempfile.gettempdir(), DEFAULT_SAVE_NAME)
+
+def encode_players(game):
+    """Names and pieces, only needed to rebuild the PlayerInfo so they never change after the first save."""
+    data = bytearray([game.players.total_players])
+    for name, piece in zip(game.players.player_names, game.players.player_pieces):
+        encoded = name.encode("utf-8")
+        data += PLAYER.pack(piece, len(encoded)) + encoded
+    return bytes(data)
+
+def encode_jail(game):
+    """Jail attempts (+1, 0 when free), bankruptcy and held Get Out of Jail Free cards for each player."""
+    data = bytearray()
+    for player in range(game.players.total_players):
+        data.append(game.jail_turns[player] + 1 if game.in_jail[player] else 0)
+        data.append(game.bankrupt[player])
+        data.append(len(game.jail_free_cards[player]))
+        for deck_name, index in game.jail_free_cards[player]:
+            data += bytes([DECK_NAMES.index(deck_name), index])
+    return bytes(data)
+
+def encode_decks(game):
+    """The draw order, position and held cards of every deck."""
+    data = bytearray()
+    for deck_name in DECK_NAMES:
+        deck = game.decks[deck_name]
+        data += bytes([deck.position, len(deck.order)]) + bytes(deck.order)
+        data += bytes([len(deck.held)]) + bytes(sorted(deck.held))
+    return bytes(data)
+
+def encode_sections(game):
+    """Capture the state of an engine.GameEngine as a dictionary of section id to bytes."""
+    board = game.board
+    return {
+        SECTION_PLAYERS:   encode_players(game),
+        SECTION_OWNERS:    struct.pack(f"<{len(board.properties)}b", *(NONE if prop["owner"] is None else prop["owner"] for prop in board.properties)),
+        SECTION_HOUSES:    struct.pack(f"<{len(board.properties)}b", *(NONE if prop["houses"] is None else prop["houses"] for prop in board.properties)),
+        SECTION_POSITIONS: bytes(game.players.space_number),
+        SECTION_CASH:      struct.pack(f"<{game.players.total_players}i", *game.players.cash),
+        SECTION_JAIL:      encode_jail(game),
+        SECTION_TURN:      TURN.pack(game.players.current_player, game.doubles_count, game.turn, NONE if game.winner is None else game.winner),
+        SECTION_DECKS:     encode_decks(game),
+    }
+
+def decode_players(data):
+    """Rebuild a PlayerInfo from the players section."""
+    players = {}
+    offset = 1
+    for _ in range(data[0]):
+        piece, length = PLAYER.unpack_from(data, offset)
+        offset += PLAYER.size
+        players[data[offset:offset + length].decode("utf-8")] = piece
+        offset += length
+    return game_state.PlayerInfo(players)
+
+def apply_owners(game, data):
+    """Owners of every space, by array index."""
+    for prop, owner in zip(game.board.properties, struct.unpack(f"<{len(data)}b", data)):
+        prop["owner"] = None if owner == NONE else owner
+
+def apply_houses(game, data):
+    """Houses on every space, by array index."""
+    for prop, houses in zip(game.board.properties, struct.unpack(f"<{len(data)}b", data)):
+        prop["houses"] = None if houses == NONE else houses
+
+def apply_positions(game, data):
+    """The space each player is on."""
+    game.players.space_number[:] = list(data)
+
+def apply_cash(game, data):
+    """Each player's cash."""
+    game.players.cash[:] = struct.unpack(f"<{len(data) // 4}i", data)
+
+def apply_jail(game, data):
+    """Jail attempts, bankruptcy and held cards, see encode_jail."""
+    offset = 0
+    for player in range(game.players.total_players):
+        jail, bankrupt, held = data[offset], data[offset + 1], data[offset + 2]
+        offset += 3
+        game.in_jail[player]    = jail > 0
+        game.jail_turns[player] = max(jail - 1, 0)
+        game.bankrupt[player]   = bool(bankrupt)
+        game.jail_free_cards[player] = [(DECK_NAMES[data[offset + 2 * i]], data[offset + 2 * i + 1]) for i in range(held)]
+        offset += 2 * held
+
+def apply_turn(game, data):
+    """Current player, doubles streak, turn number and winner."""
+    current, doubles, turn, winner = TURN.unpack(data)
+    game.players.current_player = current
+    game.doubles_count = doubles
+    game.turn          = turn
+    game.winner        = None if winner == NONE else winner
+
+def apply_decks(game, data):
+    """Draw order, position and held cards of every deck, see encode_decks."""
+    offset = 0
+    for deck_name in DECK_NAMES:
+        deck = game.decks[deck_name]
+        deck.position, count = data[offset], data[offset + 1]
+        deck.order = list(data[offset + 2:offset + 2 + count])
+        offset += 2 + count
+        held = data[offset]
+        deck.held = set(data[offset + 1:offset + 1 + held])
+        offset += 1 + held
+
+# Section ids to the function which writes them back into an engine.GameEngine, the players section is only used to
+# create the engine so it has nothing to apply
+SECTION_HANDLERS = {
+    SECTION_PLAYERS:   lambda game, data: None,
+    SECTION_OWNERS:    apply_owners,
+    SECTION_HOUSES:    apply_houses,
+    SECTION_POSITIONS: apply_positions,
+    SECTION_CASH:      apply_cash,
+    SECTION_JAIL:      apply_jail,
+    SECTION_TURN:      apply_turn,
+    SECTION_DECKS:     apply_decks,
+}
+
+def pack_record(record_type, sections):
+    """Pack a record containing the given sections."""
+    body = b"".join(SECTION_HEADER.pack(section_id, len(data)) + data for section_id, data in sections.items())
+    return RECORD_HEADER.pack(record_type, len(body)) + body
+
+def read_records(data):
+    """Yield (record type, {section id: bytes}) for every record in a save file's contents."""
+    if len(data) <= len(MAGIC) or data[:len(MAGIC)] != MAGIC or data[len(MAGIC)] != VERSION:
+        raise ValueError("Not a save file, or a save from a different version")
+
+    view = memoryview(data)
+    offset = len(MAGIC) + 1
+    while offset < len(data):
+        # A partly written autosave at the end of the file is ignored, whether it was cut off in its header or body
+        if offset + RECORD_HEADER.size > len(data):
+            return
+        record_type, length = RECORD_HEADER.unpack_from(view, offset)
+        offset += RECORD_HEADER.size
+        end = offset + length
+        if end > len(data):
+            return
+
+        sections = {}
+        while offset < end:
+            if offset + SECTION_HEADER.size > end:
+                raise ValueError("Save file is corrupt, a section runs past the end of its record")
+            section_id, section_length = SECTION_HEADER.unpack_from(view, offset)
+            offset += SECTION_HEADER.size
+            if offset + section_length > end:
+                raise ValueError("Save file is corrupt, a section runs past the end of its record")
+            sections[section_id] = bytes(view[offset:offset + section_length])
+            offset += section_length
+
+        yield record_type, sections
+
+class SaveWriter:
+    """Writes full saves and delta autosaves of a game to one file."""
+    def __init__(self, path):
+        """Constructor"""
+        self.path = path
+        # The sections as of the last write, used to work out what changed
+        self.saved = None
+        # Bytes of autosaves appended since the last full save
+        self.delta_bytes = 0
+
+    def save(self, game):
+        """Write a full save, replacing anything already in the file. Returns the number of bytes written."""
+        sections = encode_sections(game)
+        data = MAGIC + bytes([VERSION]) + pack_record(RECORD_FULL, sections)
+
+        # Written next to the file and swapped in, so stopping part way through never loses the previous save
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, self.path)
+
+        self.saved = sections
+        self.delta_bytes = 0
+        return len(data)
+
+    def autosave(self, game):
+        """Append only the sections that changed since the last save. Returns the number of bytes written."""
+        if self.saved is None or self.delta_bytes >= COMPACT_BYTES:
+            return self.save(game)
+
+        sections = encode_sections(game)
+        changed = {section_id: data for section_id, data in sections.items() if self.saved.get(section_id) != data}
+        if not changed:
+            return 0
+
+        data = pack_record(RECORD_DELTA, changed)
+        with open(self.path, "ab") as file:
+            file.write(data)
+
+        self.saved = sections
+        self.delta_bytes += len(data)
+        return len(data)
+
+def load_game(path, **engine_options):
+    """Load a save file into a new engine.GameEngine, extra keyword arguments are passed to the engine."""
+    with open(path, "rb") as file:
+        data = file.read()
+
+    return load_bytes(data, **engine_options)
+
+def load_bytes(data, **engine_options):
+    """Load the contents of a save file into a new engine.GameEngine."""
+    # Only the newest copy of each section matters, so collect those first and apply each section once
+    latest = None
+    for record_type, sections in read_records(data):
+        if record_type == RECORD_FULL:
+            latest = {}
+        elif latest is None:
+            raise ValueError("Save file has no full save to apply changes to")
+        latest.update(sections)
+
+    if latest is None:
+        raise ValueError("Save file is empty")
+
+    game = engine.GameEngine(decode_players(latest[SECTION_PLAYERS]), game_state.MonopolyBoard(), **engine_options)
+    for section_id, section in latest.items():
+        SECTION_HANDLERS[section_id](game, section)
+
+    return game
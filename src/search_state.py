@@ -0,0 +1,144 @@
+"""
+Game state for look-ahead search, which can be cloned and rolled back without copy.deepcopy.
+
+SearchState is a GameEngine playing on a CompactBoard, so it follows exactly the same rules. Its whole mutable state can
+be captured as an immutable Snapshot of bytes and tuples. Snapshots never change once taken, so any number of search
+nodes can share one, and a state is only written when a snapshot is restored into it. Applying a turn pushes a
+snapshot onto the undo stack and undo pops it back.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+from array import array
+from collections import namedtuple
+
+from . import cards
+from . import compact_board
+from . import engine
+from . import game_state
+
+
+# Everything take_turn can change. Decks are stored as (order, position, held) in cards.DECK_CARDS order.
+Snapshot = namedtuple("Snapshot", (
+    "owners", "houses", "space_number", "cash", "current_player",
+    "in_jail", "jail_turns", "bankrupt", "jail_free_cards",
+    "doubles_count", "turn", "winner", "decks",
+))
+
+DECK_NAMES = tuple(cards.DECK_CARDS)
+
+
+class SearchState(engine.GameEngine):
+    """A GameEngine which can be cloned cheaply and has an apply/undo stack of turns."""
+    def __init__(self, players, board=None, **engine_options):
+        """Constructor, the board must be a compact_board.CompactBoard"""
+        super().__init__(players, board if board is not None else compact_board.CompactBoard(), **engine_options)
+        self.undo_stack = []
+
+    @classmethod
+    def from_engine(cls, game, **engine_options):
+        """Build a search state matching any GameEngine, such as the one driving the GUI.
+
+        The policies and rng are shared with the game unless they are given as keyword arguments.
+        """
+        options = {"buy_policy": game.buy_policy, "build_policy": game.build_policy, "roll_dice": game.roll_dice, "rng": game.rng}
+        options.update(engine_options)
+
+        players = game_state.PlayerInfo(dict(zip(game.players.player_names, game.players.player_pieces)))
+        state = cls(players, **options)
+        state.restore(snapshot_of(game))
+        return state
+
+    def snapshot(self):
+        """Capture the current state as an immutable Snapshot."""
+        return Snapshot(
+            self.board.owners.tobytes(), self.board.houses.tobytes(),
+            tuple(self.players.space_number), tuple(self.players.cash), self.players.current_player,
+            tuple(self.in_jail), tuple(self.jail_turns), tuple(self.bankrupt),
+            tuple(tuple(held) for held in self.jail_free_cards),
+            self.doubles_count, self.turn, self.winner,
+            tuple((tuple(deck.order), deck.position, frozenset(deck.held)) for deck in map(self.decks.get, DECK_NAMES)),
+        )
+
+    def restore(self, snapshot):
+        """Overwrite the current state with a Snapshot."""
+        self.board.owners = array("b", snapshot.owners)
+        self.board.houses = array("b", snapshot.houses)
+        self.players.space_number[:]  = snapshot.space_number
+        self.players.cash[:]          = snapshot.cash
+        self.players.current_player   = snapshot.current_player
+        self.in_jail[:]    = snapshot.in_jail
+        self.jail_turns[:] = snapshot.jail_turns
+        self.bankrupt[:]   = snapshot.bankrupt
+        self.jail_free_cards = [list(held) for held in snapshot.jail_free_cards]
+        self.doubles_count = snapshot.doubles_count
+        self.turn          = snapshot.turn
+        self.winner        = snapshot.winner
+
+        for deck_name, (order, position, held) in zip(DECK_NAMES, snapshot.decks):
+            deck = self.decks[deck_name]
+            deck.order    = list(order)
+            deck.position = position
+            deck.held     = set(held)
+
+    def clone(self, rng=None):
+        """Return an independent copy of this state with an empty undo stack, sharing the rng unless one is given.
+
+        The static board data, policies and player names are shared, only the small mutable arrays and lists are copied.
+        """
+        state = SearchState.__new__(SearchState)
+        state.__dict__.update(self.__dict__)
+
+        state.board = compact_board.CompactBoard(self.board.data)
+        state.board.owners[:] = self.board.owners
+        state.board.houses[:] = self.board.houses
+        state.players    = self.players_like()
+        state.rng        = rng if rng is not None else self.rng
+        state.decks      = {name: deck.copy(state.rng) for name, deck in self.decks.items()}
+        state.in_jail    = self.in_jail[:]
+        state.jail_turns = self.jail_turns[:]
+        state.bankrupt   = self.bankrupt[:]
+        state.jail_free_cards = [held[:] for held in self.jail_free_cards]
+        state.event_log  = None
+        state.undo_stack = []
+        return state
+
+    def players_like(self):
+        """A new PlayerInfo with the same players, sharing the name and piece lists."""
+        players = game_state.PlayerInfo.__new__(game_state.PlayerInfo)
+        players.total_players  = self.players.total_players
+        players.player_names   = self.players.player_names
+        players.player_pieces  = self.players.player_pieces
+        players.current_player = self.players.current_player
+        players.space_number   = self.players.space_number[:]
+        players.cash           = self.players.cash[:]
+        return players
+
+    def apply(self, roll=None):
+        """Play a turn that can be taken back with undo, returning its events."""
+        self.undo_stack.append(self.snapshot())
+        return self.take_turn(roll)
+
+    def undo(self):
+        """Take back the most recently applied turn."""
+        self.restore(self.undo_stack.pop())
+
+    def undo_to(self, depth):
+        """Take back applied turns until only depth are left on the undo stack."""
+        if depth < len(self.undo_stack):
+            snapshot = self.undo_stack[depth]
+            del self.undo_stack[depth:]
+            self.restore(snapshot)
+
+def snapshot_of(game):
+    """Capture a Snapshot from any GameEngine, whatever kind of board it uses."""
+    properties = game.board.properties
+    return Snapshot(
+        array("b", (compact_board.to_array_value(prop["owner"]) for prop in properties)).tobytes(),
+        array("b", (compact_board.to_array_value(prop["houses"]) for prop in properties)).tobytes(),
+        tuple(game.players.space_number), tuple(game.players.cash), game.players.current_player,
+        tuple(game.in_jail), tuple(game.jail_turns), tuple(game.bankrupt),
+        tuple(tuple(held) for held in game.jail_free_cards),
+        game.doubles_count, game.turn, game.winner,
+        tuple((tuple(deck.order), deck.position, frozenset(deck.held)) for deck in map(game.decks.get, DECK_NAMES)),
+    )
@@ -0,0 +1,137 @@
+"""
+Runs large numbers of headless games across a pool of worker processes.
+
+Every game gets its own dice.DiceSource seeded from the master seed and the game's index, so the results only depend on
+the master seed and never on how many workers were used or in what order chunks finished. Chunk results are merged into
+a single SimulationStats as they arrive, so memory use stays flat however many games are played.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import multiprocessing
+
+from . import dice
+from . import engine
+from . import game_state
+
+
+DEFAULT_CHUNK_SIZE = 64
+DEFAULT_MAX_TURNS  = 1000
+
+# Most games are over within a few thousand dice, so don't generate a full default buffer per game
+DICE_BUFFER_SIZE = 4096
+
+# Pieces given to the generated players, PlayerInfo needs one per player
+PIECES = (1, 2, 3, 4)
+
+
+def game_seed(master_seed, game_index):
+    """The seed for a single game. String seeds are hashed by random.Random so neighbouring games aren't correlated."""
+    return f"{master_seed}:{game_index}"
+
+def new_players(player_count):
+    """Create a PlayerInfo with generic names for a simulated game."""
+    return game_state.PlayerInfo({f"Player {i + 1}": PIECES[i] for i in range(player_count)})
+
+def play_game(seed, player_count=2, max_turns=DEFAULT_MAX_TURNS):
+    """Play one headless game from a seed and return the finished engine."""
+    game = engine.GameEngine(new_players(player_count), rng=dice.DiceSource(seed, buffer_size=DICE_BUFFER_SIZE))
+    game.play(max_turns)
+    return game
+
+class SimulationStats:
+    """Aggregate results of many games which can be merged in any order and still give the same totals."""
+    def __init__(self, player_count):
+        """Constructor"""
+        self.player_count = player_count
+        self.games        = 0
+        self.unfinished   = 0
+        self.wins         = [0] * player_count
+        self.total_turns  = 0
+        self.min_turns    = None
+        self.max_turns    = None
+        self.total_cash   = [0] * player_count
+
+    def add_game(self, game):
+        """Add the result of a finished GameEngine."""
+        self.games       += 1
+        self.total_turns += game.turn
+        self.min_turns    = game.turn if self.min_turns is None else min(self.min_turns, game.turn)
+        self.max_turns    = game.turn if self.max_turns is None else max(self.max_turns, game.turn)
+
+        if game.winner is None:
+            self.unfinished += 1
+        else:
+            self.wins[game.winner] += 1
+
+        for player in range(self.player_count):
+            self.total_cash[player] += game.players.cash[player]
+
+    def merge(self, other):
+        """Add the totals from another SimulationStats into this one."""
+        if other.games == 0:
+            return self
+
+        self.games       += other.games
+        self.unfinished  += other.unfinished
+        self.total_turns += other.total_turns
+        self.min_turns    = other.min_turns if self.min_turns is None else min(self.min_turns, other.min_turns)
+        self.max_turns    = other.max_turns if self.max_turns is None else max(self.max_turns, other.max_turns)
+        for player in range(self.player_count):
+            self.wins[player]       += other.wins[player]
+            self.total_cash[player] += other.total_cash[player]
+
+        return self
+
+    def summary(self):
+        """Return the aggregate results as a dictionary."""
+        games = self.games or 1
+        return {
+            "games":      self.games,
+            "win_rate":   [wins / games for wins in self.wins],
+            "unfinished": self.unfinished / games,
+            "mean_turns": self.total_turns / games,
+            "min_turns":  self.min_turns,
+            "max_turns":  self.max_turns,
+            "mean_cash":  [cash / games for cash in self.total_cash],
+        }
+
+def run_chunk(task):
+    """Worker entrypoint, plays a contiguous range of games and returns their merged stats."""
+    master_seed, first_game, game_count, player_count, max_turns = task
+
+    stats = SimulationStats(player_count)
+    for game_index in range(first_game, first_game + game_count):
+        stats.add_game(play_game(game_seed(master_seed, game_index), player_count, max_turns))
+
+    return stats
+
+def chunk_tasks(games, master_seed, player_count, max_turns, chunk_size):
+    """Lazily split the games into tasks for the workers."""
+    for first_game in range(0, games, chunk_size):
+        yield (master_seed, first_game, min(chunk_size, games - first_game), player_count, max_turns)
+
+def run_simulation(games, master_seed=0, player_count=2, workers=None, max_turns=DEFAULT_MAX_TURNS, chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None):
+    """Play games across a process pool and return the merged SimulationStats.
+
+    workers defaults to one per core, and 1 runs everything in this process. on_progress is called with the stats so far
+    after each chunk is merged.
+    """
+    stats = SimulationStats(player_count)
+    tasks = chunk_tasks(games, master_seed, player_count, max_turns, chunk_size)
+
+    if workers == 1:
+        return merge_results(stats, map(run_chunk, tasks), on_progress)
+
+    with multiprocessing.Pool(workers) as pool:
+        # Chunks are merged in whatever order they finish, the totals don't depend on it
+        return merge_results(stats, pool.imap_unordered(run_chunk, tasks), on_progress)
+
+def merge_results(stats, results, on_progress=None):
+    """Merge chunk results into stats as they arrive."""
+    for chunk_stats in results:
+        stats.merge(chunk_stats)
+        if on_progress is not None:
+            on_progress(stats)
+
+    return stats
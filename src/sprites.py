@@ -0,0 +1,99 @@
+"""
+Shared texture atlas and sprite helpers, so the board, logo and pieces draw in a few batched calls instead of one per image.
+
+Every image the views draw shares one atlas, each packed into it the first time a sprite showing it is added to a sprite
+list, so images are only loaded once a view needs them. Each view keeps its images in a SpriteList on that atlas and
+draws the whole list at once.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import arcade
+
+from . import common
+
+
+# Room for the board, logo and pieces
+ATLAS_SIZE = (2048, 2048)
+
+# Board layout as fractions of the board image, a corner square and the 9 spaces between corners along each side
+CORNER_SIZE = 103 / 800
+SPACE_SIZE  = (1 - 2 * CORNER_SIZE) / 9
+SPACES_PER_SIDE = 10
+
+TOKEN_SIZE = 32
+# Where tokens sharing a space sit relative to its centre, by player number
+TOKEN_OFFSETS = ((-10, 10), (10, 10), (-10, -10), (10, -10))
+
+# Created once there is a window to create it in
+atlas = None
+
+
+def get_atlas():
+    """The shared atlas, created empty the first time it is needed. SpriteList adds each texture as it is used."""
+    global atlas
+    if atlas is None:
+        atlas = arcade.TextureAtlas(ATLAS_SIZE)
+    return atlas
+
+def sprite_list():
+    """A new SpriteList drawing from the shared atlas."""
+    return arcade.SpriteList(atlas=get_atlas(), use_spatial_hash=False)
+
+def image_sprite(name, center_x, center_y, width=None, height=None):
+    """A sprite showing one of the graphics, at its own size unless a size is given."""
+    texture = common.graphics[name]
+    sprite = arcade.Sprite(texture=texture, center_x=center_x, center_y=center_y)
+    sprite.width  = width if width is not None else texture.width
+    sprite.height = height if height is not None else texture.height
+    return sprite
+
+def space_center(space_num, left, bottom, size):
+    """The centre of a space on a square board image drawn with its bottom left corner at (left, bottom).
+
+    Go is the bottom right corner and play runs clockwise, left along the bottom edge first.
+    """
+    side, step = divmod((space_num - 1) % (4 * SPACES_PER_SIDE), SPACES_PER_SIDE)
+
+    # Distance along the side from the corner the side starts at, as a fraction of the board
+    along = CORNER_SIZE / 2 if step == 0 else CORNER_SIZE + (step - 0.5) * SPACE_SIZE
+    edge  = CORNER_SIZE / 2
+
+    match side:
+        case 0: # Bottom, right to left
+            x, y = 1 - along, edge
+        case 1: # Left, bottom to top
+            x, y = edge, along
+        case 2: # Top, left to right
+            x, y = along, 1 - edge
+        case _: # Right, top to bottom
+            x, y = 1 - edge, 1 - along
+
+    return left + x * size, bottom + y * size
+
+class TokenSprites:
+    """A sprite for every player's piece, kept on the space the player is on."""
+    def __init__(self, players, sprites, left, bottom, size):
+        """Constructor, adds the token sprites to the given SpriteList"""
+        self.players = players
+        self.left    = left
+        self.bottom  = bottom
+        self.size    = size
+        self.spaces  = [None] * players.total_players
+        self.tokens  = []
+        for player in range(players.total_players):
+            token = image_sprite(f"piece{players.get_player_piece(player)}", 0, 0, TOKEN_SIZE, TOKEN_SIZE)
+            sprites.append(token)
+            self.tokens.append(token)
+        self.update()
+
+    def update(self):
+        """Move any tokens whose player has changed space, untouched sprites don't need their vertices rebuilt."""
+        for player, token in enumerate(self.tokens):
+            space_num = self.players.player_space(player)
+            if space_num != self.spaces[player]:
+                self.spaces[player] = space_num
+                x, y = space_center(space_num, self.left, self.bottom, self.size)
+                offset_x, offset_y = TOKEN_OFFSETS[player % len(TOKEN_OFFSETS)]
+                token.center_x = x + offset_x
+                token.center_y = y + offset_y
@@ -0,0 +1,57 @@
+"""
+Retained text, which keeps laid out text between frames instead of laying it out again on every draw.
+
+arcade.draw_text shares one pyglet label between every call with the same style, so drawing several different strings
+in the same style lays the label out again for each of them every frame. RetainedText keeps its own arcade.Text and
+only touches it when the string, position or color changes, or builds a new one when the font or layout options do.
+TextLayer keeps a RetainedText for every piece of text a view draws, by name.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import arcade
+
+
+class RetainedText:
+    """A piece of text laid out once and then only updated when what is drawn changes."""
+    def __init__(self):
+        """Constructor"""
+        self.label = None
+        # Every option given to arcade.Text other than the string, position and color
+        self.style = None
+
+    def draw(self, text, start_x, start_y, color=arcade.color.WHITE, **style):
+        """Draw text, taking the same arguments as arcade.draw_text."""
+        text  = str(text)
+        color = arcade.get_four_byte_color(color)
+
+        if self.label is None or style != self.style:
+            # The font or layout options changed, which needs a new layout anyway
+            self.label = arcade.Text(text, start_x, start_y, color, **style)
+            self.style = style
+        else:
+            # Each of these redoes part of the layout, so only set the ones that changed
+            self.label.text = text
+            if self.label.position != (start_x, start_y):
+                self.label.position = start_x, start_y
+            if self.label.color != color:
+                self.label.color = color
+
+        self.label.draw()
+
+class TextLayer:
+    """Retained text for everything a view draws, each piece kept by a name."""
+    def __init__(self):
+        """Constructor"""
+        self.texts = {}
+
+    def draw(self, name, text, start_x, start_y, color=arcade.color.WHITE, **style):
+        """Draw the text kept under a name, taking the same arguments as arcade.draw_text otherwise."""
+        retained = self.texts.get(name)
+        if retained is None:
+            retained = self.texts[name] = RetainedText()
+        retained.draw(text, start_x, start_y, color, **style)
+
+    def clear(self):
+        """Drop every kept layout, for text which won't be drawn again."""
+        self.texts.clear()
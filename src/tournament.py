@@ -0,0 +1,361 @@
+"""
+Headless tournaments between player policies, with Elo ratings and resumable results.
+
+A policy is a factory returning (buy_policy, build_policy), the callables engine.GameEngine asks whether a player buys a
+space or builds on a group. Factories are looked up by name in POLICIES inside each worker process, so stateful players
+such as bots are created once per worker.
+
+Matches are two player games, played in both seat orders so neither policy always rolls first. Pairings are either a
+round robin or Swiss rounds paired by rating. Games are played in chunks across a process pool and every chunk is
+appended to a JSONL results file as it finishes. A run started again with the same file skips the chunks that are
+already there, so very long runs can be stopped and resumed. The file starts with a header of the tournament's settings,
+and a run with different settings refuses to resume from it.
+
+Ratings are fitted to all of the results at once (Bradley-Terry on the Elo scale), so they don't depend on the order
+games finished in. Unfinished games count as draws.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+
+from . import bot
+from . import dice
+from . import engine
+from . import game_state
+
+
+DEFAULT_GAMES_PER_PAIR = 100
+DEFAULT_CHUNK_SIZE     = 50
+DEFAULT_MAX_TURNS      = 1000
+DEFAULT_SWISS_ROUNDS   = 5
+
+# Ratings are centred on this, with a 400 point gap meaning 10 to 1 odds
+BASE_RATING  = 1500
+ELO_SCALE    = 400 / math.log(10)
+# Each pair of policies that has met gets one imaginary draw so a perfect record still has a finite rating
+PRIOR_DRAWS  = 1
+# 95% confidence intervals
+CONFIDENCE_Z = 1.96
+FIT_ITERATIONS = 1000
+FIT_TOLERANCE  = 1e-9
+
+# Cash a cautious player keeps back when buying or building
+CAUTIOUS_RESERVE = 200
+
+
+def never(game, player_number, space_num):
+    """Policy which always declines."""
+    return False
+
+def cautious_buy(game, player_number, space_num):
+    """Buy only when enough cash is left over afterwards."""
+    return game.players.cash[player_number] - game.board.property_by_space_num(space_num)["price"] >= CAUTIOUS_RESERVE
+
+def cautious_build(game, player_number, space_num):
+    """Build only when enough cash is left over afterwards."""
+    group = game.board.property_by_space_num(space_num)["group"]
+    return game.players.cash[player_number] - engine.HOUSE_COST * game.board.group_property_count(group) >= CAUTIOUS_RESERVE
+
+def random_choice(game, player_number, space_num):
+    """Say yes half of the time, using the game's rng so games stay reproducible."""
+    return game.rng.random() < 0.5
+
+def mcts_policy():
+    """A bot searching in the worker's own process, since pool workers can't start pools of their own."""
+    player = bot.MCTSBot(time_budget=0.05, workers=0)
+    return player.buy_policy, player.build_policy
+
+# Policy names to factories returning (buy_policy, build_policy)
+POLICIES = {
+    "always":      lambda: (engine.always_buy, engine.always_build),
+    "never_build": lambda: (engine.always_buy, never),
+    "cautious":    lambda: (cautious_buy, cautious_build),
+    "random":      lambda: (random_choice, random_choice),
+    "mcts":        mcts_policy,
+}
+
+# Policies already created in this process
+created_policies = {}
+
+
+def get_policy(name):
+    """Return the (buy_policy, build_policy) for a name, creating it the first time it is used in this process."""
+    if name not in created_policies:
+        created_policies[name] = POLICIES[name]()
+    return created_policies[name]
+
+def play_match(seats, seed, max_turns=DEFAULT_MAX_TURNS):
+    """Play one game between the named policies in seat order, returning the finished engine."""
+    policies = [get_policy(name) for name in seats]
+
+    def buy_policy(game, player, space_num):
+        return policies[player][0](game, player, space_num)
+
+    def build_policy(game, player, space_num):
+        return policies[player][1](game, player, space_num)
+
+    players = game_state.PlayerInfo({f"Seat {i + 1}: {name}": i + 1 for i, name in enumerate(seats)})
+    game = engine.GameEngine(players, buy_policy=buy_policy, build_policy=build_policy, rng=dice.DiceSource(seed, buffer_size=4096))
+    game.play(max_turns)
+    return game
+
+def chunk_key(round_number, a, b, first_game):
+    """Identifies a chunk in the results file."""
+    return (round_number, a, b, first_game)
+
+def run_chunk(task):
+    """Worker entrypoint, plays a chunk of games between two policies and returns a results record."""
+    master_seed, round_number, a, b, first_game, game_count, max_turns = task
+
+    wins = {a: 0, b: 0}
+    draws = 0
+    turns = 0
+    for game_index in range(first_game, first_game + game_count):
+        # Alternate the seats so neither policy always goes first
+        seats = (a, b) if game_index % 2 == 0 else (b, a)
+        game = play_match(seats, f"{master_seed}:{round_number}:{a}:{b}:{game_index}", max_turns)
+        turns += game.turn
+        if game.winner is None:
+            draws += 1
+        else:
+            wins[seats[game.winner]] += 1
+
+    return {"round": round_number, "a": a, "b": b, "first": first_game, "games": game_count, "wins_a": wins[a], "wins_b": wins[b], "draws": draws, "turns": turns}
+
+def tournament_settings(names, pairing, games_per_pair, master_seed, max_turns, chunk_size):
+    """The settings which decide what every chunk in a results file means, a resumed run must match all of them."""
+    # Seeds are only ever used as strings, so 0 and "0" are the same tournament
+    return {"policies": list(names), "pairing": pairing, "games_per_pair": games_per_pair, "master_seed": str(master_seed), "max_turns": max_turns, "chunk_size": chunk_size}
+
+def games_played(pairs, a, b):
+    """How many games two policies have played against each other in pair totals."""
+    return pairs.get((min(a, b), max(a, b)), (0.0, 0))[1]
+
+class Results:
+    """Totals for every pair of policies, loaded from and appended to a JSONL results file."""
+    def __init__(self, path=None, settings=None):
+        """Constructor, raises ValueError if the file holds results of a tournament with different settings"""
+        self.path = path
+        # (a, b) -> [a's score, games], with a < b
+        self.pairs = {}
+        # Round number -> pair totals of just that round
+        self.rounds = {}
+        self.done = set()
+        self.games = 0
+        self.turns = 0
+        self.file = None
+
+        if path is not None:
+            header = None
+            records = []
+            complete = True
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as existing:
+                    for line in existing:
+                        complete = line.endswith("\n")
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            # A line cut short when an earlier run was stopped, that chunk just gets played again
+                            continue
+                        if "header" in record:
+                            header = record["header"]
+                        else:
+                            records.append(record)
+
+            if records and header is None:
+                raise ValueError(f"{path} has no header of the tournament settings, use a new results file")
+            if header is not None and settings is not None and header != settings:
+                different = sorted(key for key in set(header) | set(settings) if header.get(key) != settings.get(key))
+                raise ValueError(f"{path} holds a tournament with different settings ({', '.join(different)}), use a new results file")
+            for record in records:
+                self.add(record)
+
+            self.file = open(path, "a", encoding="utf-8")
+            if not complete:
+                # Don't append onto the end of a cut short line
+                self.file.write("\n")
+            if header is None and settings is not None:
+                self.file.write(json.dumps({"header": settings}) + "\n")
+                self.file.flush()
+
+    def add(self, record):
+        """Add a chunk record to the totals."""
+        key = chunk_key(record["round"], record["a"], record["b"], record["first"])
+        if key in self.done:
+            return
+        self.done.add(key)
+
+        a, b = record["a"], record["b"]
+        score = record["wins_a"] + record["draws"] / 2
+        if a > b:
+            a, b, score = b, a, record["games"] - score
+
+        for totals in (self.pairs, self.rounds.setdefault(record["round"], {})):
+            total = totals.setdefault((a, b), [0.0, 0])
+            total[0] += score
+            total[1] += record["games"]
+        self.games += record["games"]
+        self.turns += record["turns"]
+
+    def write(self, record):
+        """Add a new chunk record and append it to the results file."""
+        self.add(record)
+        if self.file is not None:
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+
+    def close(self):
+        """Close the results file."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def pairs_before(self, round_number):
+        """Pair totals of only the rounds before a round."""
+        totals = {}
+        for earlier_round, pairs in self.rounds.items():
+            if earlier_round < round_number:
+                for pair, (score, games) in pairs.items():
+                    total = totals.setdefault(pair, [0.0, 0])
+                    total[0] += score
+                    total[1] += games
+        return totals
+
+def fit_ratings(names, pairs):
+    """Fit Elo ratings to pair totals, returning {name: (rating, confidence interval)}.
+
+    Uses the Bradley-Terry MM algorithm with a draw added to every pair that has met. The intervals only use each
+    policy's own Fisher information, ignoring how the ratings depend on each other.
+    """
+    games  = {name: {} for name in names}
+    scores = {name: 0.0 for name in names}
+    for (a, b), (score, count) in pairs.items():
+        if count == 0 or a not in games or b not in games:
+            continue
+        count += PRIOR_DRAWS
+        score += PRIOR_DRAWS / 2
+        games[a][b] = count
+        games[b][a] = count
+        scores[a] += score
+        scores[b] += count - score
+
+    strength = {name: 1.0 for name in names}
+    for _ in range(FIT_ITERATIONS):
+        updated = {}
+        for name in names:
+            denominator = sum(count / (strength[name] + strength[other]) for other, count in games[name].items())
+            updated[name] = scores[name] / denominator if denominator else strength[name]
+
+        # Keep the geometric mean at 1 so the ratings stay centred
+        mean = math.exp(sum(math.log(value) for value in updated.values()) / len(updated))
+        updated = {name: value / mean for name, value in updated.items()}
+
+        change = max(abs(updated[name] - strength[name]) for name in names)
+        strength = updated
+        if change < FIT_TOLERANCE:
+            break
+
+    ratings = {}
+    for name in names:
+        information = 0.0
+        for other, count in games[name].items():
+            expected = strength[name] / (strength[name] + strength[other])
+            information += count * expected * (1 - expected)
+        interval = CONFIDENCE_Z * ELO_SCALE / math.sqrt(information) if information else math.inf
+        ratings[name] = (BASE_RATING + ELO_SCALE * math.log(strength[name]), interval)
+
+    return ratings
+
+def round_robin_pairings(names):
+    """Every pair of policies."""
+    return list(itertools.combinations(sorted(names), 2))
+
+def swiss_pairings(names, pairs):
+    """Pair policies with similar ratings, preferring pairs that have played each other least. An odd one out sits out.
+
+    pairs are the totals of the earlier rounds.
+    """
+    ratings = fit_ratings(names, pairs)
+    remaining = sorted(names, key=lambda name: -ratings[name][0])
+    pairings = []
+    while len(remaining) > 1:
+        first = remaining.pop(0)
+        # The nearest rated opponent among those it has met least
+        opponent = min(remaining, key=lambda other: (games_played(pairs, first, other), remaining.index(other)))
+        remaining.remove(opponent)
+        pairings.append(tuple(sorted((first, opponent))))
+    return pairings
+
+def round_tasks(master_seed, round_number, pairings, games_per_pair, chunk_size, max_turns, results):
+    """Lazily split a round into chunk tasks, skipping chunks already in the results."""
+    for a, b in pairings:
+        for first_game in range(0, games_per_pair, chunk_size):
+            if chunk_key(round_number, a, b, first_game) not in results.done:
+                yield (master_seed, round_number, a, b, first_game, min(chunk_size, games_per_pair - first_game), max_turns)
+
+def run_tournament(names, results_path=None, pairing="round_robin", rounds=DEFAULT_SWISS_ROUNDS, games_per_pair=DEFAULT_GAMES_PER_PAIR, master_seed=0, workers=None, max_turns=DEFAULT_MAX_TURNS, chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None):
+    """Play a tournament between the named policies and return their ratings, see fit_ratings.
+
+    pairing is "round_robin" (a single round of every pair) or "swiss". workers defaults to one per core and 1 plays
+    everything in this process. on_progress is called with the Results after every chunk.
+    """
+    unknown = [name for name in names if name not in POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown policies: {', '.join(unknown)}")
+    if pairing not in ("round_robin", "swiss"):
+        raise ValueError(f"Invalid tournament pairing {pairing}")
+
+    results = Results(results_path, tournament_settings(names, pairing, games_per_pair, master_seed, max_turns, chunk_size))
+    pool = multiprocessing.Pool(workers) if workers != 1 else None
+    try:
+        for round_number in range(rounds if pairing == "swiss" else 1):
+            if pairing == "swiss":
+                # Only the earlier rounds, which a resumed run has always finished, so it pairs this round the same way
+                # even with some of this round's or later rounds' chunks already in the results
+                pairings = swiss_pairings(names, results.pairs_before(round_number))
+            else:
+                pairings = round_robin_pairings(names)
+
+            tasks = round_tasks(master_seed, round_number, pairings, games_per_pair, chunk_size, max_turns, results)
+            for record in (pool.imap_unordered(run_chunk, tasks) if pool is not None else map(run_chunk, tasks)):
+                results.write(record)
+                if on_progress is not None:
+                    on_progress(results)
+    finally:
+        if pool is not None:
+            pool.terminate()
+        results.close()
+
+    return fit_ratings(names, results.pairs)
+
+def main():
+    """Command line entrypoint, run with python -m src.tournament."""
+    parser = argparse.ArgumentParser(description="Play a tournament between player policies and rate them.")
+    parser.add_argument("policies", nargs="*", default=sorted(set(POLICIES) - {"mcts"}), help=f"policies to play, from: {', '.join(POLICIES)}")
+    parser.add_argument("--results", default="tournament.jsonl", help="JSONL file to stream results to and resume from")
+    parser.add_argument("--pairing", choices=("round_robin", "swiss"), default="round_robin")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_SWISS_ROUNDS, help="number of Swiss rounds")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES_PER_PAIR, help="games per pair each round")
+    parser.add_argument("--seed", default="0", help="master seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to one per core")
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    try:
+        ratings = run_tournament(args.policies, args.results, args.pairing, args.rounds, args.games, args.seed, args.workers, args.max_turns, args.chunk_size)
+    except ValueError as error:
+        sys.exit(str(error))
+    for name, (rating, interval) in sorted(ratings.items(), key=lambda item: -item[1][0]):
+        print(f"{name:<12} {rating:7.1f} ± {interval:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
 import arcade
 
 from . import common
+from . import text_cache
+from . import widget_batch
 
 
 class Button:
@@ -22,42 +24,65 @@ class Button:
         self.height     = height
         self.text       = text
         self.width      = width
+        self.label      = text_cache.RetainedText()
+        # Unclickable buttons ignore clicks but are still drawn
+        self.clickable  = True
 
     def draw(self):
         """ Draw the button with text. """
-        arcade.draw_rectangle_filled(self.center_x, self.center_y, self.width, self.height, self.color)
-        arcade.draw_text(self.text, self.center_x, self.center_y, self.font_color, font_size=self.font_size, anchor_x="center", anchor_y="center")
+        widget_batch.draw_rectangles(self.rectangles())
+        self.draw_label()
+
+    def rectangles(self):
+        """The rectangles making up the button, for drawing in a widget batch."""
+        return (widget_batch.rectangle(self.center_x, self.center_y, self.width, self.height, self.color),)
+
+    def draw_label(self):
+        """Draw the button's text."""
+        self.label.draw(self.text, self.center_x, self.center_y, self.font_color, font_size=self.font_size, anchor_x="center", anchor_y="center")
 
     def check_if_clicked(self, x, y):
         """ Check if the button is clicked. """
+        if not self.clickable:
+            return
         if(self.center_x - self.width / 2 < x < self.center_x + self.width / 2) and (self.center_y - self.height / 2 < y < self.center_y + self.height / 2):
             common.audio["button"].play()
             self.action()
 
 class TextInputBox:
     """Reusable UI for text input"""
-    def __init__(self, center_x=0, center_y=0, width=300, height=50, text=""):
-        """Constructor"""
+    def __init__(self, center_x=0, center_y=0, width=300, height=50, text="", max_length=None):
+        """Constructor, max_length limits how many characters can be typed"""
         self.center_x         = center_x
         self.center_y         = center_y
         self.width            = width
         self.height           = height
         self.text             = text
+        self.max_length       = max_length
         self.active           = False
         self.font_color       = arcade.color.BLACK
         self.font_size        = 20
         self.border_color     = arcade.color.BLACK
         self.background_color = arcade.color.WHITE
+        self.label            = text_cache.RetainedText()
 
     def draw(self):
         """Draw the text input box."""
+        widget_batch.draw_rectangles(self.rectangles())
+        self.draw_label()
+
+    def rectangles(self):
+        """The background and border of the box, for drawing in a widget batch."""
         if self.active:
             border_color = arcade.color.BLUE
         else:
             border_color = self.border_color
-        arcade.draw_rectangle_filled(self.center_x, self.center_y, self.width, self.height, self.background_color)
-        arcade.draw_rectangle_outline(self.center_x, self.center_y, self.width, self.height, border_color, 2)
-        arcade.draw_text(self.text, self.center_x - self.width / 2 + 10, self.center_y - self.font_size / 2, self.font_color, font_size=self.font_size, anchor_x="left")
+        background = widget_batch.rectangle(self.center_x, self.center_y, self.width, self.height, self.background_color)
+        return (background, *widget_batch.outline(self.center_x, self.center_y, self.width, self.height, border_color, 2))
+
+    def draw_label(self):
+        """Draw the text typed in the box."""
+        self.label.draw(self.text, self.center_x - self.width / 2 + 10, self.center_y - self.font_size / 2, self.font_color, font_size=self.font_size, anchor_x="left")
 
     def check_if_clicked(self, x, y):
         """Check if the text input box is clicked."""
@@ -66,10 +91,16 @@ class TextInputBox:
         else:
             self.active = False
 
+    def set_focus(self, focused):
+        """Take or lose keyboard focus, typed text only goes to the box while it is focused."""
+        self.active = focused
+
     def on_text(self, text):
         """Handle text input."""
         if self.active:
             self.text += text
+            if self.max_length is not None:
+                self.text = self.text[:self.max_length]
 
     def on_key_press(self, key, modifiers):
         """Handle backspace and other key presses."""
@@ -79,7 +110,7 @@ class TextInputBox:
 
 class ToggleButton:
     """Reusable UI toggle with definable action and appearance."""
-    def __init__(self, action=lambda: None, center_x=0, center_y=0, width=150, height=50, enabled=True):
+    def __init__(self, action=lambda: None, center_x=0, center_y=0, width=150, height=50, enabled=True, enabled_text="Enabled", disabled_text="Disabled"):
         """Constructor"""
         self.action = action
         self.center_x = center_x
@@ -91,13 +122,24 @@ class ToggleButton:
         self.color_disabled = arcade.color.RED
         self.font_color = arcade.color.BLACK
         self.font_size = 20
+        self.enabled_text = enabled_text
+        self.disabled_text = disabled_text
+        self.label = text_cache.RetainedText()
 
     def draw(self):
         """Draw the toggle button."""
+        widget_batch.draw_rectangles(self.rectangles())
+        self.draw_label()
+
+    def rectangles(self):
+        """The rectangles making up the toggle, for drawing in a widget batch."""
         color = self.color_enabled if self.enabled else self.color_disabled
-        text = "Enabled" if self.enabled else "Disabled"
-        arcade.draw_rectangle_filled(self.center_x, self.center_y, self.width, self.height, color)
-        arcade.draw_text(text, self.center_x, self.center_y, self.font_color, font_size=self.font_size, anchor_x="center", anchor_y="center")
+        return (widget_batch.rectangle(self.center_x, self.center_y, self.width, self.height, color),)
+
+    def draw_label(self):
+        """Draw the toggle's text for its current state."""
+        text = self.enabled_text if self.enabled else self.disabled_text
+        self.label.draw(text, self.center_x, self.center_y, self.font_color, font_size=self.font_size, anchor_x="center", anchor_y="center")
 
     def check_if_clicked(self, x, y):
         """Check if the toggle button is clicked."""
@@ -116,7 +158,9 @@ class PieceSelector:
         self.height        = 64
         self.current_index = start_piece
         self.total_images  = 6
-        self.image         = common.graphics[f"piece{self.current_index}"]
+        # Views with several selectors put the sprites in one SpriteList to draw them together
+        self.sprite        = arcade.Sprite(center_x=self.center_x, center_y=self.center_y)
+        self.show_image()
 
         # Define buttons for changing to the previous or next piece
         self.prev_button = Button(text="Prev", center_x=self.center_x - self.width / 2 - 50, center_y=self.center_y, width=80, height=50, action=self.previous_image)
@@ -124,15 +168,38 @@ class PieceSelector:
 
     def draw(self):
         """Draw the image and the next/previous buttons."""
-        arcade.draw_texture_rectangle(self.center_x, self.center_y, self.width, self.height, self.image)
+        # Otherwise the image is drawn with the rest of the sprite list it is in
+        if not self.sprite.sprite_lists:
+            arcade.draw_texture_rectangle(self.center_x, self.center_y, self.width, self.height, self.image)
         self.prev_button.draw()
         self.next_button.draw()
 
+    def bounds(self):
+        """(left, bottom, right, top) around both buttons."""
+        return (self.prev_button.center_x - self.prev_button.width / 2, self.center_y - self.prev_button.height / 2, self.next_button.center_x + self.next_button.width / 2, self.center_y + self.next_button.height / 2)
+
+    def rectangles(self):
+        """The rectangles of both buttons, for drawing in a widget batch. The image is drawn by its sprite."""
+        return self.prev_button.rectangles() + self.next_button.rectangles()
+
+    def draw_label(self):
+        """Draw the text of both buttons."""
+        self.prev_button.draw_label()
+        self.next_button.draw_label()
+
     def check_if_clicked(self, x, y):
         """Check if next or previous buttons are clicked."""
         self.prev_button.check_if_clicked(x, y)
         self.next_button.check_if_clicked(x, y)
 
+    def show_image(self):
+        """Show the image of the current piece."""
+        self.image = common.graphics[f"piece{self.current_index}"]
+        # Changing the texture resets the sprite to the texture's size
+        self.sprite.texture = self.image
+        self.sprite.width   = self.width
+        self.sprite.height  = self.height
+
     def previous_image(self):
         """Select the previous image."""
         self.current_index -= 1
@@ -140,7 +207,7 @@ class PieceSelector:
         if self.current_index < 1:
             self.current_index = self.total_images
 
-        self.image = common.graphics[f"piece{self.current_index}"]
+        self.show_image()
 
     def next_image(self):
         """Select the next image."""
@@ -149,4 +216,4 @@ class PieceSelector:
         if self.current_index > self.total_images:
             self.current_index = 1
 
-        self.image = common.graphics[f"piece{self.current_index}"]
+        self.show_image()
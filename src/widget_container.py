@@ -0,0 +1,125 @@
+"""
+A container for a view's widgets which routes input to them, as well as drawing them in a batch.
+
+Widget bounds are kept in a spatial grid, so a mouse press only checks the few widgets in the grid cell under the
+pointer and is sent to the single widget that was hit, however many widgets the view has. The container also tracks
+keyboard focus: clicking a widget which takes text input focuses it, Tab moves focus along, and text and key presses
+only go to the focused widget.
+
+Authors: Daniel Smith, Bo Tang, and Nathan Spriggs
+"""
+
+import arcade
+
+from . import widget_batch
+
+
+GRID_CELL_SIZE = 64
+
+
+def widget_bounds(widget):
+    """(left, bottom, right, top) of a widget, from its own bounds if it has them or its center and size."""
+    if hasattr(widget, "bounds"):
+        return widget.bounds()
+    return (widget.center_x - widget.width / 2, widget.center_y - widget.height / 2, widget.center_x + widget.width / 2, widget.center_y + widget.height / 2)
+
+def grid_cells(bounds):
+    """Every grid cell the bounds overlap."""
+    left, bottom, right, top = bounds
+    for column in range(int(left // GRID_CELL_SIZE), int(right // GRID_CELL_SIZE) + 1):
+        for row in range(int(bottom // GRID_CELL_SIZE), int(top // GRID_CELL_SIZE) + 1):
+            yield column, row
+
+def focusable(widget):
+    """Whether a widget takes keyboard focus."""
+    return hasattr(widget, "set_focus")
+
+class WidgetContainer(widget_batch.WidgetBatch):
+    """A view's widgets, drawn together with input routed to the widget it is meant for."""
+    def __init__(self, widgets=()):
+        """Constructor"""
+        super().__init__()
+        # Grid cell -> widgets overlapping it, in the order they were added
+        self.grid    = {}
+        # Widget -> the bounds it is filed under in the grid
+        self.bounds  = {}
+        self.focused = None
+        for widget in widgets:
+            self.add(widget)
+
+    def add(self, widget):
+        """Add a widget, on top of any already added."""
+        super().add(widget)
+        self.index(widget)
+
+    def index(self, widget):
+        """File a widget in every grid cell it overlaps."""
+        bounds = widget_bounds(widget)
+        self.bounds[widget] = bounds
+        for cell in grid_cells(bounds):
+            self.grid.setdefault(cell, []).append(widget)
+
+    def unindex(self, widget):
+        """Remove a widget from the grid."""
+        for cell in grid_cells(self.bounds.pop(widget)):
+            self.grid[cell].remove(widget)
+
+    def move(self, widget, center_x, center_y):
+        """Move a widget, keeping the grid up to date. Widgets must be moved through this once added."""
+        if (widget.center_x, widget.center_y) == (center_x, center_y):
+            return
+
+        self.unindex(widget)
+        widget.center_x = center_x
+        widget.center_y = center_y
+        self.index(widget)
+
+    def hit_test(self, x, y):
+        """The topmost widget at a point, or None."""
+        cell = (int(x // GRID_CELL_SIZE), int(y // GRID_CELL_SIZE))
+        for widget in reversed(self.grid.get(cell, ())):
+            left, bottom, right, top = self.bounds[widget]
+            if left < x < right and bottom < y < top:
+                return widget
+        return None
+
+    def set_focus(self, widget):
+        """Give a widget keyboard focus, or take focus away from every widget with None."""
+        if widget is self.focused:
+            return
+        if self.focused is not None:
+            self.focused.set_focus(False)
+        self.focused = widget
+        if widget is not None:
+            widget.set_focus(True)
+
+    def focus_next(self):
+        """Move focus to the next widget which takes it, in the order they were added."""
+        candidates = [widget for widget in self.widgets if focusable(widget)]
+        if not candidates:
+            return
+        if self.focused in candidates:
+            self.set_focus(candidates[(candidates.index(self.focused) + 1) % len(candidates)])
+        else:
+            self.set_focus(candidates[0])
+
+    def on_mouse_press(self, x, y):
+        """Send a click to the widget under it, which takes focus if it can. Returns the widget hit, or None."""
+        widget = self.hit_test(x, y)
+        # Clicking anywhere other than a text box takes focus away from it
+        self.set_focus(widget if widget is not None and focusable(widget) else None)
+        if widget is not None:
+            widget.check_if_clicked(x, y)
+        return widget
+
+    def on_text(self, text):
+        """Send typed text to the focused widget."""
+        if self.focused is not None:
+            self.focused.on_text(text)
+
+    def on_key_press(self, key, modifiers):
+        """Move focus on Tab, and send any other key to the focused widget."""
+        if key == arcade.key.TAB:
+            self.focus_next()
+        elif self.focused is not None:
+            self.focused.on_key_press(key, modifiers)